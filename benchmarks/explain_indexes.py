@@ -0,0 +1,120 @@
+"""Plany zapytań (EXPLAIN QUERY PLAN) gorących filtrów przed i po migracji z indeksami 0014.
+
+Zasiewa tymczasową bazę SQLite (domyślnie 50 000 meczów), cofa aplikację football do migracji 0013,
+pokazuje plany i czasy zapytań, a potem migruje do końca i powtarza pomiar.
+
+    python benchmarks/explain_indexes.py --matches 50000 --lineup-matches 5000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sport.settings")
+
+import django
+from django.conf import settings
+
+BEFORE_INDEXES = '0013_lapstanding'
+POSITIONS = ['gk', 'df', 'mf', 'st']
+EVENT_TYPES = ['goal', 'own_goal', 'yellow_card', 'red_card', 'substitution']
+
+
+def seed(options):
+    from football.models import Event, Lineup, Match, Player, Team
+
+    rng = random.Random(options.seed)
+    teams = Team.objects.bulk_create(
+        Team(name=f"Drużyna {i}", city=f"Miasto {i}", founded=date(1900 + i % 120, 1, 1))
+        for i in range(options.teams)
+    )
+    players_by_team = {}
+    players = Player.objects.bulk_create(
+        Player(team=team, name=f"Zawodnik {team.pk}-{i}", birth_day=date(1990, 1, 1) + timedelta(days=i),
+               position=POSITIONS[i % 4], nationality="Polska")
+        for team in teams for i in range(options.squad)
+    )
+    for player in players:
+        players_by_team.setdefault(player.team_id, []).append(player)
+
+    matches = []
+    for i in range(options.matches):
+        home, away = rng.sample(teams, 2)
+        matches.append(Match(home_team=home, away_team=away, lap=i % 38 + 1, date=date(2000, 1, 1) + timedelta(days=i // 10),
+                             home_score=rng.randint(0, 5), away_score=rng.randint(0, 5)))
+    matches = Match.objects.bulk_create(matches, batch_size=2000)
+
+    lineups, events = [], []
+    for match in matches[:options.lineup_matches]:
+        for team in (match.home_team, match.away_team):
+            squad = rng.sample(players_by_team[team.pk], 11)
+            lineups.extend(Lineup(match=match, team=team, player=player) for player in squad)
+            events.extend(Event(match=match, team=team, player=player, event_type=rng.choice(EVENT_TYPES),
+                                minute=rng.randint(1, 90)) for player in squad[:3])
+    Lineup.objects.bulk_create(lineups, batch_size=5000)
+    Event.objects.bulk_create(events, batch_size=5000)
+    return teams, matches
+
+
+def hot_queries(teams, matches):
+    from football.models import Event, Lineup, Match, Player
+
+    match = matches[0]
+    player_id = match.lineups.values_list('player_id', flat=True).first()
+    return {
+        "Match(lap)": Match.objects.filter(lap=17),
+        "Match(home_team, away_team)": Match.objects.filter(home_team=teams[0], away_team=teams[1]),
+        "Lineup(match, team, on_bench)": Lineup.objects.filter(match=match, team=match.home_team, on_bench=False),
+        "Lineup(match, player)": Lineup.objects.filter(match=match, player_id=player_id),
+        "Event(match, event_type)": Event.objects.filter(match=match, event_type='goal'),
+        "Player(team, position)": Player.objects.filter(team=teams[0], position='gk'),
+    }
+
+
+def measure(teams, matches, repeat):
+    results = {}
+    for name, queryset in hot_queries(teams, matches).items():
+        plan = queryset.explain()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            list(queryset.all())
+        results[name] = (plan, (time.perf_counter() - start) / repeat * 1000)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--matches', type=int, default=50000)
+    parser.add_argument('--lineup-matches', type=int, default=5000, help="ile meczów dostaje składy i wydarzenia")
+    parser.add_argument('--teams', type=int, default=400)
+    parser.add_argument('--squad', type=int, default=25)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=2025)
+    options = parser.parse_args()
+
+    settings.DATABASES['default']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    django.setup()
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+    call_command('migrate', 'football', BEFORE_INDEXES, verbosity=0)
+    start = time.perf_counter()
+    teams, matches = seed(options)
+    print(f"Zasiano {len(matches)} meczów w {time.perf_counter() - start:.1f} s")
+
+    before = measure(teams, matches, options.repeat)
+    call_command('migrate', 'football', verbosity=0)
+    after = measure(teams, matches, options.repeat)
+
+    for name in before:
+        print(f"\n{name}")
+        print(f"  bez indeksów ({before[name][1]:.3f} ms): {before[name][0]}")
+        print(f"  z indeksami  ({after[name][1]:.3f} ms): {after[name][0]}")
+
+
+if __name__ == '__main__':
+    main()
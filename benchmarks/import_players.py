@@ -0,0 +1,67 @@
+"""Czas importu zawodników komendą import_players do tymczasowej bazy SQLite.
+
+Generuje plik CSV w formacie import_players (drużyna, pozycja, nazwisko, narodowość, data urodzenia dd.mm.rr
+i trzy kolumny dodatkowe), zakłada drużyny i mierzy sam import - bez generowania pliku i migracji.
+
+    python benchmarks/import_players.py --players 1000000 --batch-size 5000
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sport.settings")
+
+import django
+from django.conf import settings
+
+POSITIONS = ['gk', 'df', 'mf', 'st']
+NATIONALITIES = ['Polska', 'Niemcy', 'Czechy', 'Hiszpania', 'Brazylia']
+
+
+def write_csv(path, options):
+    rng = random.Random(options.seed)
+    first_birthday = date(1980, 1, 1)
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        for number in range(options.players):
+            birthday = first_birthday + timedelta(days=rng.randrange(7000))
+            writer.writerow([f"Drużyna {rng.randrange(options.teams)}", rng.choice(POSITIONS), f"Zawodnik {number}",
+                             rng.choice(NATIONALITIES), birthday.strftime("%d.%m.%y"), "180/75", "Klub", ""])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, default=1_000_000)
+    parser.add_argument('--teams', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=2025)
+    options = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    settings.DATABASES['default']['NAME'] = os.path.join(directory, 'bench.sqlite3')
+    django.setup()
+    from django.core.management import call_command
+
+    from football.models import Player, Team
+
+    call_command('migrate', verbosity=0)
+    Team.objects.bulk_create(
+        Team(name=f"Drużyna {i}", city=f"Miasto {i}", founded=date(1920, 1, 1)) for i in range(options.teams)
+    )
+    path = os.path.join(directory, 'zawodnicy.csv')
+    write_csv(path, options)
+
+    start = time.perf_counter()
+    call_command('import_players', path, batch_size=options.batch_size, verbosity=0)
+    elapsed = time.perf_counter() - start
+    print(f"{Player.objects.count()} zawodników w {elapsed:.1f} s ({options.players / elapsed:,.0f} wierszy/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""Porównanie przepustowości i opóźnień stron tylko do odczytu pod WSGI i ASGI.
+
+Kilka tysięcy równoległych czytelników (korutyny asyncio, każda z własnym połączeniem keep-alive)
+odpytuje strony tabeli, kolejki, terminarza drużyny, kadry i meczu - pod WSGI widoki synchroniczne,
+pod ASGI ich warianty async (/football/async/...). Wypisuje liczbę żądań, błędy, żądania/s oraz p50 i p99.
+
+Serwery można uruchomić samemu i podać adresy:
+
+    gunicorn sport.wsgi -w 4 -b 127.0.0.1:8001
+    uvicorn sport.asgi:application --workers 4 --port 8002
+    python benchmarks/load_test.py --wsgi-url http://127.0.0.1:8001 --asgi-url http://127.0.0.1:8002
+
+albo pozwolić skryptowi je uruchomić (--start, wymaga gunicorn i uvicorn). Przy kilku tysiącach
+połączeń trzeba podnieść limit deskryptorów plików (ulimit -n). --seed zasiewa bazę z settings
+sezonem 20 drużyn i 38 kolejek.
+"""
+import argparse
+import asyncio
+import os
+import random
+import shlex
+import socket
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sport.settings")
+
+import django
+
+WSGI_COMMAND = "gunicorn sport.wsgi -w {workers} -b 127.0.0.1:{port}"
+ASGI_COMMAND = "uvicorn sport.asgi:application --workers {workers} --port {port} --log-level warning"
+
+
+def seed():
+    from football.models import Match, Player, Team
+    from football.standings import rebuild_lap_standings, rebuild_standings
+
+    teams = Team.objects.bulk_create(
+        Team(name=f"Drużyna {i}", city=f"Miasto {i}", founded=date(1920, 1, 1)) for i in range(20)
+    )
+    Player.objects.bulk_create(
+        Player(team=team, name=f"Zawodnik {team.pk}-{i}", birth_day=date(1995, 1, 1) + timedelta(days=i),
+               position=['gk', 'df', 'mf', 'st'][i % 4], nationality="Polska")
+        for team in teams for i in range(25)
+    )
+    rotation, rounds = list(teams), []
+    for _ in range(len(teams) - 1):
+        rounds.append(list(zip(rotation[:10], reversed(rotation[10:]))))
+        rotation = [rotation[0], rotation[-1], *rotation[1:-1]]
+    rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
+    Match.objects.bulk_create(
+        Match(lap=lap, date=date(2024, 8, 1) + timedelta(weeks=lap), home_team=home, away_team=away,
+              home_score=random.randint(0, 4), away_score=random.randint(0, 4))
+        for lap, pairs in enumerate(rounds, start=1) for home, away in pairs
+    )
+    rebuild_standings()
+    rebuild_lap_standings()
+
+
+def login_cookie():
+    """Sesja zalogowanego użytkownika testowego zapisana w bazie, z której korzystają serwery."""
+    from django.conf import settings
+    from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+    from django.contrib.auth.models import User
+    from django.contrib.sessions.backends.db import SessionStore
+
+    user, _ = User.objects.get_or_create(username='loadtest')
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return f'{settings.SESSION_COOKIE_NAME}={session.session_key}'
+
+
+def page_paths(prefix):
+    from football.models import Match
+
+    match = Match.objects.order_by('pk').first()
+    if match is None:
+        raise SystemExit("Baza jest pusta - uruchom z --seed")
+    return [
+        f'/football/{prefix}table/',
+        f'/football/{prefix}lap/{match.lap}/',
+        f'/football/{prefix}{match.home_team_id}/',
+        f'/football/{prefix}team/{match.home_team_id}/',
+        f'/football/{prefix}match/{match.pk}/details/',
+    ]
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("serwer zamknął połączenie")
+    status = int(status_line.split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while (size := int((await reader.readline()).strip(), 16)):
+            await reader.readexactly(size + 2)
+        await reader.readline()
+    else:
+        await reader.read()
+    return status, headers.get('connection', '').lower() == 'close'
+
+
+async def reader_task(host, port, paths, cookie, deadline, latencies, errors):
+    connection = None
+    while time.perf_counter() < deadline:
+        path = random.choice(paths)
+        start = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.open_connection(host, port)
+            reader, writer = connection
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nCookie: {cookie}\r\n\r\n'.encode())
+            await writer.drain()
+            status, close = await read_response(reader)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+            errors.append(path)
+            connection = None
+            await asyncio.sleep(0.01)
+            continue
+        if status != 200:
+            errors.append(path)
+        else:
+            latencies.append(time.perf_counter() - start)
+        if close:
+            connection[1].close()
+            connection = None
+    if connection is not None:
+        connection[1].close()
+
+
+async def run_load(url, paths, cookie, concurrency, duration):
+    parts = urlsplit(url)
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        reader_task(parts.hostname, parts.port or 80, paths, cookie, deadline, latencies, errors)
+        for _ in range(concurrency)
+    ))
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else float('nan')
+
+
+def report(name, latencies, errors, elapsed):
+    print(f"{name}: {len(latencies)} żądań, {len(errors)} błędów, {len(latencies) / elapsed:.0f} żądań/s, "
+          f"p50 {percentile(latencies, 0.50):.1f} ms, p99 {percentile(latencies, 0.99):.1f} ms")
+
+
+def wait_for(url, timeout=30):
+    parts = urlsplit(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((parts.hostname, parts.port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"Serwer {url} nie wystartował")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--wsgi-url', default='http://127.0.0.1:8001')
+    parser.add_argument('--asgi-url', default='http://127.0.0.1:8002')
+    parser.add_argument('--start', action='store_true', help="uruchom gunicorn i uvicorn na czas pomiaru")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=2000, help="liczba równoległych czytelników")
+    parser.add_argument('--duration', type=float, default=20, help="czas pomiaru każdego serwera w sekundach")
+    parser.add_argument('--seed', action='store_true', help="zasiej bazę sezonem 20 drużyn i 38 kolejek")
+    options = parser.parse_args()
+
+    django.setup()
+    if options.seed:
+        seed()
+    cookie = login_cookie()
+
+    for name, url, prefix, command in (('WSGI', options.wsgi_url, '', WSGI_COMMAND),
+                                       ('ASGI', options.asgi_url, 'async/', ASGI_COMMAND)):
+        server = None
+        if options.start:
+            server = subprocess.Popen(shlex.split(command.format(workers=options.workers, port=urlsplit(url).port)))
+            wait_for(url)
+        try:
+            report(name, *asyncio.run(run_load(url, page_paths(prefix), cookie, options.concurrency, options.duration)))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == '__main__':
+    main()
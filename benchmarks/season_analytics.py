@@ -0,0 +1,133 @@
+"""Analityka sezonu w NumPy (football.analytics) wobec zapytań ORM.
+
+Zasiewa tymczasową bazę SQLite terminarzem każdy z każdym (domyślnie 20 drużyn, mecz i rewanż) i mierzy:
+zapytanie tabeli z TableView, te same statystyki co analytics liczone agregatami ORM (podział dom/wyjazd,
+forma, bilans bezpośredni, różnica bramek po kolejkach), wczytanie i przeliczenie w NumPy oraz odczyt z cache.
+
+    python benchmarks/season_analytics.py --teams 20 --seasons 5 --repeat 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sport.settings")
+
+import django
+from django.conf import settings
+
+
+def seed(options):
+    from football.models import Match, Team
+    from football.standings import rebuild_standings
+
+    rng = random.Random(options.seed)
+    teams = Team.objects.bulk_create(
+        Team(name=f"Drużyna {i}", city=f"Miasto {i}", founded=date(1920, 1, 1)) for i in range(options.teams)
+    )
+    rotation, rounds = list(teams), []
+    for _ in range(len(teams) - 1):
+        half = len(rotation) // 2
+        rounds.append(list(zip(rotation[:half], reversed(rotation[half:]))))
+        rotation = [rotation[0], rotation[-1], *rotation[1:-1]]
+    rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
+    Match.objects.bulk_create((
+        Match(lap=lap, date=date(2000, 8, 1) + timedelta(weeks=lap), home_team=home, away_team=away,
+              home_score=rng.randint(0, 4), away_score=rng.randint(0, 4))
+        for lap, pairs in enumerate(rounds * options.seasons, start=1) for home, away in pairs
+    ), batch_size=2000)
+    rebuild_standings()
+
+
+def table_query():
+    from football.models import Standing
+
+    return list(Standing.objects.select_related('team'))
+
+
+def orm_analytics():
+    """Te same statystyki co football.analytics, ale z agregatów ORM - tak jak liczyłby je widok na żądanie."""
+    from django.db.models import Case, Count, F, IntegerField, Q, Sum, When
+    from django.db.models.functions import Sign
+
+    from football.analytics import FORM_LENGTH
+    from football.models import Match, Team
+
+    def side_stats(side, other):
+        relation = f'{side}_matches'
+        scored, conceded = f'{relation}__{side}_score', f'{relation}__{other}_score'
+        return Team.objects.annotate(
+            matches=Count(relation),
+            wins=Count(relation, filter=Q(**{f'{scored}__gt': F(conceded)})),
+            draws=Count(relation, filter=Q(**{scored: F(conceded)})),
+            goals_scored=Sum(scored), goals_conceded=Sum(conceded),
+        ).values('pk', 'matches', 'wins', 'draws', 'goals_scored', 'goals_conceded')
+
+    result = {}
+    for side, other in (('home', 'away'), ('away', 'home')):
+        for row in side_stats(side, other):
+            result.setdefault(row['pk'], {})[side] = row
+    for team_id in result:
+        matches = (Match.objects.filter(Q(home_team_id=team_id) | Q(away_team_id=team_id))
+                   .order_by('-lap', '-date', '-id')[:FORM_LENGTH]
+                   .annotate(result=Sign(Case(When(home_team_id=team_id, then=F('home_score') - F('away_score')),
+                                              default=F('away_score') - F('home_score'),
+                                              output_field=IntegerField()))))
+        result[team_id]['form'] = list(matches.values_list('result', flat=True))[::-1]
+        result[team_id]['head_to_head'] = list(
+            Match.objects.filter(home_team_id=team_id).values('away_team_id')
+            .annotate(matches=Count('id'), goals_scored=Sum('home_score'), goals_conceded=Sum('away_score'))
+        )
+        result[team_id]['goal_difference'] = list(
+            Match.objects.filter(Q(home_team_id=team_id) | Q(away_team_id=team_id)).values('lap').order_by('lap')
+            .annotate(difference=Sum(Case(When(home_team_id=team_id, then=F('home_score') - F('away_score')),
+                                          default=F('away_score') - F('home_score'),
+                                          output_field=IntegerField())))
+        )
+    return result
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--teams', type=int, default=20)
+    parser.add_argument('--seasons', type=int, default=1, help="ile razy powtórzyć terminarz (kolejne kolejki)")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=2025)
+    options = parser.parse_args()
+
+    settings.DATABASES['default']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    django.setup()
+    from django.core.management import call_command
+
+    from football.analytics import compute_analytics, load_season, season_analytics
+    from football.models import Match
+
+    call_command('migrate', verbosity=0)
+    seed(options)
+    season = load_season()
+    season_analytics()
+    print(f"{options.teams} drużyn, {Match.objects.count()} meczów, {options.repeat} powtórzeń\n")
+
+    for name, function in (
+        ("TableView (Standing + drużyna)", table_query),
+        ("statystyki z agregatów ORM", orm_analytics),
+        ("NumPy: wczytanie + przeliczenie", lambda: compute_analytics(load_season())),
+        ("NumPy: samo przeliczenie", lambda: compute_analytics(season)),
+        ("NumPy: odczyt z cache", season_analytics),
+    ):
+        print(f"{name:<34} {timed(function, options.repeat):9.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
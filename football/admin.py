@@ -1,7 +1,24 @@
 from django.contrib import admin
 from .models import Match, Team, Player, Lineup, Event, Substitution
+from .pagination import EstimatedCountPaginator
 
-class TeamAdmin(admin.ModelAdmin):
+
+class FootballAdmin(admin.ModelAdmin):
+    # Relacje potrzebne w __str__ pobierane razem z wierszem - także w podpowiedziach autocomplete
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self.list_select_related and self.list_select_related is not True:
+            queryset = queryset.select_related(*self.list_select_related)
+        return queryset
+
+
+class LargeTableAdmin(FootballAdmin):
+    # Składy i wydarzenia to największe tabele - bez pełnego COUNT(*) przy każdym wyświetleniu listy
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class TeamAdmin(FootballAdmin):
     fieldsets = [
         (None, {"fields": ["name"]}),
         (None, {"fields": ["city"]}),
@@ -9,44 +26,63 @@ class TeamAdmin(admin.ModelAdmin):
         ("Stadium", {"fields": ["stadium"], "classes":["collapse"]})
     ]
     list_display = ["name", "city", "founded", "stadium"]
+    search_fields = ["name", "city"]
+    ordering = ["name"]
 
-class MatchAdmin(admin.ModelAdmin):
+class MatchAdmin(FootballAdmin):
     fieldsets = [
         (None, {"fields": [("home_team", "away_team", "home_score", "away_score")]}),
         (None, {"fields": ["date", "lap"]})      
     ]
     list_display = ["id", "home_team", "away_team", "home_score", "away_score", "lap", "date"]
     list_filter = ['lap', 'home_team', 'away_team']
+    list_select_related = ["home_team", "away_team"]
+    autocomplete_fields = ["home_team", "away_team"]
+    search_fields = ["home_team__name", "away_team__name"]
+    ordering = ["-lap", "-date", "-id"]
 
-class PlayerAdmin(admin.ModelAdmin):
+class PlayerAdmin(FootballAdmin):
     fieldsets = [
         (None, {"fields": [("name", "team", "position")]}),
         (None, {"fields": [("nationality", "birth_day")]})
     ]
 
     list_display = ["id", "name", "team","position","nationality", "birth_day"]
+    list_select_related = ["team"]
+    autocomplete_fields = ["team"]
+    search_fields = ["name"]
+    ordering = ["name", "id"]
 
-class LineupAdmin(admin.ModelAdmin):
+class LineupAdmin(LargeTableAdmin):
     fieldsets = [
         (None, {"fields": [("match", "team","player","is_starting","on_bench")]})
     ]
 
     list_display = ["id","match", "team","player","is_starting","on_bench"]
+    list_select_related = ["match__home_team", "match__away_team", "team", "player__team"]
+    autocomplete_fields = ["match", "team", "player"]
 
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(LargeTableAdmin):
     fieldsets =[
         (None, {"fields": [("match", "team","player")]}),
         (None, {"fields": [("event_type", "minute", "description")]})
     ]
 
     list_display = ["id","match", "team","player", "event_type", "minute", "description"]
+    list_select_related = ["match__home_team", "match__away_team", "team", "player__team"]
+    autocomplete_fields = ["match", "team", "player"]
+    search_fields = ["player__name", "match__home_team__name", "match__away_team__name"]
+    ordering = ["-id"]
 
-class SubstitutionAdmin(admin.ModelAdmin):
+class SubstitutionAdmin(FootballAdmin):
     fieldsets =[
         (None, {"fields": [("event", "player_in")]})
     ]
 
     list_display = ["event", "player_in"]
+    list_select_related = ["event__match__home_team", "event__match__away_team", "event__player", "event__team",
+                           "player_in__team"]
+    autocomplete_fields = ["event", "player_in"]
 
 
 admin.site.register(Team, TeamAdmin)
@@ -0,0 +1,167 @@
+"""Analityka sezonu liczona wektorowo w NumPy.
+
+Mecze sezonu są wczytywane jednym zapytaniem do tablic - każdy mecz jako dwa występy (gospodarza i gościa),
+posortowane po drużynie i kolejności rozgrywania. Forma, podział dom/wyjazd, bilans bezpośrednich meczów,
+serie i przebieg różnicy bramek powstają z operacji na całych tablicach (bincount, cumsum, maximum.at),
+bez pętli po meczach. Wynik jest w cache tabeli, więc liczy się raz na każdą zmianę meczów lub drużyn.
+"""
+from dataclasses import dataclass
+
+from .caching import cached_standings
+from .models import Match, Team
+from .pagination import MATCH_KEYSET
+from .standings import RESULT_FIELDS, STAT_FIELDS
+
+try:
+    import numpy
+except ImportError:  # NumPy jest opcjonalny - bez niego analityka jest niedostępna
+    numpy = None
+
+FORM_LENGTH = 5
+# Wynik z perspektywy drużyny to znak różnicy bramek: 1, 0, -1
+RESULTS = {1: 'W', 0: 'D', -1: 'L'}
+
+
+@dataclass
+class Season:
+    """Występy drużyn w sezonie: tablice równej długości, indeksy drużyn i kolejek zamiast pk."""
+    team_ids: 'numpy.ndarray'
+    laps: 'numpy.ndarray'
+    team: 'numpy.ndarray'
+    opponent: 'numpy.ndarray'
+    lap: 'numpy.ndarray'
+    scored: 'numpy.ndarray'
+    conceded: 'numpy.ndarray'
+    home: 'numpy.ndarray'
+
+
+def season_arrays(team_ids, rows):
+    """Buduje Season z posortowanych pk drużyn i wierszy meczów (kolejka, *RESULT_FIELDS) w kolejności rozgrywania."""
+    team_ids = numpy.asarray(team_ids, dtype=numpy.int64)
+    lap, home_id, away_id, home_score, away_score = numpy.asarray(rows, dtype=numpy.int64).reshape(-1, 5).T
+    count = len(lap)
+    laps, lap_index = numpy.unique(lap, return_inverse=True)
+    team = numpy.searchsorted(team_ids, numpy.concatenate([home_id, away_id]))
+    played = numpy.tile(numpy.arange(count), 2)
+    # Występy każdej drużyny obok siebie, od najstarszego
+    order = numpy.lexsort((played, team))
+    return Season(
+        team_ids=team_ids,
+        laps=laps,
+        team=team[order],
+        opponent=numpy.searchsorted(team_ids, numpy.concatenate([away_id, home_id]))[order],
+        lap=numpy.tile(lap_index, 2)[order],
+        scored=numpy.concatenate([home_score, away_score])[order],
+        conceded=numpy.concatenate([away_score, home_score])[order],
+        home=(numpy.arange(2 * count) < count)[order],
+    )
+
+
+def load_season():
+    if numpy is None:
+        raise RuntimeError("Analityka sezonu wymaga pakietu numpy")
+    team_ids = list(Team.objects.order_by('pk').values_list('pk', flat=True))
+    rows = list(Match.objects.order_by(*MATCH_KEYSET).values_list('lap', *RESULT_FIELDS))
+    return season_arrays(team_ids, rows)
+
+
+def run_lengths(team, values):
+    """Długość serii jednakowych wartości kończącej się na każdym występie; seria nie przechodzi na inną drużynę."""
+    if not len(team):
+        return numpy.zeros(0, dtype=numpy.int64)
+    boundary = numpy.ones(len(team), dtype=bool)
+    boundary[1:] = (team[1:] != team[:-1]) | (values[1:] != values[:-1])
+    run_start = numpy.flatnonzero(boundary)[numpy.cumsum(boundary) - 1]
+    return numpy.arange(len(team)) - run_start + 1
+
+
+def longest_run(season, lengths, mask):
+    longest = numpy.zeros(len(season.team_ids), dtype=numpy.int64)
+    numpy.maximum.at(longest, season.team[mask], lengths[mask])
+    return longest
+
+
+def stat_columns(counts, result, scored, conceded):
+    """Kolumny STAT_FIELDS dla grup występów; counts(values) sumuje wartości w grupach."""
+    wins, draws, loses = counts(result > 0), counts(result == 0), counts(result < 0)
+    goals_scored, goals_conceded = counts(scored), counts(conceded)
+    return dict(zip(STAT_FIELDS, (
+        counts(numpy.ones_like(result)), wins, draws, loses,
+        goals_scored, goals_conceded, goals_scored - goals_conceded, 3 * wins + draws,
+    )))
+
+
+def compute_analytics(season):
+    """Statystyki wszystkich drużyn sezonu - {team_id: {...}} z wartościami w typach Pythona."""
+    teams = len(season.team_ids)
+    result = numpy.sign(season.scored - season.conceded)
+
+    def per_team(mask):
+        def counts(values):
+            return numpy.bincount(season.team[mask], weights=values[mask], minlength=teams).astype(numpy.int64)
+        return counts
+
+    splits = {
+        'home': stat_columns(per_team(season.home), result, season.scored, season.conceded),
+        'away': stat_columns(per_team(~season.home), result, season.scored, season.conceded),
+    }
+
+    # Ostatnie FORM_LENGTH występów: indeksy liczone od końca grupy każdej drużyny
+    starts = numpy.searchsorted(season.team, numpy.arange(teams))
+    ends = numpy.searchsorted(season.team, numpy.arange(teams), side='right')
+    positions = ends[:, None] - FORM_LENGTH + numpy.arange(FORM_LENGTH)
+    form = numpy.append(result, 0)[numpy.clip(positions, 0, None)]
+    form_played = positions >= starts[:, None]
+
+    lengths = run_lengths(season.team, result)
+    unbeaten = result >= 0
+    longest_wins = longest_run(season, lengths, result > 0)
+    longest_unbeaten = longest_run(season, run_lengths(season.team, unbeaten), unbeaten)
+    has_matches = ends > starts
+    last = numpy.maximum(ends - 1, 0)
+    current_result = numpy.append(result, 0)[last]
+    current_length = numpy.append(lengths, 0)[last]
+
+    pair = season.team * teams + season.opponent
+
+    def per_pair(values):
+        return numpy.bincount(pair, weights=values, minlength=teams * teams).astype(numpy.int64).reshape(teams, teams)
+
+    head_to_head = stat_columns(per_pair, result, season.scored, season.conceded)
+
+    cell = season.team * len(season.laps) + season.lap
+    goal_difference = numpy.bincount(
+        cell, weights=season.scored - season.conceded, minlength=teams * len(season.laps)
+    ).astype(numpy.int64).reshape(teams, len(season.laps)).cumsum(axis=1)
+
+    laps = season.laps.tolist()
+    analytics = {}
+    for index, team_id in enumerate(season.team_ids.tolist()):
+        opponents = numpy.flatnonzero(head_to_head['matches'][index]).tolist()
+        analytics[team_id] = {
+            'team_id': team_id,
+            'form': [RESULTS[value] for value in form[index][form_played[index]].tolist()],
+            **{side: {field: int(column[index]) for field, column in split.items()} for side, split in splits.items()},
+            'streak': {
+                'current': {'result': RESULTS[int(current_result[index])], 'length': int(current_length[index])}
+                if has_matches[index] else None,
+                'longest_winning': int(longest_wins[index]),
+                'longest_unbeaten': int(longest_unbeaten[index]),
+            },
+            'head_to_head': [
+                {'opponent_id': int(season.team_ids[opponent]),
+                 **{field: int(column[index, opponent]) for field, column in head_to_head.items()}}
+                for opponent in opponents
+            ],
+            'goal_difference_trend': [[lap, value] for lap, value in zip(laps, goal_difference[index].tolist())],
+        }
+    return analytics
+
+
+def season_analytics():
+    """Statystyki wszystkich drużyn z cache tabeli - przeliczane po każdej zmianie meczu lub drużyny."""
+    return cached_standings('analytics', lambda: compute_analytics(load_season()))
+
+
+def team_analytics(team_id):
+    return season_analytics().get(team_id)
@@ -0,0 +1,237 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from django.http import Http404, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views import generic
+from django.views.decorators.http import condition
+
+from .analytics import season_analytics
+from .caching import FIXTURES, MATCHES, STANDINGS, get_modified, get_version, lap_scope, leaderboard_scope, team_scope
+from .labels import PLAYERS, TEAMS
+from .leaderboards import CATEGORIES, TOP_K, leaderboard
+from .live import timeline_events
+from .minutes import build_intervals, minutes_played
+from .models import LapStanding, Lineup, Match, Player, Standing, Team
+from .player_stats import LEADERBOARD_SIZE
+from .pagination import MATCH_KEYSET, PLAYER_KEYSET, KeysetPaginationMixin
+from .standings import STAT_FIELDS
+
+# Wersja API w adresach: /api/v1/...
+API_VERSION = 'v1'
+
+MATCH_FIELDS = ('id', 'lap', 'date', 'home_team_id', 'home_team__name', 'away_team_id', 'away_team__name',
+                'home_score', 'away_score')
+PLAYER_FIELDS = ('id', 'name', 'team_id', 'team__name', 'position', 'nationality', 'birth_day')
+TEAM_FIELDS = ('id', 'name', 'city', 'founded', 'stadium')
+
+# Zakresy wersji danych (alias cache, zakres) - z nich liczone są ETag i Last-Modified
+TEAMS_VERSION = (FIXTURES, 'teams')
+TABLE_VERSION = (STANDINGS, 'table')
+TEAM_NAMES_VERSION = ('default', f'labels:{TEAMS}')
+PLAYER_NAMES_VERSION = ('default', f'labels:{PLAYERS}')
+
+
+class ApiView(LoginRequiredMixin, generic.View):
+    """Widok API tylko do odczytu z warunkowym GET, jak strony HTML - tylko dla zalogowanych (inaczej 403).
+
+    ETag i Last-Modified powstają z liczników zmian w cache (versions()), więc odpowiedź 304
+    nie wymaga zapytań o dane - poza sprawdzeniem sesji.
+    """
+    raise_exception = True
+    http_method_names = ['get', 'head', 'options']
+
+    def versions(self):
+        raise NotImplementedError
+
+    def get_data(self):
+        raise NotImplementedError
+
+    def etag(self, request, *args, **kwargs):
+        return '-'.join(str(get_version(alias, scope)) for alias, scope in self.versions())
+
+    def last_modified(self, request, *args, **kwargs):
+        return max(get_modified(alias, scope) for alias, scope in self.versions())
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        # Odpowiedź zależy od zalogowania - trzyma ją tylko przeglądarka i przed użyciem musi ją zweryfikować
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        # Warunkowy GET dopiero po sprawdzeniu logowania - 304 nie trafi do anonimowego klienta
+        view = condition(etag_func=self.etag, last_modified_func=self.last_modified)(
+            lambda request, *args, **kwargs: JsonResponse(self.get_data())
+        )
+        return view(request, *args, **kwargs)
+
+
+class TeamListApi(ApiView):
+
+    def versions(self):
+        return [TEAMS_VERSION]
+
+    def get_data(self):
+        return {'teams': list(Team.objects.order_by('name', 'id').values(*TEAM_FIELDS))}
+
+
+class LapFixturesApi(ApiView):
+
+    def versions(self):
+        return [(FIXTURES, lap_scope(self.kwargs['lap'])), TEAMS_VERSION]
+
+    def get_data(self):
+        fixtures = list(Match.objects.filter(lap=self.kwargs['lap']).order_by(*MATCH_KEYSET).values(*MATCH_FIELDS))
+        if not fixtures:
+            raise Http404("Brak meczów w tej kolejce")
+        return {'lap': self.kwargs['lap'], 'fixtures': fixtures}
+
+
+def standing_rows(queryset):
+    rows = queryset.values('team_id', *STAT_FIELDS, team_name=F('team__name'))
+    return [{'position': position, **row} for position, row in enumerate(rows, start=1)]
+
+
+class StandingsApi(ApiView):
+
+    def versions(self):
+        return [TABLE_VERSION]
+
+    def get_data(self):
+        if 'lap' not in self.kwargs:
+            return {'lap': None, 'standings': standing_rows(Standing.objects.all())}
+        # Migawki po kolejkach mają zapisaną pozycję, kolejność jest ta sama
+        rows = standing_rows(LapStanding.objects.filter(lap=self.kwargs['lap']))
+        if not rows:
+            raise Http404("Brak tabeli po tej kolejce")
+        return {'lap': self.kwargs['lap'], 'standings': rows}
+
+
+class AnalyticsApi(ApiView):
+    """Forma, podział dom/wyjazd, serie, bilans bezpośredni i przebieg różnicy bramek (football.analytics)."""
+
+    def versions(self):
+        return [TABLE_VERSION]
+
+    def get_data(self):
+        analytics = season_analytics()
+        if 'pk' not in self.kwargs:
+            return {'teams': list(analytics.values())}
+        if self.kwargs['pk'] not in analytics:
+            raise Http404("Nie ma takiej drużyny")
+        return analytics[self.kwargs['pk']]
+
+
+class LeaderboardApi(ApiView):
+    """Ranking zawodników sezonu albo kolejki (player_stats.RANKINGS): ?limit=liczba wierszy (najwyżej TOP_K)."""
+
+    def versions(self):
+        return [(STANDINGS, leaderboard_scope(self.kwargs.get('lap'))), PLAYER_NAMES_VERSION, TEAM_NAMES_VERSION]
+
+    def get_data(self):
+        category = self.kwargs['category']
+        if category not in CATEGORIES:
+            raise Http404("Nie ma takiego rankingu")
+        try:
+            limit = int(self.request.GET.get('limit', LEADERBOARD_SIZE))
+        except ValueError:
+            raise Http404("Nieprawidłowy filtr")
+        if not 1 <= limit <= TOP_K:
+            raise Http404("Nieprawidłowy filtr")
+        lap = self.kwargs.get('lap')
+        return {'category': category, 'lap': lap, 'results': leaderboard(category, lap, limit)}
+
+
+class MatchTimelineApi(ApiView):
+
+    def versions(self):
+        return [(MATCHES, f"match:{self.kwargs['pk']}"), TEAM_NAMES_VERSION, PLAYER_NAMES_VERSION]
+
+    def get_data(self):
+        match = Match.objects.filter(pk=self.kwargs['pk']).values(*MATCH_FIELDS).first()
+        if match is None:
+            raise Http404("Nie ma takiego meczu")
+        rows = list(Lineup.objects.filter(match_id=match['id']).order_by('pk')
+                    .values('team_id', 'player_id', 'is_starting', 'on_bench', player_name=F('player__name')))
+        events = list(timeline_events(match_id=match['id']))
+        # Minuty gry z już pobranych składów i wydarzeń - bez kolejnych zapytań
+        intervals = build_intervals(
+            [(match['id'], row['team_id'], row['player_id'], row['is_starting']) for row in rows],
+            [(match['id'], event['minute'], event['event_type'], event['team_id'], event['player_id'],
+              event['player_in_id']) for event in events],
+        )
+        minutes = minutes_played(intervals.get(match['id'], []))
+        lineups = {'home': [], 'away': []}
+        for row in rows:
+            row['minutes'] = minutes.get(row['player_id'], 0)
+            lineups['home' if row.pop('team_id') == match['home_team_id'] else 'away'].append(row)
+        return {'match': match, 'lineups': lineups, 'events': events}
+
+
+class SquadApi(ApiView):
+
+    def versions(self):
+        return [('default', team_scope(self.kwargs['pk'])), TEAMS_VERSION]
+
+    def get_data(self):
+        team = Team.objects.filter(pk=self.kwargs['pk']).values(*TEAM_FIELDS).first()
+        if team is None:
+            raise Http404("Nie ma takiej drużyny")
+        squad = {position: [] for position, _ in Player.POSITION}
+        for player in Player.objects.filter(team_id=team['id']).order_by('name', 'id').values(
+                'id', 'name', 'position', 'nationality', 'birth_day'):
+            squad.setdefault(player['position'], []).append(player)
+        return {'team': team, 'squad': squad}
+
+
+class KeysetApiView(LoginRequiredMixin, KeysetPaginationMixin, generic.ListView):
+    """Lista jako JSON stronicowana kursorem: {"results": [...], "next": adres następnej strony albo null}."""
+    raise_exception = True
+    http_method_names = ['get', 'head', 'options']
+    fields = ()
+
+    def get_queryset(self):
+        try:
+            return self.filter_queryset(self.model.objects.all()).values(*self.fields)
+        except (ValueError, ValidationError):
+            raise Http404("Nieprawidłowy filtr")
+
+    def filter_queryset(self, queryset):
+        return queryset
+
+    def render_to_response(self, context, **response_kwargs):
+        page = context['page_obj']
+        next_url = None
+        if page.has_next:
+            query = self.request.GET.copy()
+            query[self.cursor_kwarg] = page.next_cursor
+            next_url = self.request.build_absolute_uri(f'{self.request.path}?{query.urlencode()}')
+        return JsonResponse({'results': list(page.object_list), 'next': next_url})
+
+
+class MatchListApi(KeysetApiView):
+    model = Match
+    keyset = MATCH_KEYSET
+    fields = MATCH_FIELDS
+
+    def filter_queryset(self, queryset):
+        if 'lap' in self.request.GET:
+            queryset = queryset.filter(lap=self.request.GET['lap'])
+        if 'team' in self.request.GET:
+            team = self.request.GET['team']
+            queryset = queryset.filter(Q(home_team=team) | Q(away_team=team))
+        return queryset
+
+
+class PlayerListApi(KeysetApiView):
+    model = Player
+    keyset = PLAYER_KEYSET
+    fields = PLAYER_FIELDS
+
+    def filter_queryset(self, queryset):
+        if 'team' in self.request.GET:
+            queryset = queryset.filter(team=self.request.GET['team'])
+        if 'position' in self.request.GET:
+            queryset = queryset.filter(position=self.request.GET['position'])
+        return queryset
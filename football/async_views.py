@@ -0,0 +1,115 @@
+"""Asynchroniczne odpowiedniki widoków tylko do odczytu - dla serwera ASGI.
+
+Dane są pobierane async ORM-em i przez async API cache, a szablon (wraz z procesorami kontekstu,
+które są synchroniczne) renderujemy w wątku przez sync_to_async.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import render
+from django.views import generic
+
+from .caching import MATCH_DETAILS_TIMEOUT, acached_standings, aget_match_version
+from .fixtures import alap_fixtures, ateam_fixtures
+from .live import match_snapshot, match_stream
+from .models import Match, Standing, Team
+from .pagination import InvalidCursor
+from .squads import asquad_context
+from .views import lazy_match_details
+
+
+class AsyncReadView(generic.View):
+    template_name = None
+    http_method_names = ['get', 'head', 'options']
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def get_context_data(self):
+        raise NotImplementedError
+
+    async def get(self, request, *args, **kwargs):
+        context = await self.get_context_data()
+        return await sync_to_async(render)(request, self.template_name, context)
+
+
+async def aget_or_404(queryset, **lookups):
+    try:
+        return await queryset.aget(**lookups)
+    except queryset.model.DoesNotExist:
+        raise Http404(f"Nie znaleziono: {queryset.model._meta.verbose_name}")
+
+
+class AsyncTableView(AsyncReadView):
+    template_name = 'football/table.html'
+
+    async def get_context_data(self):
+        async def build():
+            return [standing async for standing in Standing.objects.select_related('team')]
+        return {'teams_stat': await acached_standings('table', build)}
+
+
+class AsyncLapView(AsyncReadView):
+    template_name = 'football/lap.html'
+
+    async def get_context_data(self):
+        lap = self.kwargs['pk']
+        try:
+            page = await alap_fixtures(lap, self.request.GET.get('cursor'))
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return {'matches': page.object_list, 'page_obj': page, 'is_paginated': page.has_other_pages, 'lap': lap}
+
+
+class AsyncTeamMatchesView(AsyncReadView):
+    template_name = 'football/team_matches.html'
+
+    async def get_context_data(self):
+        team = await aget_or_404(Team.objects.all(), pk=self.kwargs['pk'])
+        try:
+            page = await ateam_fixtures(team, self.request.GET.get('cursor'))
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return {'team': team, 'object': team, 'matches': page.object_list, 'page_obj': page}
+
+
+class AsyncTeamInfoView(AsyncReadView):
+    template_name = 'football/team_info.html'
+
+    async def get_context_data(self):
+        team = await aget_or_404(Team.objects.all(), pk=self.kwargs['pk'])
+        return {'team': team, 'object': team, **await asquad_context(team.pk)}
+
+
+class AsyncMatchDetailsView(AsyncReadView):
+    template_name = 'football/match_details.html'
+
+    async def get_context_data(self):
+        match = await aget_or_404(Match.objects.select_related('home_team', 'away_team'), pk=self.kwargs['pk'])
+        version = await aget_match_version(match.pk)
+        context = {'match': match, 'object': match, 'current_match': match, 'match_version': version,
+                   'match_details_timeout': MATCH_DETAILS_TIMEOUT}
+        # Składy i wydarzenia pobiera dopiero render szablonu (w wątku) i tylko wtedy, gdy fragmentu nie ma w cache
+        context.update(lazy_match_details(match))
+        return context
+
+
+class MatchStreamView(AsyncReadView):
+    """Strumień SSE wydarzeń meczu - jedno długie połączenie zamiast odświeżania całej strony.
+
+    Pod WSGI Django zbiera asynchroniczny strumień w całość przed wysłaniem, więc nieskończony strumień
+    nigdy by nie odpowiedział - tam widok zwraca skończony stan meczu, a przeglądarka łączy się ponownie.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        match = await aget_or_404(Match.objects.all(), pk=self.kwargs['pk'])
+        stream = match_stream(match.pk) if isinstance(request, ASGIRequest) else match_snapshot(match.pk)
+        response = StreamingHttpResponse(stream, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # nginx nie buforuje strumienia
+        response['X-Accel-Buffering'] = 'no'
+        return response
@@ -0,0 +1,232 @@
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+
+# Aliasy z settings.CACHES
+STANDINGS = 'standings'
+MATCHES = 'matches'
+FIXTURES = 'fixtures'
+
+MATCH_DETAILS_FRAGMENT = 'match_details'
+MATCH_DETAILS_TIMEOUT = 60 * 60
+
+_MISSING = object()
+
+# Liczniki trafień i chybień w obrębie procesu - {alias: Counter(hits=..., misses=...)}
+_stats = {}
+
+
+def record(alias, hit):
+    _stats.setdefault(alias, Counter())['hits' if hit else 'misses'] += 1
+
+
+def cache_stats():
+    return {alias: dict(counter) for alias, counter in _stats.items()}
+
+
+def reset_cache_stats():
+    _stats.clear()
+
+
+def cached(alias, key, build, timeout=None):
+    """Zwraca wartość z cache, a przy chybieniu liczy ją funkcją build i zapisuje.
+
+    timeout=None oznacza domyślny TTL aliasu z settings.CACHES.
+    """
+    cache = caches[alias]
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        record(alias, hit=True)
+        return value
+    record(alias, hit=False)
+    value = build()
+    if timeout is None:
+        cache.set(key, value)
+    else:
+        cache.set(key, value, timeout)
+    return value
+
+
+async def acached(alias, key, build, timeout=None):
+    """Asynchroniczny odpowiednik cached - build jest funkcją async."""
+    cache = caches[alias]
+    value = await cache.aget(key, _MISSING)
+    if value is not _MISSING:
+        record(alias, hit=True)
+        return value
+    record(alias, hit=False)
+    value = await build()
+    if timeout is None:
+        await cache.aset(key, value)
+    else:
+        await cache.aset(key, value, timeout)
+    return value
+
+
+def invalidate(alias, *keys):
+    caches[alias].delete_many(keys)
+
+
+def version_key(scope):
+    return f'football:{scope}:version'
+
+
+def get_version(alias, scope):
+    """Aktualna wersja danych z danego zakresu - zmienia się przy każdej zmianie tych danych."""
+    cache = caches[alias]
+    key = version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        # Wersja startuje od znacznika czasu, żeby po wyczyszczeniu cache nie wrócić do starej wartości
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(alias, scope):
+    cache = caches[alias]
+    key = version_key(scope)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def modified_key(scope):
+    return f'football:{scope}:modified'
+
+
+def bump_version(alias, scope):
+    cache = caches[alias]
+    key = version_key(scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+    cache.set(modified_key(scope), time.time(), None)
+
+
+def get_modified(alias, scope):
+    """Czas ostatniej zmiany danych z danego zakresu (UTC); nieznany czas zapamiętujemy jako teraz."""
+    cache = caches[alias]
+    key = modified_key(scope)
+    modified = cache.get(key)
+    if modified is None:
+        cache.add(key, time.time(), None)
+        modified = cache.get(key)
+    return datetime.fromtimestamp(modified, tz=timezone.utc)
+
+
+def get_match_version(match_id):
+    """Wersja meczu - zmienia się przy każdym zapisie meczu, składu, wydarzenia lub zmiany."""
+    return get_version(MATCHES, f'match:{match_id}')
+
+
+def bump_match_version(match_id):
+    bump_version(MATCHES, f'match:{match_id}')
+
+
+def get_groups_version():
+    """Wersja członkostwa w grupach - zmienia się przy każdej zmianie grup użytkowników."""
+    return get_version('default', 'groups')
+
+
+def bump_groups_version():
+    bump_version('default', 'groups')
+
+
+async def aget_match_version(match_id):
+    return await aget_version(MATCHES, f'match:{match_id}')
+
+
+def match_details_fragment_key(match_id, version):
+    return make_template_fragment_key(MATCH_DETAILS_FRAGMENT, [match_id, version])
+
+
+def is_match_details_cached(match_id, version):
+    hit = caches[MATCHES].get(match_details_fragment_key(match_id, version)) is not None
+    record(MATCHES, hit)
+    return hit
+
+
+async def ais_match_details_cached(match_id, version):
+    hit = await caches[MATCHES].aget(match_details_fragment_key(match_id, version)) is not None
+    record(MATCHES, hit)
+    return hit
+
+
+def cached_standings(key, build):
+    return cached(STANDINGS, f'{key}:{get_version(STANDINGS, "table")}', build)
+
+
+async def acached_standings(key, build):
+    return await acached(STANDINGS, f'{key}:{await aget_version(STANDINGS, "table")}', build)
+
+
+def invalidate_standings():
+    bump_version(STANDINGS, 'table')
+
+
+def cached_fixtures(key, build):
+    return cached(FIXTURES, f'{key}:{get_version(FIXTURES, "matches")}', build)
+
+
+async def acached_fixtures(key, build):
+    return await acached(FIXTURES, f'{key}:{await aget_version(FIXTURES, "matches")}', build)
+
+
+def invalidate_fixtures():
+    bump_version(FIXTURES, 'matches')
+
+
+def invalidate_teams():
+    bump_version(FIXTURES, 'teams')
+
+
+def lap_scope(lap):
+    return f'lap:{lap}'
+
+
+def bump_lap_versions(*laps):
+    """Wersja kolejki - zmienia się przy dodaniu, usunięciu lub zmianie meczu tej kolejki."""
+    for lap in {lap for lap in laps if lap is not None}:
+        bump_version(FIXTURES, lap_scope(lap))
+
+
+def team_scope(team_id):
+    return f'team:{team_id}'
+
+
+def bump_team_versions(*team_ids):
+    """Wersja drużyny - zmienia się przy zmianie jej kadry."""
+    for team_id in {team_id for team_id in team_ids if team_id is not None}:
+        bump_version('default', team_scope(team_id))
+
+
+def get_team_version(team_id):
+    return get_version('default', team_scope(team_id))
+
+
+async def aget_team_version(team_id):
+    return await aget_version('default', team_scope(team_id))
+
+
+def leaderboard_scope(lap=None):
+    return 'leaderboard:season' if lap is None else f'leaderboard:lap:{lap}'
+
+
+def bump_leaderboard_versions(*laps):
+    """Wersje rankingów kolejek i całego sezonu - zmieniają się przy bramce, kartce lub zmianie składu."""
+    laps = {lap for lap in laps if lap is not None}
+    for lap in laps:
+        bump_version(STANDINGS, leaderboard_scope(lap))
+    if laps:
+        bump_version(STANDINGS, leaderboard_scope())
+
+
+def get_leaderboard_version(lap=None):
+    return get_version(STANDINGS, leaderboard_scope(lap))
@@ -0,0 +1,29 @@
+from django.utils.functional import SimpleLazyObject
+
+from .caching import get_groups_version
+
+MODERATORS = "Moderatorzy"
+SESSION_KEY = 'football_is_moderator'
+
+
+def is_moderator(request):
+    """Czy zalogowany użytkownik należy do grupy moderatorów.
+
+    Wynik jest trzymany w sesji razem z wersją członkostwa w grupach, więc zapytanie o grupy
+    pada raz na sesję i ponownie dopiero po zmianie grup któregokolwiek użytkownika.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return False
+    version = get_groups_version()
+    stored = request.session.get(SESSION_KEY)
+    if stored is not None and stored[:2] == [user.pk, version]:
+        return stored[2]
+    flag = user.groups.filter(name=MODERATORS).exists()
+    request.session[SESSION_KEY] = [user.pk, version, flag]
+    return flag
+
+
+def moderator(request):
+    # Leniwie - strony, które nie pytają o uprawnienia, nie dotykają sesji ani bazy
+    return {'is_moderator': SimpleLazyObject(lambda: is_moderator(request))}
@@ -0,0 +1,123 @@
+import csv
+import json
+
+from .models import Event, Lineup, Match, Player
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Parquet/Arrow są opcjonalne
+    pyarrow = None
+
+# Zbiór danych -> (model, kolumny z values_list)
+DATASETS = {
+    'matches': (Match, ['id', 'lap', 'date', 'home_team_id', 'home_team__name', 'away_team_id', 'away_team__name',
+                        'home_score', 'away_score']),
+    'players': (Player, ['id', 'team_id', 'team__name', 'name', 'birth_day', 'position', 'nationality']),
+    'lineups': (Lineup, ['id', 'match_id', 'team_id', 'player_id', 'is_starting', 'on_bench']),
+    'events': (Event, ['id', 'match_id', 'team_id', 'player_id', 'event_type', 'minute', 'description',
+                       'substitution__player_in_id']),
+}
+STREAM_FORMATS = {
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+FILE_FORMATS = ['parquet', 'arrow']
+CHUNK_SIZE = 2000
+
+
+def columns(dataset):
+    # Nazwy kolumn bez ścieżek relacji, np. home_team__name -> home_team_name
+    return [field.replace('__', '_') for field in DATASETS[dataset][1]]
+
+
+def export_rows(dataset, chunk_size=CHUNK_SIZE):
+    """Krotki wierszy zbioru danych pobierane kursorem paczkami - bez tworzenia instancji modeli."""
+    model, fields = DATASETS[dataset]
+    return model.objects.order_by('id').values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def jsonl_lines(dataset, chunk_size=CHUNK_SIZE):
+    names = columns(dataset)
+    for row in export_rows(dataset, chunk_size):
+        yield json.dumps(dict(zip(names, row)), ensure_ascii=False, default=str) + "\n"
+
+
+class Echo:
+    """Bufor dla csv.writer, który zamiast zapisywać zwraca gotową linię."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(dataset, chunk_size=CHUNK_SIZE):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns(dataset))
+    for row in export_rows(dataset, chunk_size):
+        yield writer.writerow(row)
+
+
+def stream(dataset, format, chunk_size=CHUNK_SIZE):
+    if format == 'jsonl':
+        return jsonl_lines(dataset, chunk_size)
+    return csv_lines(dataset, chunk_size)
+
+
+def resolve_field(model, path):
+    *relations, name = path.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name.removesuffix('_id'))
+
+
+def arrow_type(field):
+    if field.is_relation or field.get_internal_type() in ('AutoField', 'BigAutoField', 'IntegerField',
+                                                          'PositiveIntegerField'):
+        return pyarrow.int64()
+    if field.get_internal_type() == 'DateField':
+        return pyarrow.date32()
+    if field.get_internal_type() == 'BooleanField':
+        return pyarrow.bool_()
+    return pyarrow.string()
+
+
+def arrow_schema(dataset):
+    model, fields = DATASETS[dataset]
+    return pyarrow.schema([
+        (name, arrow_type(resolve_field(model, path))) for name, path in zip(columns(dataset), fields)
+    ])
+
+
+def record_batches(dataset, schema, chunk_size=CHUNK_SIZE):
+    batch = []
+    for row in export_rows(dataset, chunk_size):
+        batch.append(row)
+        if len(batch) == chunk_size:
+            yield pyarrow.RecordBatch.from_arrays(
+                [pyarrow.array(column, type=field.type) for column, field in zip(zip(*batch), schema)], schema=schema
+            )
+            batch = []
+    if batch:
+        yield pyarrow.RecordBatch.from_arrays(
+            [pyarrow.array(column, type=field.type) for column, field in zip(zip(*batch), schema)], schema=schema
+        )
+
+
+def write_columnar(dataset, format, path, chunk_size=CHUNK_SIZE):
+    """Zapisuje zbiór danych do pliku Parquet lub Arrow IPC paczkami rekordów; wymaga pakietu pyarrow."""
+    if pyarrow is None:
+        raise RuntimeError("Eksport do Parquet/Arrow wymaga pakietu pyarrow")
+    schema = arrow_schema(dataset)
+    if format == 'parquet':
+        writer = pyarrow.parquet.ParquetWriter(path, schema)
+    else:
+        writer = pyarrow.ipc.new_file(path, schema)
+    rows = 0
+    try:
+        for batch in record_batches(dataset, schema, chunk_size):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        writer.close()
+    return rows
@@ -0,0 +1,44 @@
+from django.db.models import Q
+
+from .caching import acached_fixtures, cached_fixtures
+from .models import Match
+from .pagination import MATCH_KEYSET, PAGE_SIZE, akeyset_page, keyset_page
+
+# Kolumny potrzebne listom meczów - reszta pól meczu i drużyn nie jest pobierana
+FIXTURE_FIELDS = ('id', 'lap', 'date', 'home_score', 'away_score',
+                  'home_team__id', 'home_team__name', 'away_team__id', 'away_team__name')
+
+
+def fixtures(*filters, **lookups):
+    """Mecze z obiema drużynami w jednym zapytaniu, posortowane po kolejce i dacie."""
+    return (Match.objects.filter(*filters, **lookups)
+            .select_related('home_team', 'away_team')
+            .only(*FIXTURE_FIELDS)
+            .order_by(*MATCH_KEYSET))
+
+
+def fixtures_page(queryset, cursor=None, size=PAGE_SIZE):
+    return keyset_page(queryset, MATCH_KEYSET, cursor, size)
+
+
+def team_fixtures(team, cursor=None, size=PAGE_SIZE):
+    return cached_fixtures(f'team:{team.pk}:{size}:{cursor or ""}',
+                           lambda: fixtures_page(fixtures(Q(home_team=team) | Q(away_team=team)), cursor, size))
+
+
+def lap_fixtures(lap, cursor=None, size=PAGE_SIZE):
+    return cached_fixtures(f'lap:{lap}:{size}:{cursor or ""}', lambda: fixtures_page(fixtures(lap=lap), cursor, size))
+
+
+# Warianty async dla widoków ASGI - ten sam cache i te same klucze co wyżej
+
+async def ateam_fixtures(team, cursor=None, size=PAGE_SIZE):
+    async def build():
+        return await akeyset_page(fixtures(Q(home_team=team) | Q(away_team=team)), MATCH_KEYSET, cursor, size)
+    return await acached_fixtures(f'team:{team.pk}:{size}:{cursor or ""}', build)
+
+
+async def alap_fixtures(lap, cursor=None, size=PAGE_SIZE):
+    async def build():
+        return await akeyset_page(fixtures(lap=lap), MATCH_KEYSET, cursor, size)
+    return await acached_fixtures(f'lap:{lap}:{size}:{cursor or ""}', build)
@@ -2,6 +2,9 @@ from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
 
+from django.db.models import F
+
+from .labels import LabelledModelChoiceField, player_label
 from .models import Match, Lineup, Event, Player, Team, Substitution
 
 
@@ -86,12 +89,21 @@ class EventForm(forms.ModelForm):
 class TeamCreateEventForm(forms.ModelForm):
     def __init__(self, *args, event_type=None, players_in_match=None, players_on_bench=None, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields['player'].label_from_instance = lambda obj: obj.player.name
-        if players_in_match:
-            self.fields['player'].queryset = players_in_match
-        if event_type == "substitution" and players_on_bench:
-            self.fields['player_in'] = forms.ModelChoiceField(
+        # Etykiety opcji z tego samego zapytania co opcje - bez osobnego zapytania o każdego zawodnika
+        if players_in_match is not None:
+            self.fields['player'] = LabelledModelChoiceField(
+                queryset=players_in_match,
+                label_expressions={'player_name': F('player__name')},
+                build_label=lambda row: row['player_name'],
+                label=self.fields['player'].label,
+                required=self.fields['player'].required,
+            )
+        if event_type == "substitution" and players_on_bench is not None:
+            self.fields['player_in'] = LabelledModelChoiceField(
                 queryset=players_on_bench,
+                label_fields=('name', 'position', 'nationality', 'birth_day'),
+                label_expressions={'team_name': F('team__name')},
+                build_label=player_label,
                 label="Player In",
                 required=True
             )
@@ -0,0 +1,418 @@
+import csv
+import json
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+
+from django.db import connection, transaction
+
+from .models import Event, Lineup, Match, Player, Standing, Substitution, Team
+from .player_stats import rebuild_player_stats
+from .standings import rebuild_lap_standings, rebuild_standings
+from .caching import bump_lap_versions, bump_leaderboard_versions, bump_team_versions, invalidate_fixtures, invalidate_standings, invalidate_teams
+
+# Kolumny pliku z zawodnikami: drużyna, pozycja, imię i nazwisko, narodowość, data urodzenia (dd.mm.rr),
+# wzrost/waga, poprzedni klub i jedna kolumna nieużywana
+PLAYER_COLUMNS = 8
+POSITIONS = {code for code, _ in Player.POSITION}
+BIRTH_DATE_FORMAT = "%d.%m.%y"
+
+# Kolumny zawodnika wypełniane przez import, w kolejności krotek z player_values
+PLAYER_IMPORT_FIELDS = ('team_id', 'name', 'position', 'nationality', 'birth_day')
+
+# Klucz tożsamości zawodnika w trybie upsert i pola aktualizowane przy ponownym imporcie
+PLAYER_KEY = ('name', 'birth_day', 'nationality')
+PLAYER_UPDATE_FIELDS = ('team_id', 'position')
+TEAM_UPDATE_FIELDS = ('city', 'founded', 'stadium')
+TEAM_COLUMNS = 3
+FOUNDED_FORMAT = "%Y-%m-%d"
+# Ile kluczy naraz trafia do filtra __in przy wyszukiwaniu istniejących wierszy
+LOOKUP_BATCH = 500
+
+# Kolumny pliku CSV z wynikami meczów (składy i wydarzenia tylko w formacie JSON Lines)
+MATCH_CSV_COLUMNS = ('lap', 'date', 'home_team', 'away_team', 'home_score', 'away_score')
+MATCH_DATE_FORMAT = "%Y-%m-%d"
+EVENT_TYPES = {code for code, _ in Event.EVENT_TYPES}
+
+
+class RowError(ValueError):
+    pass
+
+
+class ImportReport:
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.rejected = []  # [(numer linii, wiersz, powód)]
+
+    def reject(self, line_number, row, reason):
+        self.rejected.append((line_number, row, reason))
+
+
+def read_rows(file, delimiter=",", skip_header=False):
+    """Strumieniowo czyta plik CSV - zwraca pary (numer linii, wiersz)."""
+    reader = csv.reader(file, delimiter=delimiter)
+    for line_number, row in enumerate(reader, start=1):
+        if skip_header and line_number == 1:
+            continue
+        if not row or not any(field.strip() for field in row):
+            continue
+        yield line_number, row
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+@lru_cache(maxsize=50000)
+def parse_birth_date(value):
+    # Daty urodzenia bardzo często się powtarzają, więc wynik parsowania zapamiętujemy
+    try:
+        return datetime.strptime(value, BIRTH_DATE_FORMAT).date()
+    except ValueError:
+        raise RowError(f"niepoprawna data urodzenia: {value!r}")
+
+
+def team_ids_by_name():
+    return {name: pk for pk, name in Team.objects.values_list('pk', 'name')}
+
+
+@lru_cache(maxsize=50000)
+def db_date(value):
+    return connection.ops.adapt_datefield_value(value)
+
+
+def player_values(row, teams):
+    """Krotka wartości zawodnika (jak PLAYER_IMPORT_FIELDS) z wiersza pliku."""
+    if len(row) < PLAYER_COLUMNS:
+        raise RowError(f"za mało kolumn ({len(row)} zamiast {PLAYER_COLUMNS})")
+    team_name, position, name, nationality, birth_date = map(str.strip, row[:5])
+    if team_name not in teams:
+        raise RowError(f"drużyna {team_name!r} nie istnieje")
+    if position not in POSITIONS:
+        raise RowError(f"nieznana pozycja {position!r}")
+    if not name:
+        raise RowError("brak imienia i nazwiska")
+    return teams[team_name], name, position, nationality, parse_birth_date(birth_date)
+
+
+def parse_player_row(row, teams):
+    return Player(**dict(zip(PLAYER_IMPORT_FIELDS, player_values(row, teams))))
+
+
+def insert_sql(model, fields):
+    columns = ', '.join(connection.ops.quote_name(model._meta.get_field(field).column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    return f"INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) VALUES ({placeholders})"
+
+
+def parse_team_row(row):
+    if len(row) < TEAM_COLUMNS:
+        raise RowError(f"za mało kolumn ({len(row)} zamiast {TEAM_COLUMNS})")
+    name, city, founded = map(str.strip, row[:3])
+    stadium = row[3].strip() if len(row) > 3 else ""
+    if not name or not city:
+        raise RowError("brak nazwy drużyny lub miasta")
+    try:
+        founded = datetime.strptime(founded, FOUNDED_FORMAT).date()
+    except ValueError:
+        raise RowError(f"niepoprawna data założenia: {founded!r}")
+    return Team(name=name, city=city, founded=founded, stadium=stadium)
+
+
+def player_key(player):
+    return tuple(getattr(player, field) for field in PLAYER_KEY)
+
+
+def existing_players(players):
+    """Istniejący zawodnicy o kluczach z paczki - {klucz: (pk, team_id, position)}."""
+    existing = {}
+    names = sorted({player.name for player in players})
+    for start in range(0, len(names), LOOKUP_BATCH):
+        queryset = Player.objects.filter(name__in=names[start:start + LOOKUP_BATCH])
+        for pk, *key_and_values in queryset.values_list('pk', *PLAYER_KEY, *PLAYER_UPDATE_FIELDS):
+            key = tuple(key_and_values[:len(PLAYER_KEY)])
+            existing[key] = (pk, *key_and_values[len(PLAYER_KEY):])
+    return existing
+
+
+def upsert_chunk(report, model, objects, existing, key, update_fields):
+    """Dzieli paczkę na nowe, zmienione i niezmienione obiekty; nowe wstawia, zmienione aktualizuje."""
+    to_create, to_update = [], []
+    for obj in objects.values():
+        current = existing.get(key(obj))
+        if current is None:
+            to_create.append(obj)
+        elif tuple(getattr(obj, field) for field in update_fields) == tuple(current[1:]):
+            report.unchanged += 1
+        else:
+            obj.pk = current[0]
+            to_update.append(obj)
+    with transaction.atomic():
+        model.objects.bulk_create(to_create)
+        if to_update:
+            model.objects.bulk_update(to_update, [field.removesuffix('_id') for field in update_fields])
+    report.inserted += len(to_create)
+    report.updated += len(to_update)
+    return to_create
+
+
+def parse_chunk(report, chunk, parse):
+    objects = []
+    for line_number, row in chunk:
+        try:
+            objects.append(parse(row))
+        except RowError as error:
+            report.reject(line_number, row, str(error))
+    return objects
+
+
+def upsert_players(rows, batch_size=5000):
+    """Import idempotentny - zawodnik o tym samym (nazwisko, data urodzenia, narodowość) jest aktualizowany, nie dublowany."""
+    report = ImportReport()
+    teams = team_ids_by_name()
+    touched_teams = set()
+    for chunk in chunked(rows, batch_size):
+        # W obrębie paczki wygrywa ostatni wiersz z danym kluczem
+        players = {player_key(player): player for player in parse_chunk(report, chunk, lambda row: parse_player_row(row, teams))}
+        existing = existing_players(players.values())
+        touched_teams |= {player.team_id for player in players.values()} | {current[1] for current in existing.values()}
+        upsert_chunk(report, Player, players, existing, player_key, PLAYER_UPDATE_FIELDS)
+    if report.inserted or report.updated:
+        # bulk_update nie wysyła sygnałów - kadry drużyn unieważniamy sami
+        bump_team_versions(*touched_teams)
+    return report
+
+
+def upsert_teams(rows, batch_size=LOOKUP_BATCH):
+    """Import drużyn kluczowany nazwą - nowe drużyny dostają pusty wiersz tabeli."""
+    report = ImportReport()
+    created = []
+    for chunk in chunked(rows, batch_size):
+        teams = {team.name: team for team in parse_chunk(report, chunk, parse_team_row)}
+        existing = {
+            name: (pk, *values)
+            for pk, name, *values in Team.objects.filter(name__in=list(teams)).values_list('pk', 'name', *TEAM_UPDATE_FIELDS)
+        }
+        created += upsert_chunk(report, Team, teams, existing, lambda team: team.name, TEAM_UPDATE_FIELDS)
+    if created:
+        # bulk_create nie wysyła sygnałów, więc wiersze tabeli tworzymy sami
+        created_ids = Team.objects.filter(name__in=[team.name for team in created]).values_list('pk', flat=True)
+        Standing.objects.bulk_create([Standing(team_id=team_id) for team_id in created_ids], ignore_conflicts=True)
+        if Match.objects.exists():
+            rebuild_lap_standings()
+    if report.inserted or report.updated:
+        invalidate_standings()
+        invalidate_fixtures()
+        invalidate_teams()
+    return report
+
+
+def import_players(rows, batch_size=5000):
+    """Importuje zawodników z par (numer linii, wiersz) paczkami - jedna transakcja i jedno executemany na paczkę.
+
+    Wiersze idą do kursora jako gotowe krotki: bulk_create kompilowałby SQL dla każdej wartości każdego obiektu,
+    co przy milionie zawodników zajmuje większość czasu importu. Import nie wysyła sygnałów, tak jak bulk_create.
+    """
+    report = ImportReport()
+    teams = team_ids_by_name()
+    touched_teams = set()
+    sql = insert_sql(Player, PLAYER_IMPORT_FIELDS)
+    for chunk in chunked(rows, batch_size):
+        players = [
+            (team_id, name, position, nationality, db_date(birth_day))
+            for team_id, name, position, nationality, birth_day in parse_chunk(
+                report, chunk, lambda row: player_values(row, teams))
+        ]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, players)
+        report.inserted += len(players)
+        touched_teams |= {player[0] for player in players}
+    bump_team_versions(*touched_teams)
+    return report
+
+
+def read_match_records(file, format, delimiter=",", skip_header=False):
+    """Strumieniowo czyta mecze z pliku JSON Lines lub CSV - zwraca pary (numer linii, surowy rekord)."""
+    if format == 'csv':
+        for line_number, row in read_rows(file, delimiter=delimiter, skip_header=skip_header):
+            yield line_number, row
+        return
+    for line_number, line in enumerate(file, start=1):
+        if line.strip():
+            yield line_number, line
+
+
+def match_record(raw):
+    if isinstance(raw, list):
+        if len(raw) < len(MATCH_CSV_COLUMNS):
+            raise RowError(f"za mało kolumn ({len(raw)} zamiast {len(MATCH_CSV_COLUMNS)})")
+        return dict(zip(MATCH_CSV_COLUMNS, (field.strip() for field in raw)))
+    try:
+        record = json.loads(raw)
+    except json.JSONDecodeError as error:
+        raise RowError(f"niepoprawny JSON: {error.msg}")
+    if not isinstance(record, dict):
+        raise RowError("rekord meczu musi być obiektem JSON")
+    return record
+
+
+def player_ids_by_team_and_name():
+    """{(team_id, nazwisko): player_id}; przy dwóch zawodnikach o tym samym nazwisku w drużynie - None."""
+    players = {}
+    for pk, team_id, name in Player.objects.filter(team__isnull=False).values_list('pk', 'team_id', 'name').iterator():
+        key = (team_id, name)
+        players[key] = None if key in players else pk
+    return players
+
+
+def parse_int(record, field, minimum):
+    try:
+        value = int(record[field])
+    except (KeyError, TypeError, ValueError):
+        raise RowError(f"pole {field} musi być liczbą całkowitą")
+    if value < minimum:
+        raise RowError(f"pole {field} musi być >= {minimum}")
+    return value
+
+
+class MatchBundle:
+    """Mecz z jego składami i wydarzeniami, gotowy do zapisu paczkami."""
+
+    def __init__(self, match):
+        self.match = match
+        self.lineups = {}  # {player_id: Lineup}
+        self.events = []  # [(Event, player_in_id)]
+
+
+def parse_match_record(raw, teams, players):
+    record = match_record(raw)
+    for field in ('home_team', 'away_team'):
+        if not isinstance(record.get(field), str):
+            raise RowError(f"pole {field} musi być nazwą drużyny")
+    home_team_id = teams.get(record['home_team'])
+    away_team_id = teams.get(record['away_team'])
+    if home_team_id is None or away_team_id is None:
+        raise RowError(f"nieznana drużyna: {record.get('home_team')!r} - {record.get('away_team')!r}")
+    if home_team_id == away_team_id:
+        raise RowError("drużyna gości nie może być taka sama jak drużyna gospodarzy")
+    try:
+        match_date = datetime.strptime(str(record.get('date')), MATCH_DATE_FORMAT).date()
+    except ValueError:
+        raise RowError(f"niepoprawna data meczu: {record.get('date')!r}")
+    bundle = MatchBundle(Match(
+        home_team_id=home_team_id,
+        away_team_id=away_team_id,
+        date=match_date,
+        lap=parse_int(record, 'lap', 1),
+        home_score=parse_int(record, 'home_score', 0),
+        away_score=parse_int(record, 'away_score', 0),
+    ))
+    side_teams = {'home': home_team_id, 'away': away_team_id}
+
+    def resolve(side, name):
+        if not isinstance(side, str) or side not in side_teams:
+            raise RowError(f"nieznana strona {side!r} (home/away)")
+        if not isinstance(name, str):
+            raise RowError(f"zawodnik musi być podany nazwiskiem, a nie {name!r}")
+        key = (side_teams[side], name)
+        if key not in players:
+            raise RowError(f"zawodnik {name!r} nie należy do drużyny {record[side + '_team']!r}")
+        if players[key] is None:
+            raise RowError(f"niejednoznaczny zawodnik {name!r}")
+        return side_teams[side], players[key]
+
+    lineups = record.get('lineups') or {}
+    if not isinstance(lineups, dict):
+        raise RowError("pole lineups musi być obiektem {home: [...], away: [...]}")
+    for side, entries in lineups.items():
+        if not isinstance(entries, list):
+            raise RowError(f"skład {side!r} musi być listą")
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {'player': entry}
+            elif not isinstance(entry, dict):
+                raise RowError(f"niepoprawny wpis składu {entry!r}")
+            team_id, player_id = resolve(side, entry.get('player'))
+            bundle.lineups[player_id] = Lineup(
+                team_id=team_id,
+                player_id=player_id,
+                is_starting=bool(entry.get('is_starting', True)),
+                on_bench=bool(entry.get('on_bench', False)),
+            )
+
+    events = record.get('events') or []
+    if not isinstance(events, list):
+        raise RowError("pole events musi być listą")
+    for entry in events:
+        if not isinstance(entry, dict):
+            raise RowError(f"niepoprawne wydarzenie {entry!r}")
+        if not isinstance(entry.get('event_type'), str) or entry['event_type'] not in EVENT_TYPES:
+            raise RowError(f"nieznany typ wydarzenia {entry.get('event_type')!r}")
+        team_id, player_id = resolve(entry.get('team'), entry.get('player'))
+        player_in_id = None
+        # Zmiana i czerwona kartka zmieniają skład tak samo jak w TeamCreateEventView
+        if entry['event_type'] in ('substitution', 'red_card') and player_id in bundle.lineups:
+            bundle.lineups[player_id].on_bench = True
+        if entry['event_type'] == 'substitution':
+            _, player_in_id = resolve(entry.get('team'), entry.get('player_in'))
+            bundle.lineups.setdefault(player_in_id, Lineup(team_id=team_id, player_id=player_in_id, is_starting=False))
+        bundle.events.append((Event(
+            team_id=team_id,
+            player_id=player_id,
+            event_type=entry['event_type'],
+            minute=parse_int(entry, 'minute', 0),
+            description=entry.get('description'),
+        ), player_in_id))
+    return bundle
+
+
+def save_match_bundles(bundles):
+    """Zapisuje paczkę meczów w kolejności zależności: Match -> Lineup -> Event -> Substitution."""
+    with transaction.atomic():
+        Match.objects.bulk_create([bundle.match for bundle in bundles])
+        lineups, events = [], []
+        for bundle in bundles:
+            for lineup in bundle.lineups.values():
+                lineup.match = bundle.match
+                lineups.append(lineup)
+            for event, _ in bundle.events:
+                event.match = bundle.match
+                events.append(event)
+        Lineup.objects.bulk_create(lineups)
+        Event.objects.bulk_create(events)
+        Substitution.objects.bulk_create([
+            Substitution(event=event, player_in_id=player_in_id)
+            for bundle in bundles for event, player_in_id in bundle.events if player_in_id is not None
+        ])
+
+
+def import_matches(records, batch_size=1000):
+    """Importuje mecze ze składami i wydarzeniami paczkami, a na końcu przelicza tabele."""
+    report = ImportReport()
+    teams = team_ids_by_name()
+    players = player_ids_by_team_and_name()
+    laps = set()
+    for chunk in chunked(records, batch_size):
+        bundles = []
+        for line_number, raw in chunk:
+            try:
+                bundles.append(parse_match_record(raw, teams, players))
+            except RowError as error:
+                report.reject(line_number, raw if isinstance(raw, list) else [raw.rstrip("\n")], str(error))
+        save_match_bundles(bundles)
+        report.inserted += len(bundles)
+        laps |= {bundle.match.lap for bundle in bundles}
+    if report.inserted:
+        # bulk_create nie wysyła sygnałów - tabele i cache odświeżamy raz po całym imporcie
+        rebuild_standings()
+        rebuild_lap_standings()
+        rebuild_player_stats()
+        invalidate_standings()
+        invalidate_fixtures()
+        bump_lap_versions(*laps)
+        bump_leaderboard_versions(*laps)
+    return report
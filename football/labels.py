@@ -0,0 +1,150 @@
+import threading
+from collections import OrderedDict
+
+from django import forms
+from django.conf import settings
+from django.forms.models import ModelChoiceIterator, ModelChoiceIteratorValue
+
+from .caching import bump_version, get_version
+
+# Ile nazw trzyma proces na każdy rodzaj etykiety
+LABEL_CACHE_SIZE = 4096
+
+TEAMS = 'teams'
+PLAYERS = 'players'
+MATCHES = 'matches'
+
+
+class LabelCache:
+    """Ograniczony cache LRU etykiet w pamięci procesu, z kluczami (id, wersja)."""
+
+    def __init__(self, maxsize=LABEL_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_many(self, keys):
+        found = {}
+        with self.lock:
+            for key in keys:
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+                    found[key] = self.entries[key]
+        return found
+
+    def set_many(self, values):
+        with self.lock:
+            self.entries.update(values)
+            for key in values:
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+_caches = {TEAMS: LabelCache(), PLAYERS: LabelCache(), MATCHES: LabelCache()}
+
+
+def labels_version(kind):
+    return get_version('default', f'labels:{kind}')
+
+
+def invalidate_labels(*kinds):
+    # Stare wpisy zostają w LRU pod nieaktualną wersją i wypadają same
+    for kind in kinds:
+        bump_version('default', f'labels:{kind}')
+
+
+def clear_label_caches():
+    for cache in _caches.values():
+        cache.clear()
+
+
+def _load_team_names(ids):
+    from .models import Team
+    return dict(Team.objects.filter(pk__in=ids).values_list('pk', 'name'))
+
+
+def _load_player_names(ids):
+    from .models import Player
+    return dict(Player.objects.filter(pk__in=ids).values_list('pk', 'name'))
+
+
+def _load_match_labels(ids):
+    from .models import Match
+    rows = Match.objects.filter(pk__in=ids).values_list('pk', 'home_team__name', 'away_team__name')
+    return {pk: match_label(home, away) for pk, home, away in rows}
+
+
+_loaders = {TEAMS: _load_team_names, PLAYERS: _load_player_names, MATCHES: _load_match_labels}
+
+
+def labels(kind, ids):
+    """{id: etykieta} - brakujące w LRU etykiety są pobierane jednym zapytaniem (bez SPORT_LABEL_CACHE - wszystkie)."""
+    ids = {pk for pk in ids if pk is not None}
+    if not settings.SPORT_LABEL_CACHE:
+        return _loaders[kind](ids)
+    version = labels_version(kind)
+    cache = _caches[kind]
+    found = {key[0]: value for key, value in cache.get_many([(pk, version) for pk in ids]).items()}
+    missing = ids - found.keys()
+    if missing:
+        loaded = _loaders[kind](missing)
+        cache.set_many({(pk, version): label for pk, label in loaded.items()})
+        found.update(loaded)
+    return found
+
+
+def label(kind, pk):
+    return labels(kind, [pk]).get(pk) if pk is not None else None
+
+
+def related_label(instance, field_name, kind):
+    """Etykieta obiektu z klucza obcego - z już pobranej relacji albo z LRU, bez leniwego zapytania o cały obiekt."""
+    field = instance._meta.get_field(field_name)
+    if field.is_cached(instance):
+        related = getattr(instance, field_name)
+        if related is None:
+            return None
+        return str(related) if kind == MATCHES else related.name
+    return label(kind, getattr(instance, field.attname))
+
+
+def match_label(home_team_name, away_team_name):
+    return f"{home_team_name} vs {away_team_name}"
+
+
+def player_label(row):
+    """Etykieta jak w Player.__str__, z wiersza values() z polami zawodnika i team_name."""
+    from .models import Player
+    team_name = row['team_name'] or "Brak drużyny"
+    position = dict(Player.POSITION).get(row['position'], row['position'])
+    return f"{row['name']} ({team_name}) - {position} - {row['nationality']} - {row['birth_day']}"
+
+
+class ValuesChoiceIterator(ModelChoiceIterator):
+    """Opcje z jednego zapytania values() zamiast z instancji modelu i ich __str__."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for row in self.queryset.values('pk', *self.field.label_fields, **self.field.label_expressions):
+            yield ModelChoiceIteratorValue(row['pk'], row), self.field.build_label(row)
+
+
+class LabelledModelChoiceField(forms.ModelChoiceField):
+    """ModelChoiceField, którego etykiety powstają z kolumn pobranych w tym samym zapytaniu.
+
+    label_fields to pola modelu, label_expressions - adnotacje, np. {'player_name': F('player__name')};
+    build_label(row) składa z wiersza values() etykietę.
+    """
+    iterator = ValuesChoiceIterator
+
+    def __init__(self, queryset, *, build_label, label_fields=(), label_expressions=None, **kwargs):
+        self.label_fields = tuple(label_fields)
+        self.label_expressions = label_expressions or {}
+        self.build_label = build_label
+        super().__init__(queryset, **kwargs)
@@ -0,0 +1,73 @@
+"""Rankingi zawodników (RANKINGS z football.player_stats) po kolejkach i w całym sezonie.
+
+Dla każdej kolejki statystyki zawodników liczy compute_player_stats z meczów tej kolejki, a wynik trafia do cache
+pod wersją kolejki razem z gotową czołówką TOP_K wybraną kopcem (heapq.nsmallest - bez sortowania wszystkich).
+Zmiana składu lub wydarzenia podbija wersję tylko swojej kolejki, więc ranking sezonu sumuje statystyki kolejek
+z cache, a z bazy liczy jedynie kolejkę, która się zmieniła. Suma kolejek to te same liczby co PlayerSeasonStats,
+a kolejność ustala ten sam ranking_key co na stronie statystyk.
+"""
+import heapq
+
+from .caching import STANDINGS, cached, get_leaderboard_version, leaderboard_scope
+from .models import Match, Player
+from .player_stats import RANKINGS, compute_player_stats, empty_stats, is_ranked, ranked_fields, ranking_key
+
+CATEGORIES = list(RANKINGS)
+TOP_K = 100
+
+
+def top_k(stats, category, k=TOP_K):
+    """Czołówka k id zawodników rankingu wybrana kopcem w O(n log k)."""
+    return heapq.nsmallest(k, (player_id for player_id, record in stats.items() if is_ranked(category, record)),
+                           key=ranking_key(category, stats))
+
+
+def lap_stats(lap):
+    return compute_player_stats(match_ids=Match.objects.filter(lap=lap).values_list('pk', flat=True))
+
+
+def build_board(stats):
+    return {'stats': stats, 'top': {category: top_k(stats, category) for category in CATEGORIES}}
+
+
+def lap_board(lap):
+    return cached(STANDINGS, f'{leaderboard_scope(lap)}:{get_leaderboard_version(lap)}',
+                  lambda: build_board(lap_stats(lap)))
+
+
+def season_board():
+    def build():
+        stats = {}
+        for lap in Match.objects.values_list('lap', flat=True).distinct().order_by('lap'):
+            for player_id, lap_record in lap_board(lap)['stats'].items():
+                record = stats.setdefault(player_id, empty_stats())
+                for field, value in lap_record.items():
+                    record[field] += value
+        return build_board(stats)
+    return cached(STANDINGS, f'{leaderboard_scope()}:{get_leaderboard_version()}', build)
+
+
+def leaderboard(category, lap=None, limit=TOP_K):
+    """Ranking kolejki albo całego sezonu (lap=None) ze statystykami i nazwami zawodników.
+
+    Zawodnicy z równymi wartościami pól sortowanych malejąco dzielą miejsce.
+    """
+    board = season_board() if lap is None else lap_board(lap)
+    leaders = board['top'][category][:limit]
+    players = {row['id']: row for row in Player.objects.filter(pk__in=leaders)
+               .values('id', 'name', 'team_id', 'team__name')}
+    fields = ranked_fields(category)
+    rows, previous = [], None
+    for position, player_id in enumerate(leaders, start=1):
+        record = board['stats'][player_id]
+        tie = tuple(record[field] for field in fields)
+        rank = rows[-1]['rank'] if tie == previous else position
+        previous = tie
+        player = players.get(player_id, {})
+        rows.append({'rank': rank, 'player_id': player_id, 'name': player.get('name'), 'team_id': player.get('team_id'),
+                     'team_name': player.get('team__name'), **record})
+    return rows
+
+
+def match_lap(match_id):
+    return Match.objects.filter(pk=match_id).values_list('lap', flat=True).first()
@@ -0,0 +1,30 @@
+from django.db import transaction
+
+from .caching import bump_leaderboard_versions, bump_match_version
+from .models import Lineup
+from .player_stats import refresh_after_commit
+
+
+def save_lineup(match, team, player_ids):
+    """Zapisuje skład drużyny w meczu: dodaje nowych zawodników i usuwa odznaczonych.
+
+    Różnica liczona jest na zbiorach id, a zmiany idą jednym bulk_create i jednym delete w transakcji.
+    Zwraca parę (dodani, usunięci).
+    """
+    submitted = set(player_ids)
+    with transaction.atomic():
+        current = set(Lineup.objects.filter(match=match, team=team).values_list('player_id', flat=True))
+        to_remove = current - submitted
+        to_add = submitted - current
+        if to_remove:
+            Lineup.objects.filter(match=match, team=team, player_id__in=to_remove).delete()
+        if to_add:
+            Lineup.objects.bulk_create([
+                Lineup(match=match, team=team, player_id=player_id) for player_id in sorted(to_add)
+            ])
+    if to_add:
+        # bulk_create nie wysyła sygnałów, więc wersję meczu, ranking kolejki i statystyki zawodników odświeżamy ręcznie
+        bump_match_version(match.pk)
+        bump_leaderboard_versions(match.lap)
+        refresh_after_commit(*to_add)
+    return to_add, to_remove
@@ -0,0 +1,212 @@
+"""Relacja meczu na żywo - nowe wydarzenia rozsyłane do widzów przez Server-Sent Events.
+
+Zapis wydarzenia lub zmiany publikuje (po zatwierdzeniu transakcji) komunikat na kanale meczu,
+a każdy otwarty strumień SSE tego meczu dostaje go przez subskrypcję brokera.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+
+from .models import Event
+
+KEEPALIVE = 15
+QUEUE_SIZE = 100
+RETRY_MS = 3000
+# Pod WSGI odpowiedź strumieniowa nie może trwać bez końca (zajmowałaby wątek workera), więc widz dostaje
+# sam stan meczu, a przeglądarka pyta ponownie po WSGI_RETRY_MS
+WSGI_RETRY_MS = 15000
+
+
+def channel(match_id):
+    return f'match:{match_id}'
+
+
+def timeline_events(**filters):
+    """Wydarzenia meczu z nazwiskami zawodników, w kolejności minut - jedno zapytanie."""
+    return (Event.objects.filter(**filters).order_by('minute', 'pk')
+            .values('id', 'minute', 'event_type', 'team_id', 'player_id', 'description',
+                    player_name=F('player__name'), player_in_id=F('substitution__player_in_id'),
+                    player_in_name=F('substitution__player_in__name')))
+
+
+class LocalSubscription:
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+
+    def deliver(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Zbyt wolny widz traci komunikat - po ponownym połączeniu dostanie pełny stan meczu
+            pass
+
+    async def start(self):
+        pass
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """Pub/sub w pamięci procesu. Publikować można z dowolnego wątku, odbiór jest w pętli asyncio subskrybenta."""
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = LocalSubscription(self, channel)
+        with self.lock:
+            self.subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscribers[subscription.channel]
+
+    def publish(self, channel, message):
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # Pętla subskrybenta już zamknięta
+                self.unsubscribe(subscription)
+
+
+class CacheSubscription:
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        # Pozycję ustala dopiero start() lub pierwsze get() - synchroniczny odczyt cache (redis, pliki)
+        # w generatorze strumienia zablokowałby pętlę zdarzeń
+        self.position = None
+
+    async def start(self):
+        if self.position is None:
+            self.position = await self.broker.cache.aget(self.broker.sequence_key(self.channel), 0)
+
+    async def get(self):
+        await self.start()
+        while True:
+            last = await self.broker.cache.aget(self.broker.sequence_key(self.channel), 0)
+            while self.position < last:
+                self.position += 1
+                message = await self.broker.cache.aget(self.broker.message_key(self.channel, self.position))
+                if message is not None:
+                    return message
+            await asyncio.sleep(self.broker.poll_interval)
+
+    def close(self):
+        pass
+
+
+class CacheBroker:
+    """Pub/sub przez wspólny cache dla kilku workerów: komunikaty są numerowane licznikiem incr,
+    a subskrybenci odpytują cache co poll_interval sekund.
+
+    Z Redisem licznik jest atomowy; cache plikowy nadaje się do jednego serwera z małą liczbą publikujących.
+    """
+
+    def __init__(self, alias='default', poll_interval=0.5, ttl=60 * 60):
+        self.cache = caches[alias]
+        self.poll_interval = poll_interval
+        self.ttl = ttl
+
+    def sequence_key(self, channel):
+        return f'football:live:{channel}:sequence'
+
+    def message_key(self, channel, number):
+        return f'football:live:{channel}:{number}'
+
+    def subscribe(self, channel):
+        return CacheSubscription(self, channel)
+
+    def publish(self, channel, message):
+        key = self.sequence_key(channel)
+        self.cache.add(key, 0, self.ttl)
+        number = self.cache.incr(key)
+        self.cache.set(self.message_key(channel, number), message, self.ttl)
+
+
+BROKERS = {'local': LocalBroker, 'cache': CacheBroker}
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = BROKERS[settings.SPORT_LIVE_BROKER]()
+    return _broker
+
+
+def publish_event(event_id, match_id):
+    """Po zatwierdzeniu transakcji wysyła aktualny stan wydarzenia widzom meczu."""
+    def publish():
+        row = timeline_events(pk=event_id).first()
+        if row is not None:
+            get_broker().publish(channel(match_id), {'type': 'event', 'data': row})
+    transaction.on_commit(publish)
+
+
+def publish_event_removed(event_id, match_id):
+    transaction.on_commit(
+        lambda: get_broker().publish(channel(match_id), {'type': 'event_removed', 'data': {'id': event_id}})
+    )
+
+
+def sse(kind, data):
+    return f"event: {kind}\nid: {data['id']}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
+
+
+# Początek każdego połączenia - przeglądarka czyści listę, bo zaraz dostanie pełny stan meczu
+# (po ponownym połączeniu nie zostają na niej wydarzenia usunięte w międzyczasie)
+RESET = "event: reset\ndata: {}\n\n"
+
+
+def match_snapshot(match_id):
+    """Skończony strumień SSE dla serwera WSGI: dotychczasowe wydarzenia meczu i koniec odpowiedzi."""
+    yield f"retry: {WSGI_RETRY_MS}\n\n"
+    yield RESET
+    for row in timeline_events(match_id=match_id):
+        yield sse('event', row)
+
+
+async def match_stream(match_id, broker=None, keepalive=KEEPALIVE):
+    """Strumień SSE meczu (ASGI): najpierw wszystkie dotychczasowe wydarzenia, potem nowe w miarę zapisywania."""
+    # Subskrypcja przed odczytem stanu - nic zapisanego w międzyczasie nie przepadnie
+    subscription = (broker or get_broker()).subscribe(channel(match_id))
+    try:
+        await subscription.start()
+        yield f"retry: {RETRY_MS}\n\n"
+        yield RESET
+        async for row in timeline_events(match_id=match_id):
+            yield sse('event', row)
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield sse(message['type'], message['data'])
+    finally:
+        subscription.close()
@@ -0,0 +1,54 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from football.importers import read_rows
+
+
+class ImportCommand(BaseCommand):
+    """Wspólna część komend importu z CSV: opcje pliku, raport odrzuconych wierszy i podsumowanie."""
+
+    default_batch_size = 5000
+    noun = "wierszy"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="ścieżka do pliku CSV")
+        parser.add_argument('--batch-size', type=int, default=self.default_batch_size,
+                            help="liczba wierszy na paczkę i transakcję")
+        parser.add_argument('--delimiter', default=",")
+        parser.add_argument('--encoding', default="utf-8")
+        parser.add_argument('--skip-header', action='store_true', help="pomija pierwszy wiersz pliku")
+        parser.add_argument('--rejects', help="zapisuje odrzucone wiersze z powodem do pliku CSV")
+
+    def read(self, file, options):
+        return read_rows(file, delimiter=options['delimiter'], skip_header=options['skip_header'])
+
+    def run_import(self, rows, options):
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0:
+            raise CommandError("--batch-size musi być dodatnie")
+        start = time.perf_counter()
+        try:
+            with open(options['path'], encoding=options['encoding'], newline="") as file:
+                rows = self.read(file, options)
+                report = self.run_import(rows, options)
+        except OSError as error:
+            raise CommandError(f"Nie można otworzyć pliku: {error}")
+
+        for line_number, _, reason in report.rejected[:20]:
+            self.stderr.write(f"linia {line_number}: {reason}")
+        if len(report.rejected) > 20:
+            self.stderr.write(f"... i {len(report.rejected) - 20} kolejnych odrzuconych wierszy")
+        if options['rejects']:
+            with open(options['rejects'], "w", encoding="utf-8", newline="") as file:
+                writer = csv.writer(file)
+                for line_number, row, reason in report.rejected:
+                    writer.writerow([line_number, reason, *row])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Dodano {report.inserted}, zaktualizowano {report.updated}, bez zmian {report.unchanged} {self.noun}, "
+            f"odrzucono {len(report.rejected)} wierszy ({time.perf_counter() - start:.1f} s)."
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from football.standings import check_standings
+
+
+class Command(BaseCommand):
+    help = "Sprawdza, czy zapisana tabela ligowa zgadza się z wynikami meczów."
+
+    def handle(self, *args, **options):
+        problems = check_standings()
+        for team_id, field, stored, expected in problems:
+            self.stderr.write(f"drużyna {team_id}: {field} = {stored}, powinno być {expected}")
+        if problems:
+            raise CommandError(f"Tabela jest niespójna ({len(problems)} rozbieżności), uruchom rebuild_standings.")
+        self.stdout.write(self.style.SUCCESS("Tabela jest spójna z wynikami meczów."))
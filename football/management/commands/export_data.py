@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from football.exports import DATASETS, FILE_FORMATS, STREAM_FORMATS, pyarrow, stream, write_columnar
+
+
+class Command(BaseCommand):
+    help = ("Eksportuje mecze, zawodników, składy lub wydarzenia do JSON Lines, CSV, Parquet albo Arrow IPC. "
+            "JSON Lines i CSV mogą iść na standardowe wyjście, Parquet i Arrow wymagają --output i pakietu pyarrow.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(DATASETS))
+        parser.add_argument('--format', choices=[*STREAM_FORMATS, *FILE_FORMATS], default='jsonl')
+        parser.add_argument('--output', '-o', help="plik wynikowy; domyślnie standardowe wyjście")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="ile wierszy pobierać z bazy naraz")
+
+    def handle(self, *args, **options):
+        dataset, format, output = options['dataset'], options['format'], options['output']
+        if format in FILE_FORMATS:
+            if pyarrow is None:
+                raise CommandError("Eksport do Parquet/Arrow wymaga pakietu pyarrow (pip install pyarrow)")
+            if not output:
+                raise CommandError(f"Format {format} wymaga podania --output")
+            rows = write_columnar(dataset, format, output, chunk_size=options['chunk_size'])
+        else:
+            lines = stream(dataset, format, chunk_size=options['chunk_size'])
+            if not output:
+                for line in lines:
+                    self.stdout.write(line, ending='')
+                return
+            rows = 0
+            with open(output, 'w', encoding='utf-8', newline='') as file:
+                if format == 'csv':
+                    file.write(next(lines))  # nagłówek
+                for line in lines:
+                    file.write(line)
+                    rows += 1
+        self.stdout.write(self.style.SUCCESS(f"Wyeksportowano {rows} wierszy ({dataset}) do {output}"))
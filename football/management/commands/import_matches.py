@@ -0,0 +1,23 @@
+from pathlib import Path
+
+from football.importers import import_matches, read_match_records
+from football.management.base import ImportCommand
+
+
+class Command(ImportCommand):
+    help = ("Importuje mecze z pliku JSON Lines (wynik, składy i wydarzenia, jeden mecz na linię) "
+            "lub CSV (kolejka, data RRRR-MM-DD, gospodarze, goście, bramki gospodarzy, bramki gości).")
+    default_batch_size = 1000
+    noun = "meczów"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--format', choices=['jsonl', 'csv'],
+                            help="format pliku; domyślnie na podstawie rozszerzenia (.csv albo JSON Lines)")
+
+    def read(self, file, options):
+        format = options['format'] or ('csv' if Path(options['path']).suffix.lower() == '.csv' else 'jsonl')
+        return read_match_records(file, format, delimiter=options['delimiter'], skip_header=options['skip_header'])
+
+    def run_import(self, rows, options):
+        return import_matches(rows, batch_size=options['batch_size'])
@@ -0,0 +1,17 @@
+from football.importers import import_players, upsert_players
+from football.management.base import ImportCommand
+
+
+class Command(ImportCommand):
+    help = "Importuje zawodników z pliku CSV (drużyna, pozycja, nazwisko, narodowość, data urodzenia dd.mm.rr, ...)."
+    noun = "zawodników"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--upsert', action='store_true',
+                            help="aktualizuje zawodników o tym samym nazwisku, dacie urodzenia i narodowości zamiast ich dublować")
+
+    def run_import(self, rows, options):
+        if options['upsert']:
+            return upsert_players(rows, batch_size=options['batch_size'])
+        return import_players(rows, batch_size=options['batch_size'])
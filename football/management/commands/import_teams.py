@@ -0,0 +1,11 @@
+from football.importers import LOOKUP_BATCH, upsert_teams
+from football.management.base import ImportCommand
+
+
+class Command(ImportCommand):
+    help = "Importuje lub aktualizuje drużyny z pliku CSV (nazwa, miasto, data założenia RRRR-MM-DD, stadion)."
+    default_batch_size = LOOKUP_BATCH
+    noun = "drużyn"
+
+    def run_import(self, rows, options):
+        return upsert_teams(rows, batch_size=options['batch_size'])
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from football.player_stats import rebuild_player_stats
+
+
+class Command(BaseCommand):
+    help = "Przelicza od zera statystyki zawodników (model PlayerSeasonStats) ze składów, wydarzeń i zmian."
+
+    def handle(self, *args, **options):
+        players = rebuild_player_stats()
+        self.stdout.write(self.style.SUCCESS(f"Przeliczono statystyki {players} zawodników."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from football.standings import rebuild_lap_standings, rebuild_standings
+
+
+class Command(BaseCommand):
+    help = "Przelicza od zera tabelę ligową (model Standing) i migawki tabeli po każdej kolejce (LapStanding)."
+
+    def handle(self, *args, **options):
+        teams = rebuild_standings()
+        snapshots = rebuild_lap_standings()
+        self.stdout.write(self.style.SUCCESS(
+            f"Przeliczono tabelę ({teams} drużyn z meczami) i {snapshots} wierszy tabel po kolejkach."
+        ))
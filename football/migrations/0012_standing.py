@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+STAT_FIELDS = ('matches', 'wins', 'draws', 'loses', 'goals_scored', 'goals_conceded', 'goals_difference', 'points')
+RESULT_FIELDS = ('home_team_id', 'away_team_id', 'home_score', 'away_score')
+
+
+def empty_record():
+    return dict.fromkeys(STAT_FIELDS, 0)
+
+
+def add_result(table, result):
+    # Kopia football.standings z chwili tej migracji - migracja nie może zależeć od bieżącego kodu aplikacji
+    home_team_id, away_team_id, home_score, away_score = result
+    for team_id, scored, conceded in ((home_team_id, home_score, away_score), (away_team_id, away_score, home_score)):
+        record = table.setdefault(team_id, empty_record())
+        record['matches'] += 1
+        record['wins'] += scored > conceded
+        record['draws'] += scored == conceded
+        record['loses'] += scored < conceded
+        record['goals_scored'] += scored
+        record['goals_conceded'] += conceded
+        record['goals_difference'] += scored - conceded
+        record['points'] += 3 if scored > conceded else int(scored == conceded)
+
+
+def build_standings(apps, schema_editor):
+    # Tabela z meczów zapisanych przed tą migracją - inaczej byłaby pusta do ręcznego rebuild_standings
+    Match = apps.get_model('football', 'Match')
+    Standing = apps.get_model('football', 'Standing')
+    Team = apps.get_model('football', 'Team')
+    table = {}
+    for result in Match.objects.values_list(*RESULT_FIELDS).iterator():
+        add_result(table, result)
+    Standing.objects.bulk_create([
+        Standing(team_id=team_id, **table.get(team_id, empty_record()))
+        for team_id in Team.objects.values_list('pk', flat=True)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('football', '0011_alter_team_city_alter_team_name_alter_team_stadium'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Standing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matches', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('draws', models.IntegerField(default=0)),
+                ('loses', models.IntegerField(default=0)),
+                ('goals_scored', models.IntegerField(default=0)),
+                ('goals_conceded', models.IntegerField(default=0)),
+                ('goals_difference', models.IntegerField(default=0)),
+                ('points', models.IntegerField(default=0)),
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='standing', to='football.team')),
+            ],
+            options={
+                'ordering': ['-points', '-goals_difference', '-goals_scored'],
+                'indexes': [models.Index(fields=['-points', '-goals_difference', '-goals_scored'], name='standing_order_idx')],
+            },
+        ),
+        migrations.RunPython(build_standings, migrations.RunPython.noop),
+    ]
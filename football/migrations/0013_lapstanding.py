@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+STAT_FIELDS = ('matches', 'wins', 'draws', 'loses', 'goals_scored', 'goals_conceded', 'goals_difference', 'points')
+RESULT_FIELDS = ('home_team_id', 'away_team_id', 'home_score', 'away_score')
+
+
+def empty_record():
+    return dict.fromkeys(STAT_FIELDS, 0)
+
+
+def add_result(table, result):
+    # Jak w 0012_standing - logika skopiowana, żeby migracja nie importowała football.standings
+    home_team_id, away_team_id, home_score, away_score = result
+    for team_id, scored, conceded in ((home_team_id, home_score, away_score), (away_team_id, away_score, home_score)):
+        record = table.setdefault(team_id, empty_record())
+        record['matches'] += 1
+        record['wins'] += scored > conceded
+        record['draws'] += scored == conceded
+        record['loses'] += scored < conceded
+        record['goals_scored'] += scored
+        record['goals_conceded'] += conceded
+        record['goals_difference'] += scored - conceded
+        record['points'] += 3 if scored > conceded else int(scored == conceded)
+
+
+def rank(table):
+    return sorted(
+        table,
+        key=lambda team_id: (-table[team_id]['points'], -table[team_id]['goals_difference'],
+                             -table[team_id]['goals_scored'], team_id),
+    )
+
+
+def build_lap_standings(apps, schema_editor):
+    # Migawki po kolejkach z meczów zapisanych przed tą migracją (jak standings.rebuild_lap_standings)
+    LapStanding = apps.get_model('football', 'LapStanding')
+    Match = apps.get_model('football', 'Match')
+    Team = apps.get_model('football', 'Team')
+    table = {team_id: empty_record() for team_id in Team.objects.values_list('pk', flat=True)}
+    rows = []
+
+    def snapshot(lap):
+        for position, team_id in enumerate(rank(table), start=1):
+            rows.append(LapStanding(team_id=team_id, lap=lap, position=position, **table[team_id]))
+
+    current_lap = None
+    for lap, *result in Match.objects.order_by('lap').values_list('lap', *RESULT_FIELDS).iterator():
+        if current_lap is not None and lap != current_lap:
+            snapshot(current_lap)
+        current_lap = lap
+        add_result(table, result)
+    if current_lap is not None:
+        snapshot(current_lap)
+    LapStanding.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('football', '0012_standing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LapStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matches', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('draws', models.IntegerField(default=0)),
+                ('loses', models.IntegerField(default=0)),
+                ('goals_scored', models.IntegerField(default=0)),
+                ('goals_conceded', models.IntegerField(default=0)),
+                ('goals_difference', models.IntegerField(default=0)),
+                ('points', models.IntegerField(default=0)),
+                ('lap', models.IntegerField()),
+                ('position', models.PositiveIntegerField()),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lap_standings', to='football.team')),
+            ],
+            options={
+                'ordering': ['lap', 'position'],
+                'indexes': [models.Index(fields=['lap', 'position'], name='lap_standing_position_idx'), models.Index(fields=['team', 'lap'], name='lap_standing_team_idx')],
+                'constraints': [models.UniqueConstraint(fields=('lap', 'team'), name='unique_lap_standing')],
+            },
+        ),
+        migrations.RunPython(build_lap_standings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:51
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_lineups(apps, schema_editor):
+    # Przed dodaniem ograniczenia unikalności zostawiamy najstarszy wpis zawodnika w składzie meczu
+    Lineup = apps.get_model('football', 'Lineup')
+    duplicates = (
+        Lineup.objects.values('match_id', 'player_id')
+        .annotate(first_id=Min('id'), rows=models.Count('id'))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates:
+        Lineup.objects.filter(match_id=duplicate['match_id'], player_id=duplicate['player_id']).exclude(
+            id=duplicate['first_id']
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('football', '0013_lapstanding'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['match', 'event_type'], name='event_match_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lineup',
+            index=models.Index(fields=['match', 'team', 'on_bench'], name='lineup_match_team_bench_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['lap'], name='match_lap_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['home_team', 'away_team'], name='match_teams_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['team', 'position'], name='player_team_position_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_lineups, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='lineup',
+            constraint=models.UniqueConstraint(fields=('match', 'player'), name='unique_lineup_player'),
+        ),
+    ]
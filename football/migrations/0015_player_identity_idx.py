@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('football', '0014_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['name', 'birth_day', 'nationality'], name='player_identity_idx'),
+        ),
+    ]
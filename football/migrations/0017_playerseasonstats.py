@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+STAT_FIELDS = ('appearances', 'starts', 'minutes', 'goals', 'own_goals', 'yellow_cards', 'red_cards')
+EVENT_FIELDS = {'goal': 'goals', 'own_goal': 'own_goals', 'yellow_card': 'yellow_cards', 'red_card': 'red_cards'}
+MATCH_MINUTES = 90
+
+
+def build_player_stats(apps, schema_editor):
+    # Statystyki ze składów i wydarzeń zapisanych przed tą migracją (jak player_stats.rebuild_player_stats);
+    # minuty jak w football.minutes: skład od 0, wejście przy zmianie, zejście przy zmianie lub czerwonej kartce
+    Event = apps.get_model('football', 'Event')
+    Lineup = apps.get_model('football', 'Lineup')
+    PlayerSeasonStats = apps.get_model('football', 'PlayerSeasonStats')
+    stats = {}
+
+    def record(player_id):
+        return stats.setdefault(player_id, dict.fromkeys(STAT_FIELDS, 0))
+
+    starters = {}
+    for match_id, player_id, is_starting in Lineup.objects.values_list('match_id', 'player_id', 'is_starting').iterator():
+        row = record(player_id)
+        row['appearances'] += 1
+        row['starts'] += is_starting
+        if is_starting:
+            starters.setdefault(match_id, []).append(player_id)
+
+    def finish(on_pitch, end):
+        for player_id, start in on_pitch.items():
+            record(player_id)['minutes'] += max(end, start) - start
+
+    events = (Event.objects.order_by('match_id', 'minute', 'pk')
+              .values_list('match_id', 'minute', 'event_type', 'player_id', 'substitution__player_in_id'))
+    current, on_pitch, end = None, {}, MATCH_MINUTES
+    for match_id, minute, event_type, player_id, player_in_id in events.iterator():
+        if match_id != current:
+            if current is not None:
+                finish(on_pitch, end)
+            current, end = match_id, MATCH_MINUTES
+            on_pitch = dict.fromkeys(starters.pop(match_id, ()), 0)
+        end = max(end, minute)
+        if event_type in EVENT_FIELDS and player_id is not None:
+            record(player_id)[EVENT_FIELDS[event_type]] += 1
+        if event_type in ('substitution', 'red_card') and player_id in on_pitch:
+            record(player_id)['minutes'] += minute - on_pitch.pop(player_id)
+        if event_type == 'substitution' and player_in_id is not None and player_in_id not in on_pitch:
+            on_pitch[player_in_id] = minute
+    if current is not None:
+        finish(on_pitch, end)
+    # Mecze bez wydarzeń: podstawowy skład gra cały mecz
+    for players in starters.values():
+        for player_id in players:
+            record(player_id)['minutes'] += MATCH_MINUTES
+
+    PlayerSeasonStats.objects.bulk_create(
+        [PlayerSeasonStats(player_id=player_id, **row) for player_id, row in stats.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('football', '0016_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerSeasonStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('appearances', models.IntegerField(default=0)),
+                ('starts', models.IntegerField(default=0)),
+                ('minutes', models.IntegerField(default=0)),
+                ('goals', models.IntegerField(default=0)),
+                ('own_goals', models.IntegerField(default=0)),
+                ('yellow_cards', models.IntegerField(default=0)),
+                ('red_cards', models.IntegerField(default=0)),
+                ('player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='season_stats', to='football.player')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-goals', 'minutes', 'player'], name='player_stats_scorers_idx'), models.Index(fields=['-red_cards', '-yellow_cards', 'player'], name='player_stats_cards_idx')],
+            },
+        ),
+        migrations.RunPython(build_player_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,100 @@
+"""Odcinki gry zawodników odtwarzane ze składów i wydarzeń.
+
+Podstawowy skład wchodzi w minucie 0, rezerwowy w minucie zmiany, w której wszedł; zawodnik schodzi
+przy zmianie lub czerwonej kartce (widok zdarzeń odsyła go wtedy na ławkę), a pozostali grają do końca.
+Koniec meczu to MATCH_MINUTES albo ostatnie wydarzenie w doliczonym czasie.
+
+build_intervals przechodzi raz po wydarzeniach posortowanych po (mecz, minuta) i nie pyta bazy, więc
+widok, który ma już składy i wydarzenia meczu, może z nich policzyć odcinki bez kolejnych zapytań.
+"""
+from collections import defaultdict
+from typing import NamedTuple
+
+from .models import Event, Lineup
+
+MATCH_MINUTES = 90
+# Wydarzenia, po których zawodnik schodzi z boiska
+LEAVING_EVENTS = ('substitution', 'red_card')
+
+
+class Interval(NamedTuple):
+    match_id: int
+    team_id: int
+    player_id: int
+    start: int
+    end: int
+
+    @property
+    def minutes(self):
+        return self.end - self.start
+
+
+def build_intervals(lineups, events, match_minutes=MATCH_MINUTES):
+    """Odcinki gry {match_id: [Interval, ...]} w jednym przejściu po wydarzeniach.
+
+    lineups - krotki (match_id, team_id, player_id, is_starting) w dowolnej kolejności,
+    events - krotki (match_id, minute, event_type, team_id, player_id, player_in_id) posortowane po (mecz, minuta).
+    """
+    starters = defaultdict(list)
+    teams = {}
+    for match_id, team_id, player_id, is_starting in lineups:
+        teams[match_id, player_id] = team_id
+        if is_starting:
+            starters[match_id].append(player_id)
+
+    intervals = defaultdict(list)
+
+    def finish(match_id, on_pitch, end):
+        for player_id, (team_id, start) in on_pitch.items():
+            intervals[match_id].append(Interval(match_id, team_id, player_id, start, max(end, start)))
+
+    current, on_pitch, end = None, {}, match_minutes
+    for match_id, minute, event_type, team_id, player_id, player_in_id in events:
+        if match_id != current:
+            if current is not None:
+                finish(current, on_pitch, end)
+            current, end = match_id, match_minutes
+            on_pitch = {player: (teams[match_id, player], 0) for player in starters.pop(match_id, ())}
+        end = max(end, minute)
+        if event_type in LEAVING_EVENTS and player_id in on_pitch:
+            player_team, start = on_pitch.pop(player_id)
+            intervals[match_id].append(Interval(match_id, player_team, player_id, start, minute))
+        if event_type == 'substitution' and player_in_id is not None and player_in_id not in on_pitch:
+            on_pitch[player_in_id] = (teams.get((match_id, player_in_id), team_id), minute)
+    if current is not None:
+        finish(current, on_pitch, end)
+
+    # Mecze bez wydarzeń: podstawowy skład gra cały mecz
+    for match_id, players in starters.items():
+        intervals[match_id].extend(
+            Interval(match_id, teams[match_id, player_id], player_id, 0, match_minutes) for player_id in players
+        )
+    return intervals
+
+
+def load_intervals(match_ids=None):
+    """Odcinki gry podanych meczów (bez match_ids - wszystkich) z dwóch zapytań."""
+    lineups = Lineup.objects.values_list('match_id', 'team_id', 'player_id', 'is_starting')
+    events = (Event.objects.order_by('match_id', 'minute', 'pk')
+              .values_list('match_id', 'minute', 'event_type', 'team_id', 'player_id', 'substitution__player_in_id'))
+    if match_ids is not None:
+        lineups = lineups.filter(match_id__in=match_ids)
+        events = events.filter(match_id__in=match_ids)
+    return build_intervals(lineups.iterator(), events.iterator())
+
+
+def match_intervals(match_id):
+    return load_intervals([match_id]).get(match_id, [])
+
+
+def minutes_played(intervals):
+    """Minuty zawodników zsumowane z odcinków: {player_id: minuty}."""
+    minutes = defaultdict(int)
+    for interval in intervals:
+        minutes[interval.player_id] += interval.minutes
+    return dict(minutes)
+
+
+def on_pitch(intervals, minute):
+    """Zawodnicy na boisku w danej minucie (wejście włącznie, zejście wyłącznie)."""
+    return {interval.player_id for interval in intervals if interval.start <= minute < interval.end}
@@ -1,6 +1,8 @@
 from django.db import models
 from django.core.exceptions import ValidationError
 
+from .labels import MATCHES, PLAYERS, TEAMS, match_label, related_label
+
 class Team(models.Model):
     name = models.CharField(max_length=64, null=False, blank=False)
     city = models.CharField(max_length=64, null=False, blank=False)
@@ -18,8 +20,14 @@ class Match(models.Model):
     away_score = models.IntegerField()
     lap = models.IntegerField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['lap', 'date', 'id'], name='match_keyset_idx'),
+            models.Index(fields=['home_team', 'away_team'], name='match_teams_idx'),
+        ]
+
     def __str__(self) -> str:
-        return self.home_team.name + " vs " + self.away_team.name
+        return match_label(related_label(self, 'home_team', TEAMS), related_label(self, 'away_team', TEAMS))
     
     def clean(self):
         if self.home_score < 0:
@@ -45,8 +53,15 @@ class Player(models.Model):
     position = models.CharField(max_length=2, choices=POSITION)
     nationality = models.CharField(max_length=40)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['team', 'position'], name='player_team_position_idx'),
+            models.Index(fields=['name', 'birth_day', 'nationality'], name='player_identity_idx'),
+            models.Index(fields=['name', 'id'], name='player_keyset_idx'),
+        ]
+
     def __str__(self):
-        team_name = self.team.name if self.team else "Brak drużyny"
+        team_name = related_label(self, 'team', TEAMS) or "Brak drużyny"
         return f"{self.name} ({team_name}) - {self.get_position_display()} - {self.nationality} - {self.birth_day}"
     
 class Lineup(models.Model):
@@ -56,9 +71,18 @@ class Lineup(models.Model):
     is_starting = models.BooleanField(default=True)  # Czy gracz zaczyna w pierwszym składzie
     on_bench = models.BooleanField(default=False) # Po zejściu z boiska
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['match', 'player'], name='unique_lineup_player'),
+        ]
+        indexes = [
+            models.Index(fields=['match', 'team', 'on_bench'], name='lineup_match_team_bench_idx'),
+        ]
+
     def __str__(self):
         status = "Starting" if self.is_starting else "Substitute"
-        return f"{self.player.name} ({status}) - {self.team.name} in {self.match}"
+        return (f"{related_label(self, 'player', PLAYERS)} ({status}) - {related_label(self, 'team', TEAMS)} "
+                f"in {related_label(self, 'match', MATCHES)}")
 
 class Event(models.Model):
     EVENT_TYPES = [
@@ -76,12 +100,86 @@ class Event(models.Model):
     minute = models.PositiveIntegerField()
     description = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['match', 'event_type'], name='event_match_type_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.get_event_type_display()} - {self.match} ({self.minute} min)"
+        return f"{self.get_event_type_display()} - {related_label(self, 'match', MATCHES)} ({self.minute} min)"
 
 class Substitution(models.Model):
     event = models.OneToOneField(Event, on_delete=models.CASCADE, related_name="substitution", help_text="Wydarzenie związane z tą zmianą")
     player_in = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="substitutions_in",help_text="Zawodnik wchodzący na boisko")
 
     def __str__(self):
-        return f"{self.player_in.name} za {self.event.player.name} z {self.event.team} {self.event.minute} mecz: {self.event.match}"
\ No newline at end of file
+        event = self.event
+        return (f"{related_label(self, 'player_in', PLAYERS)} za {related_label(event, 'player', PLAYERS)} "
+                f"z {related_label(event, 'team', TEAMS)} {event.minute} mecz: {related_label(event, 'match', MATCHES)}")
+
+class StandingStats(models.Model):
+    matches = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0)
+    draws = models.IntegerField(default=0)
+    loses = models.IntegerField(default=0)
+    goals_scored = models.IntegerField(default=0)
+    goals_conceded = models.IntegerField(default=0)
+    goals_difference = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class Standing(StandingStats):
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, related_name="standing")
+
+    class Meta:
+        ordering = ['-points', '-goals_difference', '-goals_scored']
+        indexes = [
+            models.Index(fields=['-points', '-goals_difference', '-goals_scored'], name='standing_order_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.team.name}: {self.points} pkt ({self.matches} meczów)"
+
+
+class LapStanding(StandingStats):
+    # Stan tabeli po danej kolejce (narastająco od pierwszej kolejki)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="lap_standings")
+    lap = models.IntegerField()
+    position = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['lap', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['lap', 'team'], name='unique_lap_standing'),
+        ]
+        indexes = [
+            models.Index(fields=['lap', 'position'], name='lap_standing_position_idx'),
+            models.Index(fields=['team', 'lap'], name='lap_standing_team_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.lap}. kolejka: {self.position}. {self.team.name} ({self.points} pkt)"
+
+
+class PlayerSeasonStats(models.Model):
+    # Statystyki zawodnika ze wszystkich meczów - utrzymywane przez sygnały (football/player_stats.py)
+    player = models.OneToOneField(Player, on_delete=models.CASCADE, related_name="season_stats")
+    appearances = models.IntegerField(default=0)
+    starts = models.IntegerField(default=0)
+    minutes = models.IntegerField(default=0)
+    goals = models.IntegerField(default=0)
+    own_goals = models.IntegerField(default=0)
+    yellow_cards = models.IntegerField(default=0)
+    red_cards = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-goals', 'minutes', 'player'], name='player_stats_scorers_idx'),
+            models.Index(fields=['-red_cards', '-yellow_cards', 'player'], name='player_stats_cards_idx'),
+        ]
+
+    def __str__(self):
+        return f"{related_label(self, 'player', PLAYERS)}: {self.goals} bramek, {self.minutes} min"
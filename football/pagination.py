@@ -0,0 +1,149 @@
+import base64
+import json
+from dataclasses import dataclass, field
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Q, QuerySet
+from django.http import Http404
+from django.utils.functional import cached_property
+
+# Klucze stronicowania - ostatnia kolumna musi być unikalna, żeby kolejność była jednoznaczna
+MATCH_KEYSET = ('lap', 'date', 'id')
+PLAYER_KEYSET = ('name', 'id')
+TEAM_KEYSET = ('name', 'id')
+PAGE_SIZE = 50
+# Poniżej tej liczby wierszy szacunek zastępujemy dokładnym COUNT(*)
+ESTIMATE_THRESHOLD = 10000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    next_cursor: str | None = None
+    cursor: str | None = None
+    has_next: bool = field(init=False)
+
+    def __post_init__(self):
+        self.has_next = self.next_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.cursor is not None
+
+
+def encode_cursor(values):
+    raw = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(model, keyset, cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError as error:
+        raise InvalidCursor("Nieprawidłowy kursor") from error
+    if not isinstance(values, list) or len(values) != len(keyset):
+        raise InvalidCursor("Nieprawidłowy kursor")
+    try:
+        return [model._meta.get_field(name).to_python(value) for name, value in zip(keyset, values)]
+    except Exception as error:
+        raise InvalidCursor("Nieprawidłowy kursor") from error
+
+
+def after(keyset, values):
+    """Warunek "wiersz leży za kursorem" rozpisany leksykograficznie: a > x OR (a = x AND b > y) OR ..."""
+    condition = Q()
+    for position, name in enumerate(keyset):
+        equal = {keyset[i]: values[i] for i in range(position)}
+        condition |= Q(**equal, **{f'{name}__gt': values[position]})
+    return condition
+
+
+def page_queryset(queryset, keyset, cursor, size):
+    queryset = queryset.order_by(*keyset)
+    if cursor:
+        queryset = queryset.filter(after(keyset, decode_cursor(queryset.model, keyset, cursor)))
+    # Pobieramy size + 1 wierszy, żeby wiedzieć, czy jest następna strona
+    return queryset[:size + 1]
+
+
+def make_page(rows, keyset, cursor, size):
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        # Wiersze mogą być instancjami modelu albo słownikami z values()
+        next_cursor = encode_cursor([last[name] if isinstance(last, dict) else getattr(last, name) for name in keyset])
+    return KeysetPage(rows, next_cursor, cursor)
+
+
+def keyset_page(queryset, keyset, cursor=None, size=PAGE_SIZE):
+    """Strona wyników za kursorem.
+
+    Zamiast OFFSET filtrujemy po wartościach klucza ostatniego wiersza poprzedniej strony, więc
+    strona N kosztuje tyle samo co pierwsza.
+    """
+    return make_page(list(page_queryset(queryset, keyset, cursor, size)), keyset, cursor, size)
+
+
+async def akeyset_page(queryset, keyset, cursor=None, size=PAGE_SIZE):
+    rows = [row async for row in page_queryset(queryset, keyset, cursor, size)]
+    return make_page(rows, keyset, cursor, size)
+
+
+class KeysetPaginationMixin:
+    """Stronicowanie kursorem dla ListView - zastępuje stronicowanie po numerze strony.
+
+    Kursor jest brany z parametru ?cursor=, a strona trafia do kontekstu jako page_obj.
+    """
+    keyset = ('id',)
+    paginate_by = PAGE_SIZE
+    cursor_kwarg = 'cursor'
+
+    def get_page(self, queryset, cursor, size):
+        return keyset_page(queryset, self.keyset, cursor, size)
+
+    def paginate_queryset(self, queryset, page_size):
+        try:
+            page = self.get_page(queryset, self.request.GET.get(self.cursor_kwarg), page_size)
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return None, page, page.object_list, page.has_other_pages
+
+
+def estimated_count(model, using='default'):
+    """Przybliżona liczba wierszy tabeli bez przeglądania jej całej.
+
+    PostgreSQL i MySQL podają liczbę ze statystyk tabeli, pozostałe bazy - najwyższy klucz główny
+    z indeksu (zawyżony o usunięte wiersze). None, gdy szacunku nie ma.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute("SELECT table_rows FROM information_schema.tables "
+                           "WHERE table_schema = DATABASE() AND table_name = %s", [table])
+        else:
+            return model._default_manager.using(using).aggregate(last=Max('pk'))['last'] or 0
+        row = cursor.fetchone()
+    # reltuples = -1 dla tabeli, której jeszcze nie analizowano
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator dla dużych tabel w panelu admina - dla listy bez filtrów liczy strony z szacunku."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = estimated_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
@@ -0,0 +1,129 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Q
+
+from .minutes import load_intervals, minutes_played
+from .models import Event, Lineup, PlayerSeasonStats, Substitution
+
+PLAYER_STAT_FIELDS = ['appearances', 'starts', 'minutes', 'goals', 'own_goals', 'yellow_cards', 'red_cards']
+# Typ wydarzenia -> licznik zawodnika, którego dotyczy
+EVENT_FIELDS = {'goal': 'goals', 'own_goal': 'own_goals', 'yellow_card': 'yellow_cards', 'red_card': 'red_cards'}
+LEADERBOARD_SIZE = 20
+# Rankingi zawodników - pola sortowania jak w order_by na PlayerSeasonStats ('player' rozstrzyga ostatecznie).
+# Ta sama definicja ustala kolejność na stronie statystyk i w rankingach kolejek i sezonu (football.leaderboards);
+# w rankingu są zawodnicy, którzy mają coś w którymkolwiek polu sortowanym malejąco.
+RANKINGS = {
+    'goals': ('-goals', 'minutes', 'player'),
+    'discipline': ('-red_cards', '-yellow_cards', 'player'),
+    'yellow_cards': ('-yellow_cards', 'player'),
+    'red_cards': ('-red_cards', 'player'),
+    'appearances': ('-appearances', '-minutes', 'player'),
+}
+
+
+def empty_stats():
+    return dict.fromkeys(PLAYER_STAT_FIELDS, 0)
+
+
+def compute_player_stats(player_ids=None, match_ids=None):
+    """Liczy statystyki zawodników ({player_id: {...}}); bez player_ids - wszystkich zawodników,
+    a z match_ids - tylko z podanych meczów (np. jednej kolejki).
+
+    Minuty pochodzą z odcinków gry (football.minutes) meczów, w których zawodnicy wystąpili.
+    """
+    lineups = Lineup.objects.values_list('match_id', 'player_id', 'is_starting')
+    counted = Event.objects.filter(event_type__in=EVENT_FIELDS, player__isnull=False).values_list('player_id', 'event_type')
+    wanted = None
+    if match_ids is not None:
+        match_ids = set(match_ids)
+        lineups = lineups.filter(match_id__in=match_ids)
+        counted = counted.filter(match_id__in=match_ids)
+    elif player_ids is not None:
+        wanted = set(player_ids)
+        lineups = lineups.filter(player_id__in=wanted)
+        counted = counted.filter(player_id__in=wanted)
+        match_ids = set(Substitution.objects.filter(player_in_id__in=wanted).values_list('event__match_id', flat=True))
+
+    stats = {}
+    for match_id, player_id, is_starting in lineups.iterator():
+        record = stats.setdefault(player_id, empty_stats())
+        record['appearances'] += 1
+        record['starts'] += is_starting
+        if wanted is not None:
+            match_ids.add(match_id)
+    for player_id, event_type in counted.iterator():
+        stats.setdefault(player_id, empty_stats())[EVENT_FIELDS[event_type]] += 1
+    if match_ids is None or match_ids:
+        for intervals in load_intervals(match_ids).values():
+            for player_id, minutes in minutes_played(intervals).items():
+                if wanted is None or player_id in wanted:
+                    stats.setdefault(player_id, empty_stats())['minutes'] += minutes
+    return stats
+
+
+def save_player_stats(stats):
+    PlayerSeasonStats.objects.bulk_create(
+        [PlayerSeasonStats(player_id=player_id, **record) for player_id, record in stats.items()],
+        update_conflicts=True, unique_fields=['player'], update_fields=PLAYER_STAT_FIELDS,
+    )
+
+
+def refresh_player_stats(*player_ids):
+    """Przelicza statystyki podanych zawodników na podstawie ich składów i wydarzeń."""
+    player_ids = {player_id for player_id in player_ids if player_id is not None}
+    if not player_ids:
+        return
+    stats = compute_player_stats(player_ids)
+    with transaction.atomic():
+        PlayerSeasonStats.objects.filter(player_id__in=player_ids - set(stats)).delete()
+        save_player_stats(stats)
+
+
+def refresh_after_commit(*player_ids):
+    transaction.on_commit(partial(refresh_player_stats, *player_ids))
+
+
+def rebuild_player_stats():
+    """Przelicza statystyki wszystkich zawodników od zera."""
+    stats = compute_player_stats()
+    with transaction.atomic():
+        PlayerSeasonStats.objects.all().delete()
+        save_player_stats(stats)
+    return len(stats)
+
+
+def ranked_fields(category):
+    return [field[1:] for field in RANKINGS[category] if field.startswith('-')]
+
+
+def is_ranked(category, record):
+    return any(record[field] > 0 for field in ranked_fields(category))
+
+
+def ranking_key(category, stats):
+    """Klucz sortowania id zawodników ze słownika {player_id: rekord} w kolejności RANKINGS[category]."""
+    order = RANKINGS[category]
+
+    def key(player_id):
+        record = stats[player_id]
+        return tuple(player_id if field == 'player' else -record[field[1:]] if field.startswith('-') else record[field]
+                     for field in order)
+    return key
+
+
+def ranking(category, limit=LEADERBOARD_SIZE):
+    """Ranking sezonu prosto z PlayerSeasonStats - jedno zapytanie po indeksie."""
+    condition = Q()
+    for field in ranked_fields(category):
+        condition |= Q(**{f'{field}__gt': 0})
+    return list(PlayerSeasonStats.objects.filter(condition).select_related('player__team')
+                .order_by(*RANKINGS[category])[:limit])
+
+
+def top_scorers(limit=LEADERBOARD_SIZE):
+    return ranking('goals', limit)
+
+
+def discipline(limit=LEADERBOARD_SIZE):
+    return ranking('discipline', limit)
@@ -0,0 +1,291 @@
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import player_stats, standings
+from .caching import (bump_groups_version, bump_lap_versions, bump_leaderboard_versions, bump_match_version, bump_team_versions, invalidate_fixtures,
+                      invalidate_standings, invalidate_teams)
+from .leaderboards import match_lap
+from .labels import MATCHES, PLAYERS, TEAMS, invalidate_labels
+from .live import publish_event, publish_event_removed
+from .minutes import MATCH_MINUTES
+from .models import Event, Lineup, Match, Player, Standing, Substitution, Team
+
+
+@receiver(pre_save, sender=Match)
+def remember_previous_result(sender, instance, raw=False, **kwargs):
+    # Zapamiętujemy poprzedni wynik i kolejkę, żeby przy zmianie cofnąć je w tabeli
+    instance._previous_lap = instance._previous_result = None
+    if instance.pk and not raw:
+        previous = Match.objects.filter(pk=instance.pk).values_list('lap', *standings.RESULT_FIELDS).first()
+        if previous is not None:
+            instance._previous_lap, *result = previous
+            instance._previous_result = tuple(result)
+
+
+@receiver(post_save, sender=Match)
+def update_standings_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous_lap = getattr(instance, '_previous_lap', None)
+    previous_result = getattr(instance, '_previous_result', None)
+    result = standings.result_of(instance)
+    if previous_result == result and previous_lap == instance.lap:
+        return
+    standings.replace_result(previous_result, result)
+    from_lap = instance.lap if previous_lap is None else min(instance.lap, previous_lap)
+    standings.rebuild_lap_standings(from_lap=from_lap)
+
+
+@receiver(post_delete, sender=Match)
+def update_standings_on_delete(sender, instance, origin=None, **kwargs):
+    standings.replace_result(standings.result_of(instance), None)
+    if origin is None or origin is instance:
+        standings.rebuild_lap_standings(from_lap=instance.lap)
+        return
+    # Usunięcie drużyny albo querysetu meczów: migawki odbudowujemy raz po zatwierdzeniu, gdy usuwanej drużyny
+    # nie ma już w tabeli - w trakcie kaskady odbudowa wstawiłaby dla niej wiersze LapStanding
+    rebuild_lap_standings_after_commit(origin, instance.lap)
+
+
+@receiver(post_delete, sender=Team)
+def update_lap_standings_on_team_delete(sender, instance, origin=None, **kwargs):
+    # Pozycje pozostałych drużyn zmieniają się także wtedy, gdy usuwana drużyna nie miała meczów
+    rebuild_lap_standings_after_commit(origin or instance, None)
+
+
+def rebuild_lap_standings_after_commit(origin, from_lap):
+    """Zbiera kolejki na obiekcie, od którego zaczęło się usuwanie; None oznacza odbudowę wszystkich migawek."""
+    laps = getattr(origin, '_standings_laps', None)
+    if laps is None:
+        laps = origin._standings_laps = set()
+        transaction.on_commit(lambda: standings.rebuild_lap_standings(
+            from_lap=None if None in laps else min(laps)
+        ))
+    laps.add(from_lap)
+
+
+@receiver(post_save, sender=Team)
+def create_standing(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Standing.objects.get_or_create(team=instance)
+        if Match.objects.exists():
+            standings.rebuild_lap_standings()
+
+
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+def invalidate_match_on_match_change(sender, instance, **kwargs):
+    bump_match_version(instance.pk)
+    bump_lap_versions(instance.lap, getattr(instance, '_previous_lap', None))
+    bump_leaderboard_versions(instance.lap, getattr(instance, '_previous_lap', None))
+    invalidate_standings()
+    invalidate_fixtures()
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+def invalidate_team_listings(sender, instance, **kwargs):
+    # Nazwy drużyn są częścią zapisanych w cache tabel i terminarzy
+    invalidate_standings()
+    invalidate_fixtures()
+    invalidate_teams()
+
+
+@receiver(post_save, sender=Team)
+def invalidate_team_matches(sender, instance, created=False, raw=False, **kwargs):
+    # Nazwa drużyny jest częścią wyrenderowanych w cache fragmentów jej meczów
+    if not created and not raw:
+        for match_id in Match.objects.filter(Q(home_team=instance) | Q(away_team=instance)).values_list('pk', flat=True):
+            bump_match_version(match_id)
+
+
+@receiver(pre_save, sender=Player)
+def remember_previous_team(sender, instance, raw=False, **kwargs):
+    # Przy transferze zmienia się kadra obu drużyn, a przy zmianie nazwiska - fragmenty meczów zawodnika
+    instance._previous_team_id = instance._previous_name = None
+    if instance.pk and not raw:
+        instance._previous_team_id, instance._previous_name = (
+            Player.objects.filter(pk=instance.pk).values_list('team_id', 'name').first() or (None, None)
+        )
+
+
+@receiver(post_save, sender=Player)
+def invalidate_player_matches(sender, instance, created=False, raw=False, **kwargs):
+    previous_name = getattr(instance, '_previous_name', None)
+    if not created and not raw and previous_name is not None and previous_name != instance.name:
+        for match_id in set(Lineup.objects.filter(player=instance).values_list('match_id', flat=True)):
+            bump_match_version(match_id)
+
+
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+def invalidate_squads(sender, instance, **kwargs):
+    bump_team_versions(instance.team_id, getattr(instance, '_previous_team_id', None))
+
+
+@receiver(post_save, sender=Lineup)
+@receiver(post_delete, sender=Lineup)
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_match_on_lineup_or_event_change(sender, instance, **kwargs):
+    bump_match_version(instance.match_id)
+
+
+@receiver(post_save, sender=Substitution)
+@receiver(post_delete, sender=Substitution)
+def invalidate_match_on_substitution_change(sender, instance, **kwargs):
+    bump_match_version(instance.event.match_id)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_moderator_flags(sender, **kwargs):
+    # Flaga moderatora w sesjach jest ważna tylko dla bieżącej wersji grup
+    bump_groups_version()
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+def invalidate_team_labels(sender, instance, created=False, **kwargs):
+    # Nowego id nie ma jeszcze w cache etykiet
+    if not created:
+        invalidate_labels(TEAMS, MATCHES)
+
+
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+def invalidate_player_labels(sender, instance, created=False, **kwargs):
+    if not created:
+        invalidate_labels(PLAYERS)
+
+
+@receiver(post_save, sender=Match)
+def invalidate_match_labels_on_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_result', None)
+    if previous is not None and previous[:2] != (instance.home_team_id, instance.away_team_id):
+        invalidate_labels(MATCHES)
+
+
+@receiver(post_delete, sender=Match)
+def invalidate_match_labels_on_delete(sender, instance, **kwargs):
+    invalidate_labels(MATCHES)
+
+
+@receiver(post_save, sender=Event)
+def stream_event(sender, instance, raw=False, **kwargs):
+    if not raw:
+        publish_event(instance.pk, instance.match_id)
+
+
+@receiver(post_delete, sender=Event)
+def stream_event_removed(sender, instance, **kwargs):
+    publish_event_removed(instance.pk, instance.match_id)
+
+
+@receiver(post_save, sender=Substitution)
+@receiver(post_delete, sender=Substitution)
+def stream_substitution(sender, instance, raw=False, **kwargs):
+    # Zmiana jest częścią wydarzenia - widzowie dostają wydarzenie z zawodnikiem wchodzącym
+    if not raw:
+        publish_event(instance.event_id, instance.event.match_id)
+
+
+# Pole z zawodnikiem, którego statystyki zmienia zapis wiersza
+STATS_PLAYER_FIELDS = {Lineup: 'player_id', Event: 'player_id', Substitution: 'player_in_id'}
+
+
+@receiver(pre_save, sender=Lineup)
+@receiver(pre_save, sender=Event)
+@receiver(pre_save, sender=Substitution)
+def remember_previous_player(sender, instance, raw=False, **kwargs):
+    # Przy zmianie zawodnika przeliczamy też poprzedniego, a przy zmianie minuty wydarzenia - jego poprzednią minutę
+    instance._previous_player_id = instance._previous_minute = None
+    if instance.pk and not raw:
+        field = STATS_PLAYER_FIELDS[sender]
+        if sender is Event:
+            instance._previous_player_id, instance._previous_minute = (
+                Event.objects.filter(pk=instance.pk).values_list(field, 'minute').first() or (None, None)
+            )
+        else:
+            instance._previous_player_id = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+def event_minutes_players(event, *minutes):
+    """Zawodnicy, którym wydarzenie zmienia minuty gry poza jego własnym zawodnikiem (football.minutes):
+    wchodzący przy zmianie, a przy wydarzeniu w doliczonym czasie cały skład meczu."""
+    player_ids = set()
+    if event.event_type == 'substitution':
+        player_ids.update(Substitution.objects.filter(event_id=event.pk).values_list('player_in_id', flat=True))
+    if any(minute is not None and minute > MATCH_MINUTES for minute in minutes):
+        player_ids.update(Lineup.objects.filter(match_id=event.match_id).values_list('player_id', flat=True))
+    return player_ids
+
+
+@receiver(post_save, sender=Lineup)
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Substitution)
+def update_player_stats_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    player_ids = {getattr(instance, STATS_PLAYER_FIELDS[sender]), getattr(instance, '_previous_player_id', None)}
+    if sender is Event:
+        player_ids |= event_minutes_players(instance, instance.minute, getattr(instance, '_previous_minute', None))
+    player_stats.refresh_after_commit(*player_ids)
+
+
+@receiver(post_delete, sender=Lineup)
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Substitution)
+def update_player_stats_on_delete(sender, instance, origin=None, **kwargs):
+    # Usunięcie meczu, zawodnika albo querysetu wysyła sygnał dla każdego wiersza - zawodników zbieramy
+    # na obiekcie, od którego zaczęło się usuwanie, i przeliczamy raz po zatwierdzeniu transakcji
+    affected = {getattr(instance, STATS_PLAYER_FIELDS[sender])}
+    # Zmiana wydarzenia jest usuwana wcześniej i sama dodaje wchodzącego; przy usuwaniu meczu składy dodają się same
+    if sender is Event and (origin is None or not deleted_with_match(origin)):
+        affected |= event_minutes_players(instance, instance.minute)
+    if origin is None:
+        player_stats.refresh_after_commit(*affected)
+        return
+    player_ids = getattr(origin, '_stats_player_ids', None)
+    if player_ids is None:
+        player_ids = origin._stats_player_ids = set()
+        transaction.on_commit(lambda: player_stats.refresh_player_stats(*player_ids))
+    player_ids |= affected
+
+
+def deleted_with(origin, *models):
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, models)
+
+
+def deleted_with_match(origin):
+    return deleted_with(origin, Match, Team)
+
+
+@receiver(post_save, sender=Lineup)
+@receiver(post_delete, sender=Lineup)
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=Substitution)
+@receiver(post_delete, sender=Substitution)
+def invalidate_lap_leaderboard(sender, instance, raw=False, origin=None, **kwargs):
+    # Każde wydarzenie może zmienić minuty gry (rozstrzygające remisy), więc unieważnia ranking kolejki.
+    # Przy usuwaniu meczu ranking jego kolejki odświeża sygnał meczu, a zmianę usuwaną z wydarzeniem - sygnał wydarzenia
+    if raw or (origin is not None and (deleted_with_match(origin) or sender is Substitution and deleted_with(origin, Event))):
+        return
+    match_id = instance.event.match_id if sender is Substitution else instance.match_id
+    if origin is None:
+        bump_leaderboard_versions(match_lap(match_id))
+        return
+    # Usunięcie querysetu lub zawodnika: mecze zbieramy na origin i podbijamy ich kolejki raz po zatwierdzeniu
+    match_ids = getattr(origin, '_leaderboard_match_ids', None)
+    if match_ids is None:
+        match_ids = origin._leaderboard_match_ids = set()
+        transaction.on_commit(lambda: bump_leaderboard_versions(
+            *Match.objects.filter(pk__in=match_ids).values_list('lap', flat=True)
+        ))
+    match_ids.add(match_id)
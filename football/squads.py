@@ -0,0 +1,50 @@
+"""Kadra drużyny pogrupowana według pozycji (Player.POSITION).
+
+Zawodnicy są pobierani jednym zapytaniem posortowanym po (pozycja, nazwisko) i dzieleni na pozycje w Pythonie.
+Gotowa kadra trafia do cache pod wersją drużyny, którą podbija każda zmiana jej zawodników (signals.invalidate_squads).
+"""
+from .caching import acached, aget_team_version, cached, get_team_version
+from .models import Player
+
+# Pozycja -> nazwa listy w kontekście szablonów
+POSITION_CONTEXT = {'gk': 'goalkeepers', 'df': 'defenders', 'mf': 'midfielders', 'st': 'strikers'}
+
+
+def squad_players(team_id):
+    return Player.objects.filter(team_id=team_id).order_by('position', 'name', 'id')
+
+
+def group_by_position(players):
+    """{pozycja: [zawodnicy]} w kolejności Player.POSITION."""
+    squad = {position: [] for position, _ in Player.POSITION}
+    for player in players:
+        squad.setdefault(player.position, []).append(player)
+    return squad
+
+
+def squad_key(team_id, version):
+    return f'squad:{team_id}:{version}'
+
+
+def team_squad(team_id):
+    return cached('default', squad_key(team_id, get_team_version(team_id)),
+                  lambda: group_by_position(squad_players(team_id)))
+
+
+def squad_context(team_id):
+    """Listy zawodników dla szablonów: goalkeepers, defenders, midfielders, strikers."""
+    squad = team_squad(team_id)
+    return {name: squad.get(position, []) for position, name in POSITION_CONTEXT.items()}
+
+
+# Warianty async dla widoków ASGI - ten sam cache i te same klucze co wyżej
+
+async def ateam_squad(team_id):
+    async def build():
+        return group_by_position([player async for player in squad_players(team_id)])
+    return await acached('default', squad_key(team_id, await aget_team_version(team_id)), build)
+
+
+async def asquad_context(team_id):
+    squad = await ateam_squad(team_id)
+    return {name: squad.get(position, []) for position, name in POSITION_CONTEXT.items()}
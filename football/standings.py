@@ -0,0 +1,164 @@
+from django.db import transaction
+from django.db.models import F
+
+from .caching import invalidate_standings
+from .models import LapStanding, Match, Standing, Team
+
+STAT_FIELDS = ['matches', 'wins', 'draws', 'loses', 'goals_scored', 'goals_conceded', 'goals_difference', 'points']
+
+# Kolumny meczu potrzebne do policzenia tabeli - (gospodarz, gość, bramki gospodarzy, bramki gości)
+RESULT_FIELDS = ('home_team_id', 'away_team_id', 'home_score', 'away_score')
+
+
+def empty_record():
+    return dict.fromkeys(STAT_FIELDS, 0)
+
+
+def team_delta(scored, conceded):
+    """Przyrost statystyk drużyny po jednym meczu."""
+    return {
+        'matches': 1,
+        'wins': int(scored > conceded),
+        'draws': int(scored == conceded),
+        'loses': int(scored < conceded),
+        'goals_scored': scored,
+        'goals_conceded': conceded,
+        'goals_difference': scored - conceded,
+        'points': 3 if scored > conceded else int(scored == conceded),
+    }
+
+
+def result_of(match):
+    return tuple(getattr(match, field) for field in RESULT_FIELDS)
+
+
+def result_deltas(result):
+    home_team_id, away_team_id, home_score, away_score = result
+    return [
+        (home_team_id, team_delta(home_score, away_score)),
+        (away_team_id, team_delta(away_score, home_score)),
+    ]
+
+
+def add_result(table, result):
+    for team_id, delta in result_deltas(result):
+        record = table.setdefault(team_id, empty_record())
+        for field, value in delta.items():
+            record[field] += value
+
+
+def compute_table(results):
+    """Liczy tabelę w jednym przejściu po wynikach meczów (krotki jak RESULT_FIELDS)."""
+    table = {}
+    for result in results:
+        add_result(table, result)
+    return table
+
+
+def rank(table):
+    """Kolejność drużyn w tabeli: punkty, różnica bramek, bramki zdobyte."""
+    return sorted(
+        table,
+        key=lambda team_id: (-table[team_id]['points'], -table[team_id]['goals_difference'],
+                             -table[team_id]['goals_scored'], team_id),
+    )
+
+
+def _apply(result, sign):
+    for team_id, delta in result_deltas(result):
+        changes = {field: F(field) + sign * value for field, value in delta.items() if value}
+        updated = Standing.objects.filter(team_id=team_id).update(**changes)
+        if not updated and sign > 0:
+            Standing.objects.create(team_id=team_id, **delta)
+
+
+def replace_result(old_result, new_result):
+    """Cofa stary wynik meczu i dolicza nowy; None oznacza brak meczu (utworzenie/usunięcie)."""
+    if old_result == new_result:
+        return
+    with transaction.atomic():
+        if old_result is not None:
+            _apply(old_result, -1)
+        if new_result is not None:
+            _apply(new_result, 1)
+
+
+def rebuild_standings():
+    """Przelicza całą tabelę od zera na podstawie meczów."""
+    table = compute_table(Match.objects.values_list(*RESULT_FIELDS).iterator())
+    with transaction.atomic():
+        Standing.objects.all().delete()
+        Standing.objects.bulk_create([
+            Standing(team_id=team_id, **table.get(team_id, empty_record()))
+            for team_id in Team.objects.values_list('pk', flat=True)
+        ])
+    # Naprawiona tabela nie może czekać na wygaśnięcie starej w cache (widoki tabel, API, ETag)
+    invalidate_standings()
+    return len(table)
+
+
+def check_standings():
+    """Porównuje zapisaną tabelę z przeliczoną od zera; zwraca listę rozbieżności."""
+    expected = compute_table(Match.objects.values_list(*RESULT_FIELDS).iterator())
+    stored = {row['team_id']: row for row in Standing.objects.values('team_id', *STAT_FIELDS)}
+    problems = []
+    for team_id in Team.objects.values_list('pk', flat=True):
+        if team_id not in stored:
+            problems.append((team_id, 'missing', None, None))
+            continue
+        record = expected.get(team_id, empty_record())
+        for field in STAT_FIELDS:
+            if stored[team_id][field] != record[field]:
+                problems.append((team_id, field, stored[team_id][field], record[field]))
+    return problems
+
+
+def rebuild_lap_standings(from_lap=None):
+    """Odbudowuje migawki tabeli po każdej kolejce w jednym przejściu po meczach posortowanych po kolejce.
+
+    Przy podanym from_lap zaczyna od migawki poprzedniej kolejki i przelicza tylko kolejki >= from_lap.
+    """
+    team_ids = list(Team.objects.values_list('pk', flat=True))
+    table = {team_id: empty_record() for team_id in team_ids}
+    matches = Match.objects.order_by('lap')
+    snapshots = LapStanding.objects.all()
+    if from_lap is not None:
+        previous_lap = LapStanding.objects.filter(lap__lt=from_lap).order_by('-lap').values_list('lap', flat=True).first()
+        if previous_lap is not None:
+            for row in LapStanding.objects.filter(lap=previous_lap).values('team_id', *STAT_FIELDS):
+                table[row.pop('team_id')] = row
+            matches = matches.filter(lap__gt=previous_lap)
+            snapshots = snapshots.filter(lap__gt=previous_lap)
+
+    rows = []
+
+    def snapshot(lap):
+        for position, team_id in enumerate(rank(table), start=1):
+            rows.append(LapStanding(team_id=team_id, lap=lap, position=position, **table[team_id]))
+
+    current_lap = None
+    for lap, *result in matches.values_list('lap', *RESULT_FIELDS).iterator():
+        if current_lap is not None and lap != current_lap:
+            snapshot(current_lap)
+        current_lap = lap
+        add_result(table, result)
+    if current_lap is not None:
+        snapshot(current_lap)
+
+    with transaction.atomic():
+        snapshots.delete()
+        LapStanding.objects.bulk_create(rows)
+    invalidate_standings()
+    return len(rows)
+
+
+def lap_table(lap):
+    return LapStanding.objects.filter(lap=lap).select_related('team')
+
+
+def positions_by_lap():
+    """Pozycje wszystkich drużyn po kolejnych kolejkach - {team_id: [(kolejka, pozycja), ...]} z jednego zapytania."""
+    positions = {}
+    for team_id, lap, position in LapStanding.objects.order_by('lap').values_list('team_id', 'lap', 'position'):
+        positions.setdefault(team_id, []).append((lap, position))
+    return positions
@@ -6,3 +6,14 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sport.settings")
 django.setup()
+
+import pytest
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Cache lokalny przetrwałby między testami, a klucze zawierają pk, które baza używa ponownie
+    for cache in caches.all():
+        cache.clear()
+    yield
@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+
+from football import pagination
+from football.models import Lineup
+from football.pagination import EstimatedCountPaginator, estimated_count
+
+
+@pytest.fixture
+def game(db):
+    home, away = baker.make("football.Team", _quantity=2)
+    return baker.make("football.Match", home_team=home, away_team=away, lap=1)
+
+
+def make_rows(game, count):
+    for _ in range(count):
+        player = baker.make("football.Player", team=game.home_team)
+        baker.make("football.Lineup", match=game, team=game.home_team, player=player)
+        event = baker.make("football.Event", match=game, team=game.home_team, player=player, event_type="substitution", minute=60)
+        baker.make("football.Substitution", event=event, player_in=baker.make("football.Player", team=game.home_team))
+
+
+def changelist_queries(client, model):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse(f'admin:football_{model}_changelist'))
+    assert response.status_code == 200
+    return len(queries.captured_queries)
+
+
+@pytest.mark.django_db
+class TestAdminLists():
+
+    @pytest.mark.parametrize("model", ["match", "player", "lineup", "event", "substitution"])
+    def test_changelist_query_count_does_not_grow(self, admin_client, game, model):
+        """sprawdzam, czy liczba zapytań listy w panelu admina nie zależy od liczby wierszy"""
+        make_rows(game, 2)
+        few = changelist_queries(admin_client, model)
+        make_rows(game, 10)
+        assert changelist_queries(admin_client, model) == few
+
+    def test_autocomplete_instead_of_player_dropdown(self, admin_client, game):
+        """sprawdzam, czy formularz składu nie wypisuje wszystkich zawodników w liście rozwijanej"""
+        baker.make("football.Player", team=game.home_team, name="Zawodnik z listy")
+        response = admin_client.get(reverse('admin:football_lineup_add'))
+        assert "Zawodnik z listy" not in response.content.decode()
+        assert 'admin-autocomplete' in response.content.decode()
+
+    def test_player_autocomplete_search(self, admin_client, game):
+        """sprawdzam, czy podpowiedzi zawodników wyszukują po nazwisku"""
+        baker.make("football.Player", team=game.home_team, name="Robert Lewandowski")
+        baker.make("football.Player", team=game.home_team, name="Jakub Błaszczykowski")
+        response = admin_client.get(reverse('admin:autocomplete'), {
+            'term': 'Lewan', 'app_label': 'football', 'model_name': 'lineup', 'field_name': 'player',
+        })
+        assert [result['text'].split(' (')[0] for result in response.json()['results']] == ["Robert Lewandowski"]
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator():
+
+    def test_estimate_used_for_large_unfiltered_table(self, game, monkeypatch):
+        """sprawdzam, czy dla dużej tabeli bez filtrów paginator bierze szacunek zamiast COUNT(*)"""
+        make_rows(game, 3)
+        monkeypatch.setattr(pagination, "ESTIMATE_THRESHOLD", 0)
+        paginator = EstimatedCountPaginator(Lineup.objects.order_by('pk'), 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            assert paginator.count == estimated_count(Lineup) >= 3
+        assert not any('COUNT(' in query['sql'] for query in queries.captured_queries)
+
+    def test_exact_count_for_filtered_or_small(self, game, monkeypatch):
+        """sprawdzam, czy lista z filtrem i mała tabela są liczone dokładnie"""
+        make_rows(game, 3)
+        Lineup.objects.filter(pk=Lineup.objects.order_by('pk').first().pk).delete()
+        assert EstimatedCountPaginator(Lineup.objects.order_by('pk'), 2).count == 2
+
+        monkeypatch.setattr(pagination, "ESTIMATE_THRESHOLD", 0)
+        assert EstimatedCountPaginator(Lineup.objects.filter(match=game).order_by('pk'), 2).count == 2
@@ -0,0 +1,120 @@
+import random
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+
+from football import analytics
+from football.analytics import compute_analytics, run_lengths, season_analytics, season_arrays, team_analytics
+from football.standings import compute_table
+
+numpy = pytest.importorskip("numpy")
+
+# (kolejka, gospodarz, gość, bramki gospodarzy, bramki gości) - drużyny 1, 2, 3
+ROWS = [
+    (1, 1, 2, 2, 0),
+    (2, 3, 1, 1, 1),
+    (3, 2, 1, 0, 1),
+    (4, 1, 3, 3, 2),
+    (5, 2, 3, 2, 2),
+    (6, 1, 2, 0, 4),
+]
+
+
+@pytest.fixture
+def season():
+    return compute_analytics(season_arrays([1, 2, 3], ROWS))
+
+
+class TestComputeAnalytics():
+
+    def test_form_and_streaks(self, season):
+        """sprawdzam, czy forma i serie odpowiadają kolejnym wynikom drużyny"""
+        # Drużyna 1: W D W W L
+        assert season[1]['form'] == ['W', 'D', 'W', 'W', 'L']
+        assert season[1]['streak'] == {'current': {'result': 'L', 'length': 1},
+                                       'longest_winning': 2, 'longest_unbeaten': 4}
+        # Drużyna 3 grała trzy razy: D L D
+        assert season[3]['form'] == ['D', 'L', 'D']
+        assert season[3]['streak']['current'] == {'result': 'D', 'length': 1}
+
+    def test_home_away_splits(self, season):
+        """sprawdzam, czy podział dom/wyjazd liczy tylko mecze w danej roli"""
+        assert season[1]['home'] == {'matches': 3, 'wins': 2, 'draws': 0, 'loses': 1, 'goals_scored': 5,
+                                     'goals_conceded': 6, 'goals_difference': -1, 'points': 6}
+        assert season[1]['away'] == {'matches': 2, 'wins': 1, 'draws': 1, 'loses': 0, 'goals_scored': 2,
+                                     'goals_conceded': 1, 'goals_difference': 1, 'points': 4}
+
+    def test_head_to_head(self, season):
+        """sprawdzam, czy bilans bezpośrednich meczów obejmuje tylko spotkania z danym rywalem"""
+        against = {row['opponent_id']: row for row in season[1]['head_to_head']}
+        assert set(against) == {2, 3}
+        assert against[2]['matches'] == 3
+        assert (against[2]['wins'], against[2]['loses'], against[2]['goals_scored']) == (2, 1, 3)
+        assert (against[3]['draws'], against[3]['wins'], against[3]['points']) == (1, 1, 4)
+
+    def test_goal_difference_trend(self, season):
+        """sprawdzam, czy przebieg różnicy bramek jest narastający i przenosi wartość przez pauzy"""
+        assert season[1]['goal_difference_trend'] == [[1, 2], [2, 2], [3, 3], [4, 4], [5, 4], [6, 0]]
+        assert [gd for _, gd in season[3]['goal_difference_trend']] == [0, 0, 0, -1, -1, -1]
+
+    def test_team_without_matches(self):
+        """sprawdzam, czy drużyna bez meczów dostaje puste statystyki"""
+        result = compute_analytics(season_arrays([1, 2], []))
+        assert result[1]['form'] == []
+        assert result[1]['streak']['current'] is None
+        assert result[1]['home']['matches'] == 0
+
+    def test_splits_add_up_to_table(self):
+        """sprawdzam, czy dom + wyjazd daje tę samą tabelę co standings.compute_table"""
+        rng = random.Random(7)
+        rows = [(lap, *rng.sample(range(1, 11), 2), rng.randint(0, 4), rng.randint(0, 4))
+                for lap in range(1, 31) for _ in range(5)]
+        result = compute_analytics(season_arrays(list(range(1, 11)), rows))
+        table = compute_table(row[1:] for row in rows)
+        for team_id, record in table.items():
+            assert {field: result[team_id]['home'][field] + result[team_id]['away'][field]
+                    for field in record} == record
+
+    def test_run_lengths(self):
+        """sprawdzam, czy serie nie przechodzą z jednej drużyny na drugą"""
+        team = numpy.array([0, 0, 0, 1, 1])
+        values = numpy.array([1, 1, 0, 0, 0])
+        assert run_lengths(team, values).tolist() == [1, 2, 1, 1, 2]
+
+
+@pytest.mark.django_db
+class TestSeasonAnalytics():
+
+    def test_cached_until_match_saved(self):
+        """sprawdzam, czy analityka jest w cache do następnego zapisu meczu"""
+        home, away = baker.make("football.Team", _quantity=2)
+        baker.make("football.Match", home_team=home, away_team=away, lap=1, home_score=1, away_score=0)
+        assert team_analytics(home.pk)['form'] == ['W']
+
+        with CaptureQueriesContext(connection) as queries:
+            season_analytics()
+        assert queries.captured_queries == []
+
+        baker.make("football.Match", home_team=away, away_team=home, lap=2, home_score=3, away_score=0)
+        assert team_analytics(home.pk)['form'] == ['W', 'L']
+
+    def test_requires_numpy(self, monkeypatch):
+        """sprawdzam, czy bez numpy analityka kończy się czytelnym błędem"""
+        monkeypatch.setattr(analytics, 'numpy', None)
+        with pytest.raises(RuntimeError, match="numpy"):
+            season_analytics()
+
+    def test_api(self, client):
+        """sprawdzam, czy API zwraca analitykę wszystkich drużyn i jednej drużyny, a dla nieznanej 404"""
+        home, away = baker.make("football.Team", _quantity=2)
+        baker.make("football.Match", home_team=home, away_team=away, lap=1, home_score=0, away_score=0)
+        client.force_login(baker.make("auth.User"))
+
+        teams = client.get(reverse('api_analytics')).json()['teams']
+        assert {team['team_id'] for team in teams} == {home.pk, away.pk}
+        team = client.get(reverse('api_team_analytics', kwargs={'pk': away.pk})).json()
+        assert team['form'] == ['D'] and team['away']['points'] == 1
+        assert client.get(reverse('api_team_analytics', kwargs={'pk': away.pk + 1})).status_code == 404
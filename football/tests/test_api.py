@@ -0,0 +1,164 @@
+import pytest
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+
+from football.importers import upsert_players
+
+
+@pytest.fixture(autouse=True)
+def login(db, client):
+    client.force_login(baker.make("auth.User"))
+
+
+@pytest.fixture
+def teams(db):
+    return [baker.make("football.Team", name="Legia"), baker.make("football.Team", name="Lech")]
+
+
+@pytest.fixture
+def game(teams):
+    return baker.make("football.Match", home_team=teams[0], away_team=teams[1], lap=1, home_score=2, away_score=1)
+
+
+def revalidate(client, url, response):
+    """Ponowne żądanie z ETag z poprzedniej odpowiedzi."""
+    return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+
+@pytest.mark.django_db
+class TestConditionalGet():
+
+    def test_not_modified_without_database(self, client, teams):
+        """sprawdzam, czy niezmieniona lista drużyn daje 304 bez zapytań do bazy"""
+        url = reverse('api_teams')
+        first = client.get(url)
+        assert [team['name'] for team in first.json()['teams']] == ["Lech", "Legia"]
+        assert 'no-cache' in first['Cache-Control'] and 'private' in first['Cache-Control']
+
+        with CaptureQueriesContext(connection) as queries:
+            second = revalidate(client, url, first)
+        assert second.status_code == 304
+        # Zostaje tylko odczyt sesji i użytkownika
+        assert not [query for query in queries.captured_queries if 'football_' in query['sql']]
+
+    def test_if_modified_since(self, client, teams):
+        """sprawdzam, czy nagłówek If-Modified-Since też pozwala odpowiedzieć 304"""
+        url = reverse('api_teams')
+        first = client.get(url)
+        assert client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code == 304
+
+    def test_team_change_changes_etag(self, client, teams):
+        """sprawdzam, czy nowa drużyna zmienia ETag listy drużyn"""
+        url = reverse('api_teams')
+        first = client.get(url)
+        baker.make("football.Team", name="Wisła")
+        second = revalidate(client, url, first)
+        assert second.status_code == 200
+        assert len(second.json()['teams']) == 3
+
+    def test_lap_etag_is_per_lap(self, client, game):
+        """sprawdzam, czy mecz z innej kolejki nie zmienia ETag terminarza kolejki"""
+        url = reverse('api_lap_fixtures', kwargs={'lap': 1})
+        first = client.get(url)
+        assert first.json()['fixtures'][0]['home_team__name'] == "Legia"
+
+        baker.make("football.Match", home_team=game.away_team, away_team=game.home_team, lap=2)
+        assert revalidate(client, url, first).status_code == 304
+
+        game.home_score = 3
+        game.save()
+        assert revalidate(client, url, first).json()['fixtures'][0]['home_score'] == 3
+
+    def test_match_moved_to_other_lap(self, client, game):
+        """sprawdzam, czy przeniesienie meczu do innej kolejki zmienia ETag starej kolejki"""
+        url = reverse('api_lap_fixtures', kwargs={'lap': 1})
+        first = client.get(url)
+        baker.make("football.Match", home_team=game.away_team, away_team=game.home_team, lap=1)
+        second = revalidate(client, url, first)
+
+        game.lap = 5
+        game.save()
+        assert len(revalidate(client, url, second).json()['fixtures']) == 1
+
+    def test_import_changes_squad_etag(self, client, game):
+        """sprawdzam, czy import zawodników podbija wersję kadry drużyny"""
+        url = reverse('api_squad', kwargs={'pk': game.home_team.pk})
+        first = client.get(url)
+        upsert_players([(1, ["Legia", "gk", "Jan Kowalski", "Polska", "01.02.95", "190/85", "", ""])])
+        second = revalidate(client, url, first)
+        assert second.status_code == 200
+        assert [player['name'] for player in second.json()['squad']['gk']] == ["Jan Kowalski"]
+
+
+@pytest.mark.django_db
+class TestApiResources():
+
+    def test_standings(self, client, game):
+        """sprawdzam, czy tabela ma pozycje i zmienia się po zapisie wyniku"""
+        url = reverse('api_standings')
+        first = client.get(url)
+        rows = first.json()['standings']
+        assert [(row['position'], row['team_name'], row['points']) for row in rows] == [(1, "Legia", 3), (2, "Lech", 0)]
+
+        game.home_score = 0
+        game.save()
+        assert revalidate(client, url, first).json()['standings'][0]['team_name'] == "Lech"
+
+    def test_lap_standings(self, client, game):
+        """sprawdzam, czy tabela po kolejce jest dostępna, a po nieistniejącej kolejce daje 404"""
+        assert client.get(reverse('api_lap_standings', kwargs={'lap': 1})).json()['lap'] == 1
+        assert client.get(reverse('api_lap_standings', kwargs={'lap': 9})).status_code == 404
+
+    def test_match_timeline(self, client, game):
+        """sprawdzam, czy przebieg meczu zawiera składy obu drużyn i wydarzenia ze zmianą"""
+        starter = baker.make("football.Player", team=game.home_team, name="Kowalski")
+        sub = baker.make("football.Player", team=game.home_team, name="Nowak")
+        baker.make("football.Lineup", match=game, team=game.home_team, player=starter)
+        url = reverse('api_match', kwargs={'pk': game.pk})
+        first = client.get(url)
+        assert [row['player_name'] for row in first.json()['lineups']['home']] == ["Kowalski"]
+        assert first.json()['lineups']['away'] == []
+
+        event = baker.make("football.Event", match=game, team=game.home_team, player=starter, event_type="substitution", minute=60)
+        baker.make("football.Substitution", event=event, player_in=sub)
+
+        second = revalidate(client, url, first).json()
+        [row] = second['events']
+        assert (row['minute'], row['player_name'], row['player_in_name']) == (60, "Kowalski", "Nowak")
+        assert [row['minutes'] for row in second['lineups']['home']] == [60]
+
+    def test_squad_by_position_and_transfer(self, client, teams):
+        """sprawdzam, czy kadra jest pogrupowana według pozycji, a transfer zmienia ETag obu drużyn"""
+        player = baker.make("football.Player", team=teams[0], name="Kowalski", position="st", birth_day=date(1990, 1, 1))
+        old_url = reverse('api_squad', kwargs={'pk': teams[0].pk})
+        new_url = reverse('api_squad', kwargs={'pk': teams[1].pk})
+        old, new = client.get(old_url), client.get(new_url)
+        assert list(old.json()['squad']) == ['gk', 'df', 'mf', 'st']
+        assert old.json()['squad']['st'][0]['name'] == "Kowalski"
+
+        player.team = teams[1]
+        player.save()
+
+        assert revalidate(client, old_url, old).json()['squad']['st'] == []
+        assert revalidate(client, new_url, new).json()['squad']['st'][0]['name'] == "Kowalski"
+
+    @pytest.mark.parametrize("name, kwargs", [
+        ('api_teams', {}), ('api_standings', {}), ('api_squad', {'pk': 1}), ('api_match', {'pk': 1}),
+        ('api_analytics', {}), ('api_leaderboard', {'category': 'goals'}), ('api_matches', {}), ('api_players', {}),
+    ])
+    def test_requires_login(self, client, teams, name, kwargs):
+        """sprawdzam, czy API bez zalogowania odpowiada 403, także na żądanie warunkowe"""
+        url = reverse(name, kwargs=kwargs)
+        etag = client.get(url).get('ETag')
+        client.logout()
+        assert client.get(url).status_code == 403
+        if etag:
+            assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 403
+
+    def test_not_found(self, client, db):
+        """sprawdzam, czy nieistniejący mecz i drużyna dają 404"""
+        assert client.get(reverse('api_match', kwargs={'pk': 999})).status_code == 404
+        assert client.get(reverse('api_squad', kwargs={'pk': 999})).status_code == 404
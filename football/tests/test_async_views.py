@@ -0,0 +1,76 @@
+import asyncio
+import re
+
+import pytest
+from django.urls import resolve, reverse
+from model_bakery import baker
+
+
+@pytest.fixture
+def login_user(db, client):
+    client.force_login(baker.make("auth.User"))
+    return client
+
+
+@pytest.fixture
+def game(db):
+    home = baker.make("football.Team", name="Legia")
+    away = baker.make("football.Team", name="Lech")
+    return baker.make("football.Match", home_team=home, away_team=away, lap=1, home_score=2, away_score=1)
+
+
+def page_text(response):
+    # Token CSRF jest maskowany inaczej w każdej odpowiedzi
+    return re.sub(r'name="csrfmiddlewaretoken" value="[^"]+"', '', response.content.decode())
+
+
+ASYNC_PAGES = [
+    ('table', 'async_table', lambda game: {}),
+    ('lap', 'async_lap', lambda game: {'pk': game.lap}),
+    ('team_matches', 'async_team_matches', lambda game: {'pk': game.home_team_id}),
+    ('team_info', 'async_team_info', lambda game: {'pk': game.home_team_id}),
+    ('match_details', 'async_match_details', lambda game: {'pk': game.pk}),
+]
+
+
+@pytest.mark.django_db
+class TestAsyncViews():
+
+    @pytest.mark.parametrize("sync_name, async_name, kwargs", ASYNC_PAGES)
+    def test_views_are_async(self, sync_name, async_name, kwargs, game):
+        """sprawdzam, czy warianty stron są widokami async"""
+        assert asyncio.iscoroutinefunction(resolve(reverse(async_name, kwargs=kwargs(game))).func)
+
+    @pytest.mark.parametrize("sync_name, async_name, kwargs", ASYNC_PAGES)
+    def test_same_page_as_sync_view(self, login_user, game, sync_name, async_name, kwargs):
+        """sprawdzam, czy strona async pokazuje to samo co synchroniczna"""
+        player = baker.make("football.Player", team=game.home_team, name="Kowalski", position="st")
+        baker.make("football.Lineup", match=game, team=game.home_team, player=player)
+        baker.make("football.Event", match=game, team=game.home_team, player=player, event_type="goal", minute=10)
+
+        sync_page = login_user.get(reverse(sync_name, kwargs=kwargs(game)))
+        async_page = login_user.get(reverse(async_name, kwargs=kwargs(game)))
+
+        assert async_page.status_code == sync_page.status_code == 200
+        assert page_text(async_page) == page_text(sync_page)
+
+    def test_match_details_cold_cache(self, login_user, game):
+        """sprawdzam, czy strona meczu async wypełnia składy, gdy fragmentu nie ma w cache"""
+        player = baker.make("football.Player", team=game.away_team, name="Nowak")
+        baker.make("football.Lineup", match=game, team=game.away_team, player=player)
+
+        response = login_user.get(reverse('async_match_details', kwargs={'pk': game.pk}))
+
+        assert response.context['away'] == [["Nowak", []]]
+        assert "Nowak" in response.content.decode()
+
+    def test_requires_login(self, client, game):
+        """sprawdzam, czy niezalogowany użytkownik jest przekierowany do logowania"""
+        response = client.get(reverse('async_table'))
+        assert response.status_code == 302
+        assert reverse('login') in response.url
+
+    def test_not_found(self, login_user, db):
+        """sprawdzam, czy nieistniejąca drużyna i mecz dają 404"""
+        assert login_user.get(reverse('async_team_info', kwargs={'pk': 999})).status_code == 404
+        assert login_user.get(reverse('async_match_details', kwargs={'pk': 999})).status_code == 404
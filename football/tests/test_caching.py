@@ -0,0 +1,171 @@
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+
+from football.caching import (FIXTURES, MATCHES, STANDINGS, cache_stats, cached, get_match_version, invalidate,
+                              is_match_details_cached, match_details_fragment_key, reset_cache_stats)
+
+
+@pytest.fixture
+def game(db):
+    home, away = baker.make("football.Team", _quantity=2)
+    return baker.make("football.Match", home_team=home, away_team=away, lap=1, home_score=1, away_score=0)
+
+
+@pytest.fixture(params=["locmem", "file"])
+def cache_backend(request, settings, tmp_path):
+    """Uruchamia test na cache w pamięci i na cache plikowym"""
+    if request.param == "file":
+        settings.CACHES = {
+            alias: {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": str(tmp_path / alias),
+            }
+            for alias in settings.CACHES
+        }
+    else:
+        settings.CACHES = {
+            alias: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": f"test-{alias}"}
+            for alias in settings.CACHES
+        }
+    return request.param
+
+
+def details(client, game):
+    return client.get(reverse('match_details', kwargs={'pk': game.pk}))
+
+
+@pytest.mark.django_db
+class TestMatchDetailsCache():
+
+    def test_second_request_served_from_fragment(self, client, game, cache_backend):
+        """sprawdzam, czy drugi odczyt strony meczu korzysta z wyrenderowanego fragmentu"""
+        client.force_login(baker.make("auth.User"))
+        player = baker.make("football.Player", team=game.home_team, name="Zawodnik")
+        baker.make("football.Lineup", match=game, team=game.home_team, player=player)
+
+        first = details(client, game)
+        assert "Zawodnik" in first.content.decode()
+        assert is_match_details_cached(game.pk, get_match_version(game.pk))
+
+        with CaptureQueriesContext(connection) as queries:
+            second = details(client, game)
+        assert not [query for query in queries.captured_queries if 'football_lineup' in query['sql']]
+        assert "Zawodnik" in second.content.decode()
+
+    def test_evicted_fragment_rendered_with_lineups(self, client, game, cache_backend):
+        """sprawdzam, czy po wypadnięciu fragmentu z cache strona znów pokazuje składy, a nie pusty blok"""
+        client.force_login(baker.make("auth.User"))
+        player = baker.make("football.Player", team=game.home_team, name="Zawodnik")
+        baker.make("football.Lineup", match=game, team=game.home_team, player=player)
+        details(client, game)
+
+        caches[MATCHES].delete(match_details_fragment_key(game.pk, get_match_version(game.pk)))
+        assert "Zawodnik" in details(client, game).content.decode()
+        assert "Zawodnik" in details(client, game).content.decode()
+
+    def test_renames_invalidate_fragment(self, client, game):
+        """sprawdzam, czy zmiana nazwy drużyny lub nazwiska zawodnika odświeża fragment meczu"""
+        client.force_login(baker.make("auth.User"))
+        player = baker.make("football.Player", team=game.home_team, name="Zawodnik")
+        baker.make("football.Lineup", match=game, team=game.home_team, player=player)
+        details(client, game)
+
+        player.name = "Nowe Nazwisko"
+        player.save()
+        game.home_team.name = "Nowa Drużyna"
+        game.home_team.save()
+
+        content = details(client, game).content.decode()
+        assert "Nowe Nazwisko" in content
+        assert "Nowa Drużyna" in content
+
+    @pytest.mark.parametrize("model", ["football.Lineup", "football.Event"])
+    def test_write_invalidates_fragment(self, client, game, cache_backend, model):
+        """sprawdzam, czy zapis składu lub wydarzenia unieważnia fragment meczu"""
+        client.force_login(baker.make("auth.User"))
+        details(client, game)
+        version = get_match_version(game.pk)
+
+        player = baker.make("football.Player", team=game.home_team, name="Nowy zawodnik")
+        baker.make(model, match=game, team=game.home_team, player=player)
+
+        assert get_match_version(game.pk) != version
+        assert not is_match_details_cached(game.pk, get_match_version(game.pk))
+        details(client, game)
+        assert is_match_details_cached(game.pk, get_match_version(game.pk))
+
+    def test_substitution_and_score_change_invalidate(self, game):
+        """sprawdzam, czy zmiana i poprawa wyniku podbijają wersję meczu"""
+        version = get_match_version(game.pk)
+        event = baker.make("football.Event", match=game, event_type="substitution", minute=60)
+        baker.make("football.Substitution", event=event)
+        assert get_match_version(game.pk) != version
+
+        version = get_match_version(game.pk)
+        game.home_score = 5
+        game.save()
+        assert get_match_version(game.pk) != version
+
+    def test_version_survives_cache_clear(self, game):
+        """sprawdzam, czy po wyczyszczeniu cache wersja nie wraca do starej wartości"""
+        version = get_match_version(game.pk)
+        caches['matches'].clear()
+        assert get_match_version(game.pk) != version
+
+
+@pytest.mark.django_db
+class TestCacheLayer():
+
+    def test_cached_counts_hits_and_misses(self):
+        """sprawdzam, czy cached liczy wartość tylko przy chybieniu i zlicza trafienia"""
+        reset_cache_stats()
+        calls = []
+
+        def build():
+            calls.append(1)
+            return [1, 2, 3]
+
+        assert cached(FIXTURES, 'klucz', build) == [1, 2, 3]
+        assert cached(FIXTURES, 'klucz', build) == [1, 2, 3]
+        invalidate(FIXTURES, 'klucz')
+        cached(FIXTURES, 'klucz', build)
+
+        assert len(calls) == 2
+        assert cache_stats()[FIXTURES] == {'hits': 1, 'misses': 2}
+
+    def test_cached_respects_timeout(self):
+        """sprawdzam, czy wartość z zerowym TTL nie zostaje w cache"""
+        calls = []
+        cached(STANDINGS, 'krótki', lambda: calls.append(1), timeout=0)
+        cached(STANDINGS, 'krótki', lambda: calls.append(1), timeout=0)
+        assert len(calls) == 2
+
+    def test_table_served_from_cache_until_match_saved(self, client, game):
+        """sprawdzam, czy tabela jest brana z cache i odświeżana po zapisie meczu"""
+        client.force_login(baker.make("auth.User"))
+        client.get(reverse('table'))
+        reset_cache_stats()
+
+        client.get(reverse('table'))
+        assert cache_stats()[STANDINGS] == {'hits': 1}
+
+        game.home_score = 0
+        game.away_score = 2
+        game.save()
+        response = client.get(reverse('table'))
+
+        assert cache_stats()[STANDINGS] == {'hits': 1, 'misses': 1}
+        assert response.context['teams_stat'][0].team == game.away_team
+
+    def test_lap_fixtures_refreshed_after_new_match(self, client, game):
+        """sprawdzam, czy lista meczów kolejki widzi nowo dodany mecz"""
+        client.force_login(baker.make("auth.User"))
+        assert len(client.get(reverse('lap', kwargs={'pk': 1})).context['matches']) == 1
+
+        baker.make("football.Match", home_team=game.away_team, away_team=game.home_team, lap=1)
+
+        assert len(client.get(reverse('lap', kwargs={'pk': 1})).context['matches']) == 2
@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from model_bakery import baker
+
+from football import exports
+
+
+@pytest.fixture
+def game(db):
+    home = baker.make("football.Team", name="Legia")
+    away = baker.make("football.Team", name="Lech")
+    return baker.make("football.Match", home_team=home, away_team=away, lap=3, home_score=2, away_score=1)
+
+
+def moderator(*codenames):
+    user = baker.make("auth.User")
+    user.user_permissions.add(*Permission.objects.filter(codename__in=codenames))
+    return user
+
+
+@pytest.mark.django_db
+class TestExportData():
+
+    def test_jsonl_to_stdout(self, game):
+        """sprawdzam, czy mecze są eksportowane jako JSON Lines z nazwami drużyn"""
+        out = io.StringIO()
+        call_command('export_data', 'matches', stdout=out)
+
+        [row] = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert row['home_team_name'] == "Legia"
+        assert row['away_team_id'] == game.away_team_id
+        assert row['home_score'] == 2
+        assert row['date'] == str(game.date)
+
+    def test_csv_to_file_in_chunks(self, game, tmp_path):
+        """sprawdzam, czy eksport CSV do pliku zapisuje nagłówek i wszystkie wiersze przy małych paczkach"""
+        baker.make("football.Player", team=game.home_team, _quantity=5)
+        path = tmp_path / "zawodnicy.csv"
+        out = io.StringIO()
+        call_command('export_data', 'players', format='csv', output=str(path), chunk_size=2, stdout=out)
+
+        rows = list(csv.reader(path.open(encoding="utf-8")))
+        assert rows[0] == exports.columns('players')
+        assert len(rows) == 6
+        assert "Wyeksportowano 5 wierszy" in out.getvalue()
+
+    def test_columnar_requires_pyarrow(self, game, tmp_path, monkeypatch):
+        """sprawdzam, czy bez pyarrow eksport do Parquet kończy się czytelnym błędem"""
+        monkeypatch.setattr("football.management.commands.export_data.pyarrow", None)
+        with pytest.raises(CommandError, match="pyarrow"):
+            call_command('export_data', 'matches', format='parquet', output=str(tmp_path / "mecze.parquet"))
+
+    def test_parquet_round_trip(self, game, tmp_path):
+        """sprawdzam, czy plik Parquet zawiera wszystkie wiersze z typami kolumn"""
+        pyarrow = pytest.importorskip("pyarrow")
+        import pyarrow.parquet
+        baker.make("football.Event", match=game, team=game.home_team, event_type="goal", description=None)
+        path = tmp_path / "wydarzenia.parquet"
+
+        call_command('export_data', 'events', format='parquet', output=str(path), stdout=io.StringIO())
+
+        table = pyarrow.parquet.read_table(path)
+        assert table.num_rows == 1
+        assert table.schema.field('minute').type == pyarrow.int64()
+
+
+@pytest.mark.django_db
+class TestExportView():
+
+    def test_streams_csv_attachment(self, client, game):
+        """sprawdzam, czy widok eksportu strumieniuje CSV jako załącznik"""
+        client.force_login(moderator('view_match'))
+        response = client.get(reverse('export', kwargs={'dataset': 'matches', 'format': 'csv'}))
+
+        assert response.streaming
+        assert response['Content-Type'] == 'text/csv'
+        assert 'matches.csv' in response['Content-Disposition']
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        assert rows[1][4] == "Legia"
+
+    def test_requires_view_permission(self, client, game):
+        """sprawdzam, czy eksport wymaga uprawnienia do oglądania danego modelu"""
+        client.force_login(moderator('view_match'))
+        response = client.get(reverse('export', kwargs={'dataset': 'players', 'format': 'jsonl'}))
+        assert response.status_code == 403
+
+    def test_unknown_dataset(self, client, game):
+        """sprawdzam, czy nieznany zbiór danych daje 404"""
+        client.force_login(moderator('view_match'))
+        response = client.get(reverse('export', kwargs={'dataset': 'users', 'format': 'jsonl'}))
+        assert response.status_code == 404
@@ -0,0 +1,99 @@
+import pytest
+from datetime import date, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+
+from football.fixtures import fixtures, fixtures_page
+from football.pagination import PAGE_SIZE
+from football.models import Match
+
+
+def round_robin(teams):
+    """Terminarz ligi każdy z każdym, mecz i rewanż - 38 kolejek dla 20 drużyn."""
+    rotation = list(teams)
+    rounds = []
+    for _ in range(len(teams) - 1):
+        half = len(rotation) // 2
+        rounds.append(list(zip(rotation[:half], reversed(rotation[half:]))))
+        rotation = [rotation[0], rotation[-1], *rotation[1:-1]]
+    rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
+    return [
+        Match(lap=lap, date=date(2024, 8, 1) + timedelta(weeks=lap), home_team=home, away_team=away,
+              home_score=lap % 3, away_score=lap % 2)
+        for lap, pairs in enumerate(rounds, start=1) for home, away in pairs
+    ]
+
+
+@pytest.fixture
+def login_user(db, client):
+    client.force_login(baker.make("auth.User"))
+    return client
+
+
+@pytest.fixture
+def season(db):
+    teams = baker.make("football.Team", _quantity=20)
+    Match.objects.bulk_create(round_robin(teams))
+    return teams
+
+
+def team_queries(queries):
+    # Zapytania pobierające same drużyny, np. leniwe match.home_team
+    return [query['sql'] for query in queries if query['sql'].startswith('SELECT') and 'FROM "football_team"' in query['sql']]
+
+
+@pytest.mark.django_db
+class TestFixtureListings():
+
+    def test_season_has_38_rounds(self, season):
+        """sprawdzam, czy każda drużyna gra 38 meczów po jednym w każdej kolejce"""
+        assert Match.objects.count() == 380
+        assert fixtures(home_team=season[0]).count() + fixtures(away_team=season[0]).count() == 38
+
+    def test_team_matches_without_lazy_team_queries(self, login_user, season):
+        """sprawdzam, czy terminarz drużyny na cały sezon pobiera mecze z drużynami jednym zapytaniem"""
+        url = reverse('team_matches', kwargs={'pk': season[0].pk})
+        login_user.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = login_user.get(reverse('team_matches', kwargs={'pk': season[1].pk}))
+
+        assert len(response.context['matches']) == 38
+        match_queries = [query['sql'] for query in queries.captured_queries if 'FROM "football_match"' in query['sql']]
+        assert len(match_queries) == 1
+        assert '"football_team"."founded"' not in match_queries[0]
+        assert len(team_queries(queries.captured_queries)) == 1  # sama drużyna z adresu
+
+    def test_lap_query_count_does_not_depend_on_matches(self, login_user, season):
+        """sprawdzam, czy liczba zapytań strony kolejki nie zależy od liczby meczów"""
+        baker.make("football.Match", home_team=season[0], away_team=season[1], lap=39)
+        login_user.get(reverse('index'))
+
+        with CaptureQueriesContext(connection) as small:
+            login_user.get(reverse('lap', kwargs={'pk': 39}))
+        with CaptureQueriesContext(connection) as full:
+            response = login_user.get(reverse('lap', kwargs={'pk': 38}))
+
+        assert len(response.context['matches']) == 10
+        assert len(full.captured_queries) == len(small.captured_queries)
+        assert team_queries(full.captured_queries) == []
+
+    def test_fixtures_page(self, season):
+        """sprawdzam, czy strony meczów sezonu po kolei dają cały sezon bez powtórzeń"""
+        pages = [fixtures_page(fixtures())]
+        while pages[-1].has_next:
+            pages.append(fixtures_page(fixtures(), pages[-1].next_cursor))
+
+        assert len(pages) == 8
+        assert len(pages[-1].object_list) == 380 - 7 * PAGE_SIZE
+        seen = [match.pk for page in pages for match in page.object_list]
+        assert seen == list(fixtures().values_list('pk', flat=True))
+
+    def test_lap_view_paginates(self, login_user, season):
+        """sprawdzam, czy widok kolejki udostępnia stronicowanie, a zły kursor daje 404"""
+        response = login_user.get(reverse('lap', kwargs={'pk': 1}))
+        assert not response.context['page_obj'].has_next
+        assert not response.context['is_paginated']
+        assert login_user.get(reverse('lap', kwargs={'pk': 1}), {'cursor': 'zły'}).status_code == 404
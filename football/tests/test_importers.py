@@ -0,0 +1,254 @@
+import json
+
+import pytest
+from datetime import date
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from model_bakery import baker
+
+from football.models import Event, LapStanding, Lineup, Match, Player, PlayerSeasonStats, Standing, Substitution, Team
+
+
+@pytest.fixture
+def teams(db):
+    return [baker.make("football.Team", name="Legia"), baker.make("football.Team", name="Lech")]
+
+
+def write_players(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.django_db
+class TestImportPlayers():
+
+    def test_import_players(self, teams, tmp_path, capsys):
+        """sprawdzam, czy zawodnicy trafiają do właściwych drużyn z poprawnymi danymi"""
+        path = write_players(tmp_path / "zawodnicy.txt", [
+            "Legia,gk,Jan Kowalski,Polska,01.02.95,190/85,Wisła,",
+            "Lech,st,Adam Nowak,Polska,15.11.01,180/75,,",
+        ])
+
+        call_command('import_players', path, batch_size=1)
+
+        kowalski = Player.objects.get(name="Jan Kowalski")
+        assert kowalski.team == teams[0]
+        assert kowalski.position == "gk"
+        assert kowalski.birth_day == date(1995, 2, 1)
+        assert Player.objects.get(name="Adam Nowak").team == teams[1]
+        assert "Dodano 2, zaktualizowano 0, bez zmian 0 zawodników, odrzucono 0" in capsys.readouterr().out
+
+    def test_import_reports_rejected_rows(self, teams, tmp_path, capsys):
+        """sprawdzam, czy błędne wiersze są odrzucane i raportowane, a poprawne zapisane"""
+        path = write_players(tmp_path / "zawodnicy.txt", [
+            "Legia,gk,Jan Kowalski,Polska,01.02.95,190/85,Wisła,",
+            "Nieznana,gk,Piotr Zieliński,Polska,01.02.95,190/85,,",
+            "Legia,xx,Piotr Zieliński,Polska,01.02.95,190/85,,",
+            "Legia,df,Piotr Zieliński,Polska,31.02.95,190/85,,",
+            "Legia,df,za mało kolumn",
+        ])
+        rejects = tmp_path / "odrzucone.csv"
+
+        call_command('import_players', path, rejects=str(rejects))
+
+        assert Player.objects.count() == 1
+        err = capsys.readouterr().err
+        assert "linia 2: drużyna 'Nieznana' nie istnieje" in err
+        assert "linia 3: nieznana pozycja 'xx'" in err
+        assert "linia 4: niepoprawna data urodzenia" in err
+        assert "linia 5: za mało kolumn" in err
+        assert len(rejects.read_text(encoding="utf-8").splitlines()) == 4
+
+    def test_import_skip_header(self, teams, tmp_path):
+        """sprawdzam, czy można pominąć wiersz nagłówka"""
+        path = write_players(tmp_path / "zawodnicy.csv", [
+            "team;position;name;nationality;birth;hw;club;x",
+            "Lech;mf;Adam Nowak;Polska;15.11.01;180/75;;",
+        ])
+
+        call_command('import_players', path, delimiter=";", skip_header=True)
+
+        assert list(Player.objects.values_list('name', flat=True)) == ["Adam Nowak"]
+
+    def test_import_missing_file(self, db):
+        """sprawdzam, czy brak pliku kończy się czytelnym błędem"""
+        with pytest.raises(CommandError):
+            call_command('import_players', "/nie/ma/takiego/pliku.txt")
+
+
+@pytest.mark.django_db
+class TestUpsertPlayers():
+
+    lines = [
+        "Legia,gk,Jan Kowalski,Polska,01.02.95,190/85,Wisła,",
+        "Lech,st,Adam Nowak,Polska,15.11.01,180/75,,",
+    ]
+
+    def test_reimport_does_not_duplicate(self, teams, tmp_path, capsys):
+        """sprawdzam, czy ponowny import w trybie upsert nie dubluje zawodników"""
+        path = write_players(tmp_path / "zawodnicy.txt", self.lines)
+
+        call_command('import_players', path, upsert=True)
+        call_command('import_players', path, upsert=True)
+
+        assert Player.objects.count() == 2
+        out = capsys.readouterr().out.splitlines()
+        assert "Dodano 2, zaktualizowano 0, bez zmian 0" in out[0]
+        assert "Dodano 0, zaktualizowano 0, bez zmian 2" in out[1]
+
+    def test_reimport_updates_changed_rows(self, teams, tmp_path, capsys):
+        """sprawdzam, czy zmiana drużyny lub pozycji aktualizuje istniejący wiersz"""
+        call_command('import_players', write_players(tmp_path / "a.txt", self.lines), upsert=True)
+        kowalski = Player.objects.get(name="Jan Kowalski")
+        path = write_players(tmp_path / "b.txt", [
+            "Lech,gk,Jan Kowalski,Polska,01.02.95,190/85,Legia,",
+            "Lech,st,Adam Nowak,Polska,15.11.01,180/75,,",
+            "Legia,mf,Piotr Zieliński,Polska,20.05.94,180/75,,",
+        ])
+        capsys.readouterr()
+
+        call_command('import_players', path, upsert=True, batch_size=2)
+
+        assert Player.objects.count() == 3
+        kowalski.refresh_from_db()
+        assert kowalski.team == teams[1]
+        assert "Dodano 1, zaktualizowano 1, bez zmian 1" in capsys.readouterr().out
+
+    def test_same_name_different_birth_day_is_new_player(self, teams, tmp_path):
+        """sprawdzam, czy zawodnik o tym samym nazwisku, ale innej dacie urodzenia jest nowym zawodnikiem"""
+        call_command('import_players', write_players(tmp_path / "a.txt", self.lines), upsert=True)
+        call_command('import_players', write_players(tmp_path / "b.txt", [
+            "Legia,gk,Jan Kowalski,Polska,02.02.95,190/85,Wisła,",
+        ]), upsert=True)
+
+        assert Player.objects.filter(name="Jan Kowalski").count() == 2
+
+
+@pytest.mark.django_db
+class TestImportTeams():
+
+    def test_import_and_update_teams(self, tmp_path, capsys):
+        """sprawdzam, czy drużyny są dodawane, aktualizowane po nazwie i dostają wiersz tabeli"""
+        baker.make("football.Team", name="Legia", city="Warszawa", founded=date(1916, 3, 5), stadium="")
+        path = write_players(tmp_path / "druzyny.csv", [
+            "Legia,Warszawa,1916-03-05,Stadion Wojska Polskiego",
+            "Lech,Poznań,1922-03-19,",
+            "Bez daty,Miasto,brak,",
+        ])
+
+        call_command('import_teams', path)
+
+        assert Team.objects.count() == 2
+        assert Team.objects.get(name="Legia").stadium == "Stadion Wojska Polskiego"
+        assert Standing.objects.filter(team__name="Lech").exists()
+        captured = capsys.readouterr()
+        assert "Dodano 1, zaktualizowano 1, bez zmian 0 drużyn, odrzucono 1" in captured.out
+        assert "linia 3: niepoprawna data założenia" in captured.err
+
+
+@pytest.fixture
+def squads(teams):
+    for team in teams:
+        for number in range(1, 15):
+            baker.make("football.Player", team=team, name=f"{team.name} {number}")
+    return teams
+
+
+def match_line(**overrides):
+    record = {
+        "lap": 1, "date": "2025-04-02", "home_team": "Legia", "away_team": "Lech", "home_score": 2, "away_score": 1,
+        "lineups": {
+            "home": [f"Legia {number}" for number in range(1, 12)],
+            "away": [f"Lech {number}" for number in range(1, 12)],
+        },
+        "events": [
+            {"team": "home", "player": "Legia 9", "event_type": "goal", "minute": 12},
+            {"team": "away", "player": "Lech 4", "event_type": "red_card", "minute": 30},
+            {"team": "home", "player": "Legia 7", "event_type": "substitution", "minute": 60, "player_in": "Legia 12"},
+        ],
+    }
+    record.update(overrides)
+    return json.dumps(record, ensure_ascii=False)
+
+
+@pytest.mark.django_db
+class TestImportMatches():
+
+    def test_import_match_with_lineups_and_events(self, squads, tmp_path):
+        """sprawdzam, czy mecz zapisuje się ze składami, wydarzeniami, zmianą i tabelą"""
+        path = write_players(tmp_path / "mecze.jsonl", [match_line()])
+
+        call_command('import_matches', path)
+
+        game = Match.objects.get()
+        assert (game.home_team, game.home_score, game.away_score) == (squads[0], 2, 1)
+        assert Lineup.objects.filter(match=game).count() == 23
+        assert Lineup.objects.get(match=game, player__name="Legia 12").is_starting is False
+        assert Lineup.objects.get(match=game, player__name="Legia 7").on_bench is True
+        assert Lineup.objects.get(match=game, player__name="Lech 4").on_bench is True
+        assert Event.objects.filter(match=game).count() == 3
+        assert Substitution.objects.get().player_in.name == "Legia 12"
+        assert Standing.objects.get(team=squads[0]).points == 3
+        assert LapStanding.objects.filter(lap=1).count() == 2
+        scorer = PlayerSeasonStats.objects.get(player__name="Legia 9")
+        assert (scorer.goals, scorer.minutes) == (1, 90)
+        assert PlayerSeasonStats.objects.get(player__name="Legia 12").minutes == 30
+
+    def test_import_rejects_invalid_matches(self, squads, tmp_path, capsys):
+        """sprawdzam, czy błędny mecz jest odrzucany w całości, a pozostałe zapisane"""
+        path = write_players(tmp_path / "mecze.jsonl", [
+            match_line(),
+            match_line(away_team="Legia"),
+            match_line(events=[{"team": "home", "player": "Lech 1", "event_type": "goal", "minute": 5}]),
+            match_line(events=[{"team": "home", "player": "Legia 1", "event_type": "corner", "minute": 5}]),
+            "{niepoprawny json",
+        ])
+
+        call_command('import_matches', path, batch_size=2)
+
+        assert Match.objects.count() == 1
+        err = capsys.readouterr().err
+        assert "linia 2: drużyna gości nie może być taka sama" in err
+        assert "linia 3: zawodnik 'Lech 1' nie należy do drużyny 'Legia'" in err
+        assert "linia 4: nieznany typ wydarzenia 'corner'" in err
+        assert "linia 5: niepoprawny JSON" in err
+
+    def test_import_rejects_wrong_shapes(self, squads, tmp_path, capsys):
+        """sprawdzam, czy poprawny JSON o złej strukturze odrzuca tylko swój mecz, zamiast przerywać import"""
+        path = write_players(tmp_path / "mecze.jsonl", [
+            match_line(lineups=["Legia 1"]),
+            match_line(lineups={"home": [1]}),
+            match_line(lineups={"home": "Legia 1"}),
+            match_line(events=["x"]),
+            match_line(events={"team": "home"}),
+            match_line(events=[{"team": ["home"], "player": "Legia 1", "event_type": "goal", "minute": 5}]),
+            match_line(events=[{"team": "home", "player": "Legia 1", "event_type": ["goal"], "minute": 5}]),
+            match_line(home_team=["Legia"]),
+            match_line(),
+        ])
+
+        call_command('import_matches', path, batch_size=2)
+
+        assert Match.objects.count() == 1
+        err = capsys.readouterr().err
+        assert "linia 1: pole lineups musi być obiektem" in err
+        assert "linia 2: niepoprawny wpis składu 1" in err
+        assert "linia 3: skład 'home' musi być listą" in err
+        assert "linia 4: niepoprawne wydarzenie 'x'" in err
+        assert "linia 5: pole events musi być listą" in err
+        assert "linia 6: nieznana strona ['home']" in err
+        assert "linia 7: nieznany typ wydarzenia ['goal']" in err
+        assert "linia 8: pole home_team musi być nazwą drużyny" in err
+
+    def test_import_results_from_csv(self, teams, tmp_path):
+        """sprawdzam, czy same wyniki można zaimportować z pliku CSV"""
+        path = write_players(tmp_path / "wyniki.csv", [
+            "lap,date,home_team,away_team,home_score,away_score",
+            "1,2025-04-02,Legia,Lech,0,0",
+            "2,2025-04-09,Lech,Legia,3,1",
+        ])
+
+        call_command('import_matches', path, skip_header=True)
+
+        assert list(Match.objects.order_by('lap').values_list('lap', 'home_score')) == [(1, 0), (2, 3)]
+        assert Standing.objects.get(team=teams[1]).points == 4
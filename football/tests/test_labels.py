@@ -0,0 +1,124 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from football.forms import TeamCreateEventForm
+from football.labels import LabelCache
+from football.models import Lineup, Match, Player, Team
+
+
+@pytest.fixture
+def game(db):
+    home = baker.make("football.Team", name="Legia")
+    away = baker.make("football.Team", name="Lech")
+    return baker.make("football.Match", home_team=home, away_team=away, lap=1)
+
+
+@pytest.fixture
+def label_cache(settings):
+    settings.SPORT_LABEL_CACHE = True
+
+
+def count_queries(function):
+    with CaptureQueriesContext(connection) as queries:
+        result = function()
+    return len(queries.captured_queries), result
+
+
+@pytest.mark.django_db
+class TestModelLabels():
+
+    def test_match_str_loads_team_names_once(self, game, label_cache):
+        """sprawdzam, czy __str__ wielu meczów tych samych drużyn nie pyta o drużyny dla każdego meczu"""
+        baker.make("football.Match", home_team=game.home_team, away_team=game.away_team, lap=2, _quantity=9)
+        matches = list(Match.objects.all())
+
+        queries, labels = count_queries(lambda: [str(match) for match in matches])
+
+        assert set(labels) == {"Legia vs Lech"}
+        assert queries <= 2
+
+    def test_labels_follow_renames(self, game, label_cache):
+        """sprawdzam, czy po zmianie nazwy drużyny etykiety meczu i zawodnika są aktualne"""
+        player = baker.make("football.Player", team=game.home_team, name="Kowalski")
+        assert str(Match.objects.get(pk=game.pk)) == "Legia vs Lech"
+        str(Player.objects.get(pk=player.pk))
+
+        game.home_team.name = "Legia Warszawa"
+        game.home_team.save()
+
+        assert str(Match.objects.get(pk=game.pk)) == "Legia Warszawa vs Lech"
+        assert "(Legia Warszawa)" in str(Player.objects.get(pk=player.pk))
+
+    def test_without_label_cache_names_always_current(self, game, settings):
+        """sprawdzam, czy bez SPORT_LABEL_CACHE etykieta widzi zmianę nazwy, o której proces nie dostał sygnału"""
+        settings.SPORT_LABEL_CACHE = False
+        assert str(Match.objects.get(pk=game.pk)) == "Legia vs Lech"
+
+        # Zmiana z innego workera: lokalna wersja etykiet nie zostaje podbita
+        Team.objects.filter(pk=game.home_team_id).update(name="Legia Warszawa")
+
+        assert str(Match.objects.get(pk=game.pk)) == "Legia Warszawa vs Lech"
+
+    def test_match_label_follows_team_change(self, game):
+        """sprawdzam, czy zmiana drużyny w meczu odświeża etykietę meczu w wydarzeniach"""
+        event = baker.make("football.Event", match=game, event_type="goal", minute=5)
+        assert "Legia vs Lech" in str(type(event).objects.get(pk=event.pk))
+
+        game.away_team = baker.make("football.Team", name="Wisła")
+        game.save()
+
+        assert "Legia vs Wisła" in str(type(event).objects.get(pk=event.pk))
+
+    def test_labels_same_as_loaded_relations(self, game):
+        """sprawdzam, czy etykieta z cache jest taka sama jak z pobranej relacji"""
+        player = baker.make("football.Player", team=game.home_team, name="Kowalski")
+        lineup = baker.make("football.Lineup", match=game, team=game.home_team, player=player)
+        related = Lineup.objects.select_related('player', 'team', 'match__home_team', 'match__away_team').get(pk=lineup.pk)
+        assert str(Lineup.objects.get(pk=lineup.pk)) == str(related) == "Kowalski (Starting) - Legia in Legia vs Lech"
+
+
+class TestLabelCache():
+
+    def test_evicts_least_recently_used(self):
+        """sprawdzam, czy cache etykiet ma ograniczony rozmiar i usuwa najdawniej używane"""
+        cache = LabelCache(maxsize=2)
+        cache.set_many({1: "a", 2: "b"})
+        cache.get_many([1])
+        cache.set_many({3: "c"})
+        assert cache.get_many([1, 2, 3]) == {1: "a", 3: "c"}
+
+
+@pytest.mark.django_db
+class TestFormLabels():
+
+    def test_event_form_options_in_one_query(self, game):
+        """sprawdzam, czy opcje zawodników w formularzu wydarzenia powstają jednym zapytaniem"""
+        for number in range(11):
+            player = baker.make("football.Player", team=game.home_team, name=f"Zawodnik {number}")
+            baker.make("football.Lineup", match=game, team=game.home_team, player=player)
+        bench = baker.make("football.Player", team=game.home_team, name="Rezerwowy", position="st")
+        queries, form = count_queries(lambda: TeamCreateEventForm(
+            event_type="substitution",
+            players_in_match=Lineup.objects.filter(match=game, team=game.home_team),
+            players_on_bench=Player.objects.filter(pk=bench.pk),
+        ))
+        assert queries == 0
+
+        queries, choices = count_queries(lambda: [choice for choice in form.fields['player'].choices])
+        assert queries == 1
+        assert [label for _, label in choices[1:]] == [f"Zawodnik {number}" for number in range(11)]
+
+        queries, choices = count_queries(lambda: [choice for choice in form.fields['player_in'].choices])
+        assert queries == 1
+        assert choices[1][1] == str(Player.objects.select_related('team').get(pk=bench.pk))
+
+    def test_event_form_cleans_lineup_to_player(self, game):
+        """sprawdzam, czy wybrana pozycja składu zamienia się w zawodnika"""
+        player = baker.make("football.Player", team=game.home_team)
+        lineup = baker.make("football.Lineup", match=game, team=game.home_team, player=player)
+        form = TeamCreateEventForm({'player': lineup.pk}, players_in_match=Lineup.objects.filter(match=game))
+
+        assert form.is_valid(), form.errors
+        assert form.cleaned_data['player'] == player
@@ -0,0 +1,138 @@
+import pytest
+from django.urls import reverse
+from model_bakery import baker
+
+from football.leaderboards import lap_board, leaderboard, top_k
+from football.models import Lineup
+from football.player_stats import empty_stats, top_scorers
+
+
+@pytest.fixture
+def laps(db):
+    home, away = baker.make("football.Team", _quantity=2)
+    return [baker.make("football.Match", home_team=home, away_team=away, lap=lap) for lap in (1, 2)]
+
+
+@pytest.fixture
+def players(laps):
+    return baker.make("football.Player", team=laps[0].home_team, _quantity=3)
+
+
+def goal(game, player, minute=10):
+    return baker.make("football.Event", match=game, team=game.home_team, player=player, event_type="goal",
+                      minute=minute)
+
+
+def record(**values):
+    return {**empty_stats(), **values}
+
+
+class TestTopK():
+
+    def test_order_and_ties(self):
+        """sprawdzam, czy czołówka ma kolejność rankingu: przy remisie bramek mniej minut, a potem mniejsze id"""
+        stats = {1: record(goals=2, minutes=270), 2: record(goals=3, minutes=450), 3: record(goals=2, minutes=90),
+                 4: record(goals=2, minutes=270), 5: record(minutes=900)}
+        assert top_k(stats, 'goals') == [2, 3, 1, 4]
+        assert top_k(stats, 'goals', k=2) == [2, 3]
+
+    def test_discipline_order(self):
+        """sprawdzam, czy w rankingu kartek czerwone liczą się przed żółtymi"""
+        stats = {1: record(yellow_cards=3), 2: record(red_cards=1), 3: record(goals=1)}
+        assert top_k(stats, 'discipline') == [2, 1]
+
+
+@pytest.mark.django_db
+class TestLeaderboard():
+
+    def test_shared_rank_and_names(self, laps, players):
+        """sprawdzam, czy zawodnicy z równą liczbą bramek dzielą miejsce, a kolejność ustalają minuty"""
+        first, second, third = players
+        goal(laps[0], first)
+        goal(laps[0], first, 20)
+        goal(laps[0], second)
+        goal(laps[1], third)
+        baker.make("football.Lineup", match=laps[0], team=laps[0].home_team, player=second)
+
+        rows = leaderboard('goals')
+        assert [(row['rank'], row['player_id'], row['goals']) for row in rows] == [
+            (1, first.pk, 2), (2, third.pk, 1), (2, second.pk, 1),
+        ]
+        assert rows[0]['name'] == first.name
+        assert (rows[2]['appearances'], rows[2]['minutes']) == (1, 90)
+        assert [row['player_id'] for row in leaderboard('goals', lap=2)] == [third.pk]
+
+    def test_same_order_as_stats_page(self, laps, players, django_capture_on_commit_callbacks):
+        """sprawdzam, czy ranking sezonu ma tę samą kolejność co strzelcy z PlayerSeasonStats na stronie"""
+        with django_capture_on_commit_callbacks(execute=True):
+            for player in players:
+                goal(laps[0], player)
+            baker.make("football.Lineup", match=laps[0], team=laps[0].home_team, player=players[0])
+            baker.make("football.Lineup", match=laps[1], team=laps[1].home_team, player=players[1])
+            baker.make("football.Lineup", match=laps[1], team=laps[1].home_team, player=players[0])
+
+        assert [row['player_id'] for row in leaderboard('goals')] == [stats.player_id for stats in top_scorers()]
+        assert [stats.player_id for stats in top_scorers()] == [players[2].pk, players[1].pk, players[0].pk]
+
+    def test_lap_cached_until_its_event(self, laps, players, django_assert_num_queries):
+        """sprawdzam, czy wydarzenie unieważnia tylko ranking swojej kolejki, a sezon sumuje kolejki"""
+        goal(laps[0], players[0])
+        goal(laps[1], players[1])
+        leaderboard('goals')
+
+        with django_assert_num_queries(0):
+            lap_board(1)
+            lap_board(2)
+
+        goal(laps[1], players[1], 30)
+        with django_assert_num_queries(0):
+            lap_board(1)
+        # Sezon: lista kolejek + statystyki nowej kolejki 2 (mecze, składy, wydarzenia, dwa na odcinki gry) + nazwy
+        with django_assert_num_queries(7):
+            rows = leaderboard('goals')
+        assert [(row['player_id'], row['goals']) for row in rows] == [(players[1].pk, 2), (players[0].pk, 1)]
+
+    def test_lineup_delete_bumps_lap_after_commit(self, laps, players, django_capture_on_commit_callbacks):
+        """sprawdzam, czy usunięcie składów querysetem odświeża występy w kolejce po zatwierdzeniu"""
+        for player in players:
+            baker.make("football.Lineup", match=laps[0], team=laps[0].home_team, player=player)
+        assert len(lap_board(1)['top']['appearances']) == 3
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Lineup.objects.filter(match=laps[0]).delete()
+        assert not lap_board(1)['top']['appearances']
+
+    def test_match_moved_to_other_lap(self, laps, players):
+        """sprawdzam, czy przeniesienie meczu do innej kolejki przenosi jego bramki w rankingu"""
+        goal(laps[0], players[0])
+        assert leaderboard('goals', lap=1)
+        laps[0].lap = 3
+        laps[0].save()
+        assert not leaderboard('goals', lap=1)
+        assert leaderboard('goals', lap=3)[0]['player_id'] == players[0].pk
+
+
+@pytest.mark.django_db
+class TestLeaderboardApi():
+
+    def test_season_and_lap(self, client, laps, players):
+        """sprawdzam, czy API zwraca ranking sezonu i kolejki z limitem"""
+        goal(laps[0], players[0])
+        goal(laps[1], players[1])
+        client.force_login(baker.make("auth.User"))
+        response = client.get(reverse('api_leaderboard', kwargs={'category': 'goals'}), {'limit': 1})
+        assert response.status_code == 200
+        assert response.json()['results'][0]['player_id'] == players[0].pk
+        assert len(response.json()['results']) == 1
+
+        response = client.get(reverse('api_lap_leaderboard', kwargs={'lap': 2, 'category': 'goals'}))
+        assert response.json()['lap'] == 2
+        assert [row['player_id'] for row in response.json()['results']] == [players[1].pk]
+
+    def test_not_found(self, client, laps):
+        """sprawdzam, czy nieznany ranking i zły limit kończą się 404"""
+        client.force_login(baker.make("auth.User"))
+        assert client.get(reverse('api_leaderboard', kwargs={'category': 'assists'})).status_code == 404
+        for limit in ('0', '101', 'abc'):
+            url = reverse('api_leaderboard', kwargs={'category': 'goals'})
+            assert client.get(url, {'limit': limit}).status_code == 404
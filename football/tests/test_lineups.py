@@ -0,0 +1,57 @@
+import pytest
+from model_bakery import baker
+
+from football.lineups import save_lineup
+from football.models import Lineup
+
+
+@pytest.fixture
+def game(db):
+    home, away = baker.make("football.Team", _quantity=2)
+    return baker.make("football.Match", home_team=home, away_team=away, lap=1)
+
+
+@pytest.fixture
+def squad(game):
+    return [baker.make("football.Player", team=game.home_team) for _ in range(14)]
+
+
+def lineup_ids(game):
+    return set(Lineup.objects.filter(match=game, team=game.home_team).values_list('player_id', flat=True))
+
+
+@pytest.mark.django_db
+class TestSaveLineup():
+
+    def test_save_new_lineup(self, game, squad, django_assert_max_num_queries):
+        """sprawdzam, czy nowy skład zapisuje się jednym odczytem i jednym wstawieniem (plus savepoint)"""
+        ids = [player.pk for player in squad[:11]]
+
+        with django_assert_max_num_queries(4):
+            added, removed = save_lineup(game, game.home_team, ids)
+
+        assert added == set(ids)
+        assert removed == set()
+        assert lineup_ids(game) == set(ids)
+
+    def test_update_lineup_diff(self, game, squad, django_assert_max_num_queries):
+        """sprawdzam, czy zmiana składu dodaje tylko nowych i usuwa tylko odznaczonych zawodników"""
+        save_lineup(game, game.home_team, [player.pk for player in squad[:11]])
+        kept = Lineup.objects.get(match=game, player=squad[5])
+        new_ids = [player.pk for player in squad[3:14]]
+
+        with django_assert_max_num_queries(6):
+            added, removed = save_lineup(game, game.home_team, new_ids)
+
+        assert added == {player.pk for player in squad[11:14]}
+        assert removed == {player.pk for player in squad[:3]}
+        assert lineup_ids(game) == set(new_ids)
+        assert Lineup.objects.get(match=game, player=squad[5]).pk == kept.pk
+
+    def test_unchanged_lineup_writes_nothing(self, game, squad, django_assert_max_num_queries):
+        """sprawdzam, czy zapis tego samego składu kończy się na jednym odczycie (plus savepoint)"""
+        ids = [player.pk for player in squad[:11]]
+        save_lineup(game, game.home_team, ids)
+
+        with django_assert_max_num_queries(3):
+            assert save_lineup(game, game.home_team, ids) == (set(), set())
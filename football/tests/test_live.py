@@ -0,0 +1,148 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from model_bakery import baker
+
+from football import live
+from football.live import CacheBroker, LocalBroker, channel, match_stream
+
+
+@pytest.fixture
+def game(db):
+    home, away = baker.make("football.Team", _quantity=2)
+    return baker.make("football.Match", home_team=home, away_team=away, lap=1)
+
+
+def parse(message):
+    lines = dict(line.split(": ", 1) for line in message.strip().splitlines())
+    return lines['event'], json.loads(lines['data'])
+
+
+@pytest.mark.parametrize("broker_class", [LocalBroker, CacheBroker])
+def test_broker_delivers_to_subscribers_of_channel(broker_class):
+    """sprawdzam, czy broker dostarcza komunikat tylko subskrybentom danego kanału"""
+    broker = broker_class() if broker_class is LocalBroker else CacheBroker(poll_interval=0.01)
+
+    async def scenario():
+        subscription = broker.subscribe(channel(1))
+        other = broker.subscribe(channel(2))
+        await subscription.start()
+        await other.start()
+        broker.publish(channel(1), {'type': 'event', 'data': {'id': 7}})
+        message = await asyncio.wait_for(subscription.get(), 1)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(other.get(), 0.05)
+        subscription.close()
+        other.close()
+        return message
+
+    assert async_to_sync(scenario)() == {'type': 'event', 'data': {'id': 7}}
+
+
+def test_cache_subscription_reads_cache_asynchronously(monkeypatch):
+    """sprawdzam, czy subskrypcja brokera cache nie wywołuje w pętli zdarzeń blokującego cache.get"""
+    broker = CacheBroker(poll_interval=0.01)
+    broker.publish(channel(1), {'type': 'event', 'data': {'id': 1}})
+
+    get = broker.cache.get
+
+    def blocking_get(*args, **kwargs):
+        # aget locmem woła get w osobnym wątku - w wątku pętli zdarzeń get byłby blokujący
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return get(*args, **kwargs)
+        raise AssertionError("blokujący cache.get w pętli zdarzeń")
+
+    monkeypatch.setattr(broker.cache, 'get', blocking_get)
+
+    async def scenario():
+        subscription = broker.subscribe(channel(1))
+        await subscription.start()
+        broker.publish(channel(1), {'type': 'event', 'data': {'id': 2}})
+        return await asyncio.wait_for(subscription.get(), 1)
+
+    assert async_to_sync(scenario)() == {'type': 'event', 'data': {'id': 2}}
+
+
+def test_local_broker_forgets_closed_subscriptions():
+    """sprawdzam, czy zamknięta subskrypcja znika z brokera"""
+    broker = LocalBroker()
+
+    async def scenario():
+        broker.subscribe(channel(1)).close()
+
+    async_to_sync(scenario)()
+    assert not broker.subscribers
+
+
+@pytest.mark.django_db
+class TestLiveTimeline():
+
+    def test_event_published_after_commit(self, game, monkeypatch, django_capture_on_commit_callbacks):
+        """sprawdzam, czy zapis wydarzenia publikuje je dopiero po zatwierdzeniu transakcji"""
+        published = []
+        broker = LocalBroker()
+        monkeypatch.setattr(broker, 'publish', lambda channel, message: published.append((channel, message)))
+        monkeypatch.setattr(live, '_broker', broker)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            player = baker.make("football.Player", team=game.home_team, name="Strzelec")
+            event = baker.make("football.Event", match=game, team=game.home_team, player=player,
+                               event_type="goal", minute=12)
+            assert not published
+
+        assert published[-1][0] == channel(game.pk)
+        assert published[-1][1]['data']['id'] == event.pk
+        assert published[-1][1]['data']['player_name'] == "Strzelec"
+
+    def test_stream_sends_snapshot_then_new_events(self, game):
+        """sprawdzam, czy strumień zaczyna od dotychczasowych wydarzeń i dosyła nowe"""
+        first = baker.make("football.Event", match=game, team=game.home_team, event_type="goal", minute=5)
+        broker = LocalBroker()
+
+        async def scenario():
+            stream = match_stream(game.pk, broker=broker, keepalive=0.05)
+            messages = [await anext(stream), await anext(stream), await anext(stream)]
+            broker.publish(channel(game.pk), {'type': 'event_removed', 'data': {'id': first.pk}})
+            messages.append(await anext(stream))
+            messages.append(await anext(stream))
+            await stream.aclose()
+            return messages
+
+        retry, reset, snapshot, removed, keepalive = async_to_sync(scenario)()
+        assert retry.startswith("retry:")
+        assert parse(reset) == ('reset', {})
+        kind, data = parse(snapshot)
+        assert kind == 'event' and data['id'] == first.pk and data['minute'] == 5
+        assert parse(removed) == ('event_removed', {'id': first.pk})
+        assert keepalive == ": keepalive\n\n"
+        assert not broker.subscribers
+
+    def test_stream_view(self, client, game):
+        """sprawdzam, czy widok strumienia zwraca text/event-stream bez buforowania, a dla nieznanego meczu 404"""
+        client.force_login(baker.make("auth.User"))
+        response = client.get(reverse('match_stream', kwargs={'pk': game.pk}))
+        assert response['Content-Type'] == 'text/event-stream'
+        assert response['Cache-Control'] == 'no-cache'
+        assert response.streaming
+        assert client.get(reverse('match_stream', kwargs={'pk': game.pk + 1})).status_code == 404
+
+    def test_stream_view_ends_under_wsgi(self, client, game):
+        """sprawdzam, czy pod WSGI strumień kończy się po stanie meczu, zamiast zajmować wątek bez końca"""
+        client.force_login(baker.make("auth.User"))
+        event = baker.make("football.Event", match=game, team=game.home_team, event_type="goal", minute=5)
+        response = client.get(reverse('match_stream', kwargs={'pk': game.pk}))
+        messages = b''.join(response.streaming_content).decode().split("\n\n")[:-1]
+        assert messages[0] == f"retry: {live.WSGI_RETRY_MS}"
+        assert parse(messages[1]) == ('reset', {})
+        assert [parse(message)[1]['id'] for message in messages[2:]] == [event.pk]
+
+    def test_details_page_links_stream(self, client, game):
+        """sprawdzam, czy strona meczu podłącza strumień wydarzeń"""
+        client.force_login(baker.make("auth.User"))
+        response = client.get(reverse('match_details', kwargs={'pk': game.pk}))
+        assert reverse('match_stream', kwargs={'pk': game.pk}) in response.content.decode()
@@ -0,0 +1,65 @@
+import pytest
+from model_bakery import baker
+
+from football.minutes import Interval, build_intervals, load_intervals, match_intervals, minutes_played, on_pitch
+
+# Mecz 1: drużyna 10 (zawodnicy 1, 2, 3 z ławki), mecz 2: drużyna 20 (zawodnicy 4, 5), mecz 3 bez wydarzeń
+LINEUPS = [
+    (1, 10, 1, True), (1, 10, 2, True), (1, 10, 3, False),
+    (2, 20, 4, True), (2, 20, 5, True),
+    (3, 10, 1, True),
+]
+EVENTS = [
+    (1, 20, 'goal', 10, 1, None),
+    (1, 55, 'substitution', 10, 1, 3),
+    (1, 80, 'red_card', 10, 3, None),
+    (2, 30, 'yellow_card', 20, 4, None),
+    (2, 94, 'goal', 20, 5, None),
+]
+
+
+class TestBuildIntervals():
+
+    def test_intervals_per_match(self):
+        """sprawdzam, czy odcinki gry uwzględniają zmianę, czerwoną kartkę i doliczony czas"""
+        intervals = build_intervals(LINEUPS, EVENTS)
+        assert sorted(intervals[1]) == [
+            Interval(1, 10, 1, 0, 55), Interval(1, 10, 2, 0, 90), Interval(1, 10, 3, 55, 80),
+        ]
+        # Ostatnie wydarzenie w 94. minucie przesuwa koniec meczu
+        assert minutes_played(intervals[2]) == {4: 94, 5: 94}
+        assert intervals[3] == [Interval(3, 10, 1, 0, 90)]
+
+    def test_substitute_without_lineup_takes_event_team(self):
+        """sprawdzam, czy wchodzący bez wiersza składu dostaje drużynę z wydarzenia"""
+        intervals = build_intervals([(1, 10, 1, True)], [(1, 70, 'substitution', 10, 1, 9)])
+        assert Interval(1, 10, 9, 70, 90) in intervals[1]
+
+    def test_on_pitch(self):
+        """sprawdzam, kto jest na boisku w danej minucie"""
+        intervals = build_intervals(LINEUPS, EVENTS)[1]
+        assert on_pitch(intervals, 54) == {1, 2}
+        assert on_pitch(intervals, 55) == {2, 3}
+        assert on_pitch(intervals, 85) == {2}
+
+
+@pytest.mark.django_db
+class TestLoadIntervals():
+
+    def test_season_in_two_queries(self, django_assert_num_queries):
+        """sprawdzam, czy odcinki gry wszystkich meczów powstają z dwóch zapytań"""
+        home, away = baker.make("football.Team", _quantity=2)
+        games = baker.make("football.Match", home_team=home, away_team=away, lap=1, _quantity=3)
+        players = baker.make("football.Player", team=home, _quantity=2)
+        for game in games:
+            baker.make("football.Lineup", match=game, team=home, player=players[0])
+        event = baker.make("football.Event", match=games[0], team=home, player=players[0], event_type="substitution",
+                           minute=45)
+        baker.make("football.Substitution", event=event, player_in=players[1])
+
+        with django_assert_num_queries(2):
+            intervals = load_intervals()
+        assert minutes_played(interval for match in intervals.values() for interval in match) == {
+            players[0].pk: 45 + 90 + 90, players[1].pk: 45,
+        }
+        assert minutes_played(match_intervals(games[1].pk)) == {players[0].pk: 90}
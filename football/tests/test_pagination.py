@@ -0,0 +1,119 @@
+import pytest
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+
+from football.models import Match
+from football.pagination import MATCH_KEYSET, InvalidCursor, decode_cursor, encode_cursor, keyset_page
+
+
+@pytest.fixture
+def login_user(db, client):
+    client.force_login(baker.make("auth.User"))
+    return client
+
+
+@pytest.fixture
+def matches(db):
+    home, away = baker.make("football.Team", _quantity=2)
+    # Po kilka meczów z tą samą kolejką i datą - kolejność rozstrzyga dopiero id
+    return [
+        baker.make("football.Match", home_team=home, away_team=away, lap=lap, date=date(2024, 8, day), home_score=0, away_score=0)
+        for lap in (2, 1, 3) for day in (3, 1, 1)
+    ]
+
+
+def all_pages(queryset, keyset, size):
+    pages = [keyset_page(queryset, keyset, None, size)]
+    while pages[-1].has_next:
+        pages.append(keyset_page(queryset, keyset, pages[-1].next_cursor, size))
+    return pages
+
+
+@pytest.mark.django_db
+class TestKeysetPage():
+
+    def test_pages_follow_ordering_with_ties(self, matches):
+        """sprawdzam, czy kolejne strony dają wszystkie mecze w kolejności (kolejka, data, id) mimo remisów"""
+        pages = all_pages(Match.objects.all(), MATCH_KEYSET, 2)
+
+        assert [len(page.object_list) for page in pages] == [2, 2, 2, 2, 1]
+        seen = [match.pk for page in pages for match in page.object_list]
+        assert seen == list(Match.objects.order_by(*MATCH_KEYSET).values_list('pk', flat=True))
+
+    def test_later_page_uses_cursor_not_offset(self, matches):
+        """sprawdzam, czy dalsza strona filtruje po kursorze zamiast pomijać wiersze przez OFFSET"""
+        cursor = keyset_page(Match.objects.all(), MATCH_KEYSET, None, 4).next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            keyset_page(Match.objects.all(), MATCH_KEYSET, cursor, 4)
+
+        [sql] = [query['sql'] for query in queries.captured_queries]
+        assert 'OFFSET' not in sql
+        assert 'LIMIT 5' in sql
+
+    def test_cursor_round_trip(self, db):
+        """sprawdzam, czy kursor odtwarza wartości klucza z właściwymi typami"""
+        cursor = encode_cursor([3, date(2024, 8, 1), 17])
+        assert decode_cursor(Match, MATCH_KEYSET, cursor) == [3, date(2024, 8, 1), 17]
+
+    @pytest.mark.parametrize("cursor", ["zły", encode_cursor([1, 2]), encode_cursor(["a", "b", "c"])])
+    def test_invalid_cursor(self, db, cursor):
+        """sprawdzam, czy uszkodzony kursor daje InvalidCursor"""
+        with pytest.raises(InvalidCursor):
+            keyset_page(Match.objects.all(), MATCH_KEYSET, cursor)
+
+
+@pytest.mark.django_db
+class TestKeysetViews():
+
+    def test_index_paginated(self, client, db, monkeypatch):
+        """sprawdzam, czy lista drużyn jest stronicowana po nazwie"""
+        monkeypatch.setattr("football.views.IndexView.paginate_by", 2)
+        for name in ["Wisła", "Cracovia", "Legia"]:
+            baker.make("football.Team", name=name)
+
+        first = client.get(reverse('index'))
+        assert [team.name for team in first.context['team_list']] == ["Cracovia", "Legia"]
+        second = client.get(reverse('index'), {'cursor': first.context['page_obj'].next_cursor})
+        assert [team.name for team in second.context['team_list']] == ["Wisła"]
+
+    def test_api_matches_follows_next(self, login_user, matches, monkeypatch):
+        """sprawdzam, czy endpoint meczów zwraca kolejne strony aż do next = null"""
+        monkeypatch.setattr("football.api.MatchListApi.paginate_by", 4)
+        url, seen = reverse('api_matches'), []
+        while url:
+            data = login_user.get(url).json()
+            seen += [row['id'] for row in data['results']]
+            url = data['next']
+
+        assert seen == list(Match.objects.order_by(*MATCH_KEYSET).values_list('pk', flat=True))
+
+    def test_api_matches_filters(self, login_user, matches):
+        """sprawdzam, czy endpoint meczów filtruje po kolejce, a zły filtr daje 404"""
+        data = login_user.get(reverse('api_matches'), {'lap': 2}).json()
+        assert {row['lap'] for row in data['results']} == {2}
+        assert data['results'][0]['home_team__name'] == matches[0].home_team.name
+        assert login_user.get(reverse('api_matches'), {'team': 'abc'}).status_code == 404
+
+    def test_api_players(self, login_user):
+        """sprawdzam, czy endpoint zawodników sortuje po nazwisku i filtruje po drużynie"""
+        team = baker.make("football.Team")
+        baker.make("football.Player", team=team, name="Nowak")
+        baker.make("football.Player", team=team, name="Kowalski")
+        baker.make("football.Player", name="Obcy")
+
+        data = login_user.get(reverse('api_players'), {'team': team.pk}).json()
+
+        assert [row['name'] for row in data['results']] == ["Kowalski", "Nowak"]
+        assert data['next'] is None
+
+    def test_api_requires_login(self, client, db):
+        """sprawdzam, czy endpoint bez zalogowania zwraca 403 zamiast przekierowania"""
+        assert client.get(reverse('api_players')).status_code == 403
+
+    def test_api_is_read_only(self, login_user, db):
+        """sprawdzam, czy endpoint jest tylko do odczytu"""
+        assert login_user.get(reverse('api_players')).status_code == 200
+        assert login_user.post(reverse('api_players')).status_code == 405
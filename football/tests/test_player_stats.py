@@ -0,0 +1,247 @@
+import pytest
+from datetime import date
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+
+from football.lineups import save_lineup
+from football.models import PlayerSeasonStats
+from football.player_stats import compute_player_stats, discipline, top_scorers
+
+
+@pytest.fixture
+def game(db):
+    home, away = baker.make("football.Team", _quantity=2)
+    return baker.make("football.Match", home_team=home, away_team=away, lap=1, home_score=1, away_score=0)
+
+
+@pytest.fixture
+def players(game):
+    return baker.make("football.Player", team=game.home_team, _quantity=3)
+
+
+def stats(player):
+    return PlayerSeasonStats.objects.filter(player=player).values('appearances', 'starts', 'minutes', 'goals',
+                                                                   'own_goals', 'yellow_cards', 'red_cards').first()
+
+
+def substitute(game, player_out, player_in, minute):
+    event = baker.make("football.Event", match=game, team=game.home_team, player=player_out,
+                       event_type="substitution", minute=minute)
+    baker.make("football.Substitution", event=event, player_in=player_in)
+    baker.make("football.Lineup", match=game, team=game.home_team, player=player_in, is_starting=False)
+    return event
+
+
+@pytest.mark.django_db
+class TestComputePlayerStats():
+
+    def test_minutes_from_lineups_substitutions_and_red_cards(self, game, players):
+        """sprawdzam, czy minuty liczą się od wejścia do zejścia, zmiany lub czerwonej kartki"""
+        starter, sent_off, substitute_player = players
+        baker.make("football.Lineup", match=game, team=game.home_team, player=starter)
+        baker.make("football.Lineup", match=game, team=game.home_team, player=sent_off)
+        baker.make("football.Event", match=game, team=game.home_team, player=sent_off, event_type="red_card", minute=30)
+        substitute(game, starter, substitute_player, 60)
+
+        result = compute_player_stats()
+        assert result[starter.pk]['minutes'] == 60
+        assert result[sent_off.pk]['minutes'] == 30
+        assert result[sent_off.pk]['red_cards'] == 1
+        assert result[substitute_player.pk] == {'appearances': 1, 'starts': 0, 'minutes': 30, 'goals': 0,
+                                                'own_goals': 0, 'yellow_cards': 0, 'red_cards': 0}
+
+    def test_subset_matches_full_computation(self, game, players):
+        """sprawdzam, czy przeliczenie wybranych zawodników daje to samo co przeliczenie wszystkich"""
+        starter, _, substitute_player = players
+        baker.make("football.Lineup", match=game, team=game.home_team, player=starter)
+        baker.make("football.Event", match=game, team=game.home_team, player=starter, event_type="goal", minute=10)
+        substitute(game, starter, substitute_player, 70)
+
+        full = compute_player_stats()
+        assert compute_player_stats([substitute_player.pk]) == {substitute_player.pk: full[substitute_player.pk]}
+        assert compute_player_stats([starter.pk]) == {starter.pk: full[starter.pk]}
+
+
+@pytest.mark.django_db
+class TestPlayerStatsMaintenance():
+
+    def test_events_update_stats_after_commit(self, game, players, django_capture_on_commit_callbacks):
+        """sprawdzam, czy zapis składu, bramki i kartki aktualizuje statystyki po zatwierdzeniu"""
+        scorer = players[0]
+        with django_capture_on_commit_callbacks(execute=True):
+            baker.make("football.Lineup", match=game, team=game.home_team, player=scorer)
+            baker.make("football.Event", match=game, team=game.home_team, player=scorer, event_type="goal", minute=5)
+            baker.make("football.Event", match=game, team=game.home_team, player=scorer, event_type="yellow_card",
+                       minute=50)
+            assert stats(scorer) is None
+        assert stats(scorer) == {'appearances': 1, 'starts': 1, 'minutes': 90, 'goals': 1, 'own_goals': 0,
+                                 'yellow_cards': 1, 'red_cards': 0}
+
+    def test_changed_event_player_refreshes_both(self, game, players, django_capture_on_commit_callbacks):
+        """sprawdzam, czy przepisanie bramki innemu zawodnikowi przelicza obu zawodników"""
+        first, second, _ = players
+        with django_capture_on_commit_callbacks(execute=True):
+            goal = baker.make("football.Event", match=game, team=game.home_team, player=first, event_type="goal",
+                              minute=5)
+        with django_capture_on_commit_callbacks(execute=True):
+            goal.player = second
+            goal.save()
+        assert stats(first) is None
+        assert stats(second)['goals'] == 1
+
+    def test_substitution_minute_and_delete_refresh_player_in(self, game, players, django_capture_on_commit_callbacks):
+        """sprawdzam, czy przesunięcie i usunięcie zmiany przelicza minuty zawodnika wchodzącego"""
+        starter, _, substitute_player = players
+        with django_capture_on_commit_callbacks(execute=True):
+            baker.make("football.Lineup", match=game, team=game.home_team, player=starter)
+            event = substitute(game, starter, substitute_player, 60)
+        assert stats(substitute_player)['minutes'] == 30
+
+        with django_capture_on_commit_callbacks(execute=True):
+            event.minute = 75
+            event.save()
+        assert stats(substitute_player)['minutes'] == 15
+        assert stats(starter)['minutes'] == 75
+
+        with django_capture_on_commit_callbacks(execute=True):
+            event.delete()
+        assert stats(starter)['minutes'] == 90
+        assert stats(substitute_player)['minutes'] == 0
+
+    def test_stoppage_time_event_refreshes_whole_lineup(self, game, players, django_capture_on_commit_callbacks):
+        """sprawdzam, czy wydarzenie w doliczonym czasie przelicza minuty wszystkich zawodników meczu"""
+        scorer, teammate, _ = players
+        with django_capture_on_commit_callbacks(execute=True):
+            baker.make("football.Lineup", match=game, team=game.home_team, player=scorer)
+            baker.make("football.Lineup", match=game, team=game.home_team, player=teammate)
+            goal = baker.make("football.Event", match=game, team=game.home_team, player=scorer, event_type="goal",
+                              minute=94)
+        assert stats(teammate)['minutes'] == 94
+
+        with django_capture_on_commit_callbacks(execute=True):
+            goal.delete()
+        assert stats(teammate)['minutes'] == 90
+
+    def test_match_delete_refreshes_players_once(self, game, players, django_capture_on_commit_callbacks):
+        """sprawdzam, czy usunięcie meczu przelicza jego zawodników jednym wywołaniem po zatwierdzeniu"""
+        with django_capture_on_commit_callbacks(execute=True):
+            for player in players:
+                baker.make("football.Lineup", match=game, team=game.home_team, player=player)
+            baker.make("football.Event", match=game, team=game.home_team, player=players[0], event_type="goal",
+                       minute=5)
+        assert PlayerSeasonStats.objects.count() == 3
+
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            game.delete()
+        assert len([callback for callback in callbacks if 'player_stats' in callback.__qualname__]) == 1
+        assert not PlayerSeasonStats.objects.exists()
+
+    def test_player_delete(self, game, players, django_capture_on_commit_callbacks):
+        """sprawdzam, czy usunięcie zawodnika usuwa jego statystyki i nie psuje pozostałych"""
+        with django_capture_on_commit_callbacks(execute=True):
+            for player in players:
+                baker.make("football.Lineup", match=game, team=game.home_team, player=player)
+        with django_capture_on_commit_callbacks(execute=True):
+            players[0].delete()
+        assert PlayerSeasonStats.objects.count() == 2
+
+    def test_save_lineup_refreshes_added_and_removed(self, game, players, django_capture_on_commit_callbacks):
+        """sprawdzam, czy zapis składu przez bulk_create i usunięcie odznaczonych przelicza zawodników"""
+        with django_capture_on_commit_callbacks(execute=True):
+            save_lineup(game, game.home_team, [players[0].pk, players[1].pk])
+        assert stats(players[0])['appearances'] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            save_lineup(game, game.home_team, [players[1].pk, players[2].pk])
+        assert stats(players[0]) is None
+        assert stats(players[2])['appearances'] == 1
+
+    def test_rebuild_command(self, game, players):
+        """sprawdzam, czy komenda przelicza statystyki od zera"""
+        baker.make("football.Lineup", match=game, team=game.home_team, player=players[0])
+        PlayerSeasonStats.objects.all().delete()
+        baker.make(PlayerSeasonStats, player=players[1], goals=7)
+
+        call_command('rebuild_player_stats')
+
+        assert stats(players[0])['appearances'] == 1
+        assert stats(players[1]) is None
+
+
+@pytest.mark.django_db
+class TestLeaderboards():
+
+    def test_order_and_single_query(self, players):
+        """sprawdzam, czy rankingi są posortowane z rozstrzyganiem remisów i ładują się jednym zapytaniem"""
+        first, second, third = players
+        baker.make(PlayerSeasonStats, player=first, goals=5, minutes=400, yellow_cards=2)
+        baker.make(PlayerSeasonStats, player=second, goals=5, minutes=300, red_cards=1)
+        baker.make(PlayerSeasonStats, player=third, goals=0, minutes=900)
+
+        with CaptureQueriesContext(connection) as queries:
+            scorers = top_scorers()
+            cards = discipline()
+            [row.player.team.name for row in scorers + cards]
+        assert len(queries) == 2
+        assert [row.player for row in scorers] == [second, first]
+        assert [row.player for row in cards] == [second, first]
+
+    def test_page(self, client, players):
+        """sprawdzam, czy strona statystyk pokazuje strzelców"""
+        client.force_login(baker.make("auth.User"))
+        baker.make(PlayerSeasonStats, player=players[0], goals=3)
+        response = client.get(reverse('player_stats'))
+        assert response.status_code == 200
+        assert players[0].name in response.content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPlayerStatsMigration():
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([('football', target)])
+        return executor.loader.project_state([('football', target)]).apps
+
+    def test_stats_built_from_existing_lineups_and_events(self):
+        """sprawdzam, czy migracja statystyk wypełnia je składami i wydarzeniami zapisanymi wcześniej w bazie"""
+        apps = self.migrate('0016_keyset_indexes')
+        try:
+            Team = apps.get_model('football', 'Team')
+            Player = apps.get_model('football', 'Player')
+            Match = apps.get_model('football', 'Match')
+            Lineup = apps.get_model('football', 'Lineup')
+            Event = apps.get_model('football', 'Event')
+            Substitution = apps.get_model('football', 'Substitution')
+            home, away = [Team.objects.create(name=name, city="Miasto", founded=date(1920, 1, 1)) for name in ("A", "B")]
+            starter, sent_off, bench = [Player.objects.create(team=home, name=name, position="mf", nationality="Polska",
+                                                              birth_day=date(2000, 1, 1)) for name in ("C", "D", "E")]
+            first = Match.objects.create(home_team=home, away_team=away, home_score=1, away_score=0, lap=1,
+                                         date=date(2025, 4, 2))
+            second = Match.objects.create(home_team=away, away_team=home, home_score=0, away_score=0, lap=2,
+                                          date=date(2025, 4, 9))
+            for game in (first, second):
+                Lineup.objects.create(match=game, team=home, player=starter)
+            Lineup.objects.create(match=first, team=home, player=sent_off)
+            Lineup.objects.create(match=first, team=home, player=bench, is_starting=False)
+            Event.objects.create(match=first, team=home, player=starter, event_type="goal", minute=10)
+            Event.objects.create(match=first, team=home, player=sent_off, event_type="red_card", minute=30)
+            change = Event.objects.create(match=first, team=home, player=starter, event_type="substitution", minute=60)
+            Substitution.objects.create(event=change, player_in=bench)
+            Event.objects.create(match=first, team=home, player=bench, event_type="yellow_card", minute=93)
+
+            apps = self.migrate('0017_playerseasonstats')
+            PlayerSeasonStats = apps.get_model('football', 'PlayerSeasonStats')
+            stored = {row.pop('player_id'): row for row in PlayerSeasonStats.objects.values(
+                'player_id', 'appearances', 'starts', 'minutes', 'goals', 'own_goals', 'yellow_cards', 'red_cards')}
+            assert stored == compute_player_stats()
+            assert stored[starter.pk]['minutes'] == 60 + 90
+            assert stored[bench.pk]['minutes'] == 33
+            assert (stored[sent_off.pk]['minutes'], stored[sent_off.pk]['red_cards']) == (30, 1)
+        finally:
+            self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes('football')[0][1])
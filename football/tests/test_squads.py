@@ -0,0 +1,41 @@
+import pytest
+from model_bakery import baker
+
+from football.squads import squad_context, team_squad
+
+
+@pytest.fixture
+def teams(db):
+    return baker.make("football.Team", _quantity=2)
+
+
+@pytest.mark.django_db
+class TestTeamSquad():
+
+    def test_grouped_by_position_and_name(self, teams, django_assert_num_queries):
+        """sprawdzam, czy kadra pobiera się jednym zapytaniem i jest podzielona na pozycje w kolejności nazwisk"""
+        team, other = teams
+        nowak = baker.make("football.Player", team=team, position="df", name="Nowak")
+        kowalski = baker.make("football.Player", team=team, position="df", name="Kowalski")
+        keeper = baker.make("football.Player", team=team, position="gk", name="Zieliński")
+        baker.make("football.Player", team=other, position="gk")
+
+        with django_assert_num_queries(1):
+            squad = team_squad(team.pk)
+        assert list(squad) == ['gk', 'df', 'mf', 'st']
+        assert squad['gk'] == [keeper]
+        assert squad['df'] == [kowalski, nowak]
+        assert squad['mf'] == squad['st'] == []
+
+    def test_cached_until_squad_changes(self, teams, django_assert_num_queries):
+        """sprawdzam, czy kadra jest w cache do czasu zmiany zawodników drużyny, także transferu"""
+        team, other = teams
+        player = baker.make("football.Player", team=team, position="mf")
+        team_squad(team.pk)
+        with django_assert_num_queries(0):
+            assert squad_context(team.pk)['midfielders'] == [player]
+
+        player.team = other
+        player.save()
+        assert squad_context(team.pk)['midfielders'] == []
+        assert squad_context(other.pk)['midfielders'] == [player]
@@ -0,0 +1,246 @@
+import pytest
+from datetime import date
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.urls import reverse
+from model_bakery import baker
+
+from football.caching import cached_standings
+from football.models import LapStanding, Match, Standing
+from football.standings import check_standings, positions_by_lap, rebuild_lap_standings, rebuild_standings
+
+
+@pytest.fixture
+def teams(db):
+    return baker.make("football.Team", _quantity=3)
+
+
+def make_match(home, away, home_score, away_score, lap=1):
+    return Match.objects.create(home_team=home, away_team=away, home_score=home_score,
+                                away_score=away_score, lap=lap, date=date(2025, 4, 2))
+
+
+@pytest.mark.django_db
+class TestStanding():
+
+    def test_standing_created_with_team(self, teams):
+        """sprawdzam, czy każda nowa drużyna dostaje pusty wiersz w tabeli"""
+        assert Standing.objects.count() == 3
+        assert Standing.objects.get(team=teams[0]).points == 0
+
+    def test_standing_after_match_created(self, teams):
+        """sprawdzam, czy utworzenie meczu aktualizuje tabelę"""
+        make_match(teams[0], teams[1], 3, 1)
+
+        home = Standing.objects.get(team=teams[0])
+        away = Standing.objects.get(team=teams[1])
+        assert (home.matches, home.wins, home.points, home.goals_scored, home.goals_conceded) == (1, 1, 3, 3, 1)
+        assert (away.matches, away.loses, away.points, away.goals_difference) == (1, 1, 0, -2)
+
+    def test_standing_after_score_changed(self, teams):
+        """sprawdzam, czy zmiana wyniku cofa stary wynik i dolicza nowy"""
+        game = make_match(teams[0], teams[1], 3, 1)
+        game.home_score = 1
+        game.save()
+
+        home = Standing.objects.get(team=teams[0])
+        away = Standing.objects.get(team=teams[1])
+        assert (home.matches, home.wins, home.draws, home.points) == (1, 0, 1, 1)
+        assert (away.matches, away.loses, away.draws, away.points) == (1, 0, 1, 1)
+        assert check_standings() == []
+
+    def test_standing_after_team_changed(self, teams):
+        """sprawdzam, czy zmiana drużyny w meczu przenosi wynik na inną drużynę"""
+        game = make_match(teams[0], teams[1], 2, 0)
+        game.away_team = teams[2]
+        game.save()
+
+        assert Standing.objects.get(team=teams[1]).matches == 0
+        assert Standing.objects.get(team=teams[2]).loses == 1
+        assert check_standings() == []
+
+    def test_standing_after_match_deleted(self, teams):
+        """sprawdzam, czy usunięcie meczu cofa go w tabeli"""
+        game = make_match(teams[0], teams[1], 2, 2)
+        game.delete()
+
+        for standing in Standing.objects.all():
+            assert standing.matches == 0
+            assert standing.points == 0
+
+    def test_check_and_rebuild(self, teams):
+        """sprawdzam, czy checker wykrywa rozbieżność, a rebuild ją naprawia"""
+        make_match(teams[0], teams[1], 1, 0)
+        Standing.objects.filter(team=teams[0]).update(points=10)
+
+        assert check_standings() == [(teams[0].pk, 'points', 10, 3)]
+        with pytest.raises(CommandError):
+            call_command('check_standings')
+
+        rebuild_standings()
+        assert check_standings() == []
+        call_command('check_standings')
+
+    def test_rebuild_command_invalidates_cached_tables(self, teams):
+        """sprawdzam, czy po rebuild_standings widoki nie dostają z cache tabeli sprzed naprawy"""
+        make_match(teams[0], teams[1], 1, 0)
+        Standing.objects.filter(team=teams[0]).update(points=10)
+        cached_standings('table', lambda: 'zepsuta')
+        cached_standings('lap:1', lambda: 'zepsuta')
+
+        call_command('rebuild_standings')
+
+        assert cached_standings('table', lambda: 'naprawiona') == 'naprawiona'
+        assert cached_standings('lap:1', lambda: 'naprawiona') == 'naprawiona'
+
+    def test_table_view_order(self, client, teams):
+        """sprawdzam, czy tabela jest posortowana po punktach i różnicy bramek"""
+        client.force_login(baker.make("auth.User"))
+        make_match(teams[0], teams[1], 0, 1)
+        make_match(teams[2], teams[0], 0, 4, lap=2)
+
+        response = client.get(reverse('table'))
+
+        assert response.status_code == 200
+        assert [s.team for s in response.context['teams_stat']] == [teams[0], teams[1], teams[2]]
+
+
+@pytest.mark.django_db
+class TestLapStanding():
+
+    def test_snapshots_are_cumulative(self, teams):
+        """sprawdzam, czy migawka po kolejce zawiera wyniki wszystkich wcześniejszych kolejek"""
+        make_match(teams[0], teams[1], 1, 0, lap=1)
+        make_match(teams[1], teams[2], 2, 0, lap=2)
+
+        first = {s.team_id: s for s in LapStanding.objects.filter(lap=1)}
+        second = {s.team_id: s for s in LapStanding.objects.filter(lap=2)}
+        assert len(first) == len(second) == 3
+        assert first[teams[0].pk].position == 1
+        assert first[teams[1].pk].points == 0
+        assert second[teams[1].pk].points == 3
+        assert second[teams[1].pk].matches == 2
+
+    def test_snapshots_after_earlier_lap_changed(self, teams):
+        """sprawdzam, czy zmiana wyniku we wcześniejszej kolejce przelicza kolejne migawki"""
+        game = make_match(teams[0], teams[1], 1, 0, lap=1)
+        make_match(teams[1], teams[2], 2, 0, lap=2)
+        game.home_score = 0
+        game.away_score = 3
+        game.save()
+
+        assert LapStanding.objects.get(lap=1, team=teams[1]).position == 1
+        assert LapStanding.objects.get(lap=2, team=teams[1]).points == 6
+
+    def test_snapshots_after_match_deleted(self, teams):
+        """sprawdzam, czy usunięcie jedynego meczu kolejki usuwa jej migawkę"""
+        make_match(teams[0], teams[1], 1, 0, lap=1)
+        game = make_match(teams[1], teams[2], 2, 0, lap=2)
+        game.delete()
+
+        assert not LapStanding.objects.filter(lap=2).exists()
+        assert LapStanding.objects.filter(lap=1).count() == 3
+
+    def test_rebuild_matches_incremental(self, teams):
+        """sprawdzam, czy pełna odbudowa daje te same migawki co aktualizacje przyrostowe"""
+        make_match(teams[0], teams[1], 1, 1, lap=1)
+        make_match(teams[2], teams[0], 0, 2, lap=2)
+        make_match(teams[1], teams[2], 3, 1, lap=3)
+        incremental = list(LapStanding.objects.values_list('lap', 'team_id', 'position', 'points'))
+
+        rebuild_lap_standings()
+
+        assert list(LapStanding.objects.values_list('lap', 'team_id', 'position', 'points')) == incremental
+
+    def test_positions_by_lap_single_query(self, teams, django_assert_num_queries):
+        """sprawdzam, czy pozycje drużyn po wszystkich kolejkach pobierane są jednym zapytaniem"""
+        for lap in range(1, 5):
+            make_match(teams[lap % 3], teams[(lap + 1) % 3], lap, 0, lap=lap)
+
+        with django_assert_num_queries(1):
+            positions = positions_by_lap()
+
+        assert [lap for lap, _ in positions[teams[0].pk]] == [1, 2, 3, 4]
+
+    def test_lap_table_view(self, client, teams):
+        """sprawdzam, czy widok tabeli po kolejce pokazuje migawkę danej kolejki"""
+        client.force_login(baker.make("auth.User"))
+        make_match(teams[0], teams[1], 0, 1, lap=1)
+        make_match(teams[0], teams[2], 5, 0, lap=2)
+
+        response = client.get(reverse('lap_table', kwargs={'lap': 1}))
+
+        assert response.status_code == 200
+        assert response.context['teams_stat'][0].team == teams[1]
+        assert response.context['lap'] == 1
+
+    def test_lap_table_view_unknown_lap(self, client, teams):
+        """sprawdzam, czy dla kolejki bez meczów zwracane jest 404"""
+        client.force_login(baker.make("auth.User"))
+
+        response = client.get(reverse('lap_table', kwargs={'lap': 7}))
+
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTeamDelete():
+
+    def test_team_with_matches_deleted(self, teams):
+        """sprawdzam, czy usunięcie drużyny z meczami przechodzi i odbudowuje migawki tylko raz, już bez niej"""
+        make_match(teams[0], teams[1], 1, 0, lap=1)
+        make_match(teams[1], teams[2], 0, 2, lap=2)
+        make_match(teams[0], teams[2], 3, 3, lap=3)
+        make_match(teams[1], teams[0], 1, 1, lap=4)
+
+        teams[0].delete()
+
+        assert list(LapStanding.objects.order_by('lap', 'position').values_list('lap', 'team_id', 'points')) == [
+            (2, teams[2].pk, 3), (2, teams[1].pk, 0),
+        ]
+        assert dict(Standing.objects.values_list('team_id', 'points')) == {teams[1].pk: 0, teams[2].pk: 3}
+        assert not check_standings()
+
+    def test_match_queryset_deleted(self, teams):
+        """sprawdzam, czy usunięcie querysetu meczów odbudowuje migawki po zatwierdzeniu"""
+        make_match(teams[0], teams[1], 1, 0, lap=1)
+        make_match(teams[1], teams[2], 0, 2, lap=2)
+        make_match(teams[0], teams[2], 3, 3, lap=3)
+
+        Match.objects.filter(lap__gte=2).delete()
+
+        assert set(LapStanding.objects.values_list('lap', flat=True)) == {1}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestStandingMigrations():
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([('football', target)])
+        return executor.loader.project_state([('football', target)]).apps
+
+    def test_tables_built_from_existing_matches(self):
+        """sprawdzam, czy migracje tabel wypełniają je meczami zapisanymi wcześniej w bazie"""
+        apps = self.migrate('0011_alter_team_city_alter_team_name_alter_team_stadium')
+        try:
+            Team = apps.get_model('football', 'Team')
+            Match = apps.get_model('football', 'Match')
+            home, away, other = [Team.objects.create(name=name, city="Miasto", founded=date(1920, 1, 1))
+                                 for name in ("A", "B", "C")]
+            Match.objects.create(home_team=home, away_team=away, home_score=2, away_score=0, lap=1, date=date(2025, 4, 2))
+            Match.objects.create(home_team=away, away_team=other, home_score=1, away_score=1, lap=2, date=date(2025, 4, 9))
+
+            apps = self.migrate('0013_lapstanding')
+            Standing = apps.get_model('football', 'Standing')
+            LapStanding = apps.get_model('football', 'LapStanding')
+            assert dict(Standing.objects.values_list('team_id', 'points')) == {home.pk: 3, away.pk: 1, other.pk: 1}
+            assert list(LapStanding.objects.filter(lap=1).order_by('position').values_list('team_id', 'points')) == [
+                (home.pk, 3), (other.pk, 0), (away.pk, 0),
+            ]
+            assert LapStanding.objects.filter(lap=2).count() == 3
+        finally:
+            self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes('football')[0][1])
@@ -8,6 +8,8 @@ from django.urls.exceptions import NoReverseMatch
 # from django.core.exceptions import PermissionDenied
 from django.contrib.auth.models import Permission, User, Group
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 
 
@@ -624,10 +626,10 @@ class TestTeamInfoView():
         url = reverse('team_info', kwargs={'pk': single_team.pk})
         response = login_user.get(url)
      
-        assert response.context['goalkeepers'].count() == 0
-        assert response.context['defenders'].count() == 0
-        assert response.context['midfielders'].count() == 0
-        assert response.context['strikers'].count() == 0
+        assert len(response.context['goalkeepers']) == 0
+        assert len(response.context['defenders']) == 0
+        assert len(response.context['midfielders']) == 0
+        assert len(response.context['strikers']) == 0
 
     def test_team_info_wrong_team(self, login_user):
         """sprawdzam, czy bez wproadzania piłkarzy pojawią się jacyś gracze"""
@@ -846,3 +848,138 @@ class TestLineupUpdateView:
 
     #     assert response.status_code == 200
     #     assert set(initial_players) == set(selected_ids)
+
+
+@pytest.mark.django_db
+class TestMatchDetailsView:
+
+    def make_squads(self, game, players_count, events_per_player):
+        for team in (game.home_team, game.away_team):
+            for _ in range(players_count):
+                player = baker.make('football.Player', team=team)
+                baker.make('football.Lineup', match=game, team=team, player=player)
+                for minute in range(events_per_player):
+                    baker.make('football.Event', match=game, team=team, player=player, event_type='goal', minute=minute + 1)
+
+    def count_queries(self, client, game):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('match_details', kwargs={'pk': game.pk}))
+        assert response.status_code == 200
+        return len(queries), response
+
+    def test_match_details_without_authorization(self, client, game):
+        """ sprawdzam, czy przekierowuje użytkownika bez autoryzacji"""
+        response = client.get(reverse('match_details', kwargs={'pk': game.pk}))
+        assert response.status_code == 302
+
+    def test_match_details_groups_events_by_player(self, login_user, game):
+        """sprawdzam, czy wydarzenia trafiają do właściwych zawodników obu drużyn"""
+        home_player = baker.make('football.Player', team=game.home_team, name="gospodarz")
+        away_player = baker.make('football.Player', team=game.away_team, name="gość")
+        baker.make('football.Lineup', match=game, team=game.home_team, player=home_player)
+        baker.make('football.Lineup', match=game, team=game.away_team, player=away_player)
+        goal = baker.make('football.Event', match=game, team=game.home_team, player=home_player, event_type='goal', minute=10)
+        card = baker.make('football.Event', match=game, team=game.away_team, player=away_player, event_type='yellow_card', minute=20)
+
+        response = login_user.get(reverse('match_details', kwargs={'pk': game.pk}))
+
+        assert response.context['home'] == [["gospodarz", [goal]]]
+        assert response.context['away'] == [["gość", [card]]]
+        assert "gość" in response.content.decode()
+
+    def test_match_details_constant_query_count(self, login_user, game):
+        """sprawdzam, czy liczba zapytań nie rośnie wraz z liczbą zawodników i wydarzeń"""
+        small_game = baker.make('football.Match', home_team=game.home_team, away_team=game.away_team, lap=2)
+        self.make_squads(small_game, players_count=1, events_per_player=1)
+        self.make_squads(game, players_count=11, events_per_player=3)
+        # Pierwsze żądanie w sesji zapisuje w niej flagę moderatora
+        login_user.get(reverse('index'))
+
+        small_queries, _ = self.count_queries(login_user, small_game)
+        big_queries, response = self.count_queries(login_user, game)
+
+        assert big_queries == small_queries
+        assert len(response.context['home']) == 11
+        assert all(len(events) == 3 for _, events in response.context['away'])
+
+
+def match_queries(queries):
+    return [q['sql'] for q in queries.captured_queries if 'FROM "football_match"' in q['sql']]
+
+
+@pytest.mark.django_db
+class TestMatchFromUrlMixin:
+
+    @pytest.mark.parametrize("team_type", ["home", "away"])
+    def test_lineup_update_fetches_match_once(self, moderator_user, game, team_type):
+        """sprawdzam, czy mecz z drużynami pobierany jest jednym zapytaniem na żądanie"""
+        client, _ = moderator_user
+        team = game.home_team if team_type == 'home' else game.away_team
+        for _ in range(11):
+            baker.make('football.Lineup', match=game, team=team, player=baker.make('football.Player', team=team))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('lineup', kwargs={'pk': game.pk, 'team_type': team_type}))
+
+        assert response.status_code == 200
+        assert len(match_queries(queries)) == 1
+        assert len(response.context['selected_players']) == 11
+
+    def test_event_players_fetches_match_once(self, client, game):
+        """sprawdzam, czy widok przypisania zawodnika do wydarzenia pobiera mecz raz"""
+        client.force_login(baker.make("auth.User", is_superuser=True))
+        player = baker.make('football.Player', team=game.home_team)
+        baker.make('football.Lineup', match=game, team=game.home_team, player=player)
+        event = baker.make('football.Event', match=game, team=game.home_team, event_type='goal', minute=5)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('players_to_event', kwargs={'pk': game.pk, 'event_pk': event.pk}))
+
+        assert response.status_code == 200
+        assert len(match_queries(queries)) == 1
+        assert response.context['team'] == game.home_team
+
+    def test_lineup_for_missing_match(self, moderator_user):
+        """sprawdzam, czy dla nieistniejącego meczu zwracane jest 404"""
+        client, _ = moderator_user
+        response = client.get(reverse('lineup_create', kwargs={'pk': 9999, 'team_type': 'home'}))
+        assert response.status_code == 404
+
+
+def group_queries(queries):
+    return [query for query in queries if 'auth_user_groups' in query['sql']]
+
+
+@pytest.mark.django_db
+class TestModeratorFlag:
+
+    def test_fixture_list_checks_groups_once_per_session(self, moderator_user, team):
+        """sprawdzam, czy strona listy meczów nie pyta o grupy dla każdego wiersza, a kolejne żądanie bierze flagę z sesji"""
+        client, user = moderator_user
+        baker.make("football.Match", home_team=team[0], away_team=team[1], lap=1, _quantity=300)
+        url = reverse('team_matches', kwargs={'pk': team[0].id})
+
+        with CaptureQueriesContext(connection) as first:
+            response = client.get(url)
+        assert response.content.decode().count('[usuń]') == len(response.context['matches']) == 50
+        assert len(group_queries(first.captured_queries)) == 1
+
+        with CaptureQueriesContext(connection) as second:
+            client.get(url)
+        assert group_queries(second.captured_queries) == []
+
+    def test_regular_user_has_no_moderator_links(self, login_user, team, game):
+        """sprawdzam, czy zwykły użytkownik nie widzi linków do usuwania i poprawiania meczów"""
+        response = login_user.get(reverse('team_matches', kwargs={'pk': team[0].id}))
+        assert not response.context['is_moderator']
+        assert '[usuń]' not in response.content.decode()
+
+    def test_group_change_refreshes_flag(self, moderator_user, team, game):
+        """sprawdzam, czy po usunięciu z grupy moderatorów flaga w sesji przestaje obowiązywać"""
+        client, user = moderator_user
+        url = reverse('team_matches', kwargs={'pk': team[0].id})
+        assert client.get(url).context['is_moderator']
+
+        user.groups.clear()
+
+        assert not client.get(url).context['is_moderator']
@@ -1,6 +1,6 @@
 from django.urls import path
 from django.contrib.auth.views import LoginView, LogoutView
-from . import views
+from . import api, async_views, views
 
 urlpatterns = [
     path('login/', LoginView.as_view(template_name="football/login.html"), name='login'),
@@ -17,8 +17,31 @@ urlpatterns = [
     path("match/<int:pk>/update/event/", views.EventCreateView.as_view(), name="event"),
     path("match/<int:pk>/update/event/<int:event_pk>/", views.TeamCreateEventView.as_view(), name="players_to_event"),
     path("match/<int:pk>/details/", views.MatchDetailsView.as_view(), name="match_details"),
+    path("match/<int:pk>/stream/", async_views.MatchStreamView.as_view(), name="match_stream"),
     # path("match/<int:pk>/update/event/substitution/int:event_pk>/")
     path("table/", views.TableView.as_view(), name="table"),
+    path("table/<int:lap>/", views.LapTableView.as_view(), name="lap_table"),
     path("laps/", views.LapsListView.as_view(), name="laps_list"),
     path("team/<int:pk>/", views.TeamInfoView.as_view(), name="team_info"),
+    path("stats/players/", views.PlayerStatsView.as_view(), name="player_stats"),
+    # Te same strony w wersji async - dla serwera ASGI
+    path("async/table/", async_views.AsyncTableView.as_view(), name="async_table"),
+    path("async/lap/<int:pk>/", async_views.AsyncLapView.as_view(), name="async_lap"),
+    path("async/<int:pk>/", async_views.AsyncTeamMatchesView.as_view(), name="async_team_matches"),
+    path("async/team/<int:pk>/", async_views.AsyncTeamInfoView.as_view(), name="async_team_info"),
+    path("async/match/<int:pk>/details/", async_views.AsyncMatchDetailsView.as_view(), name="async_match_details"),
+    path(f"api/{api.API_VERSION}/teams/", api.TeamListApi.as_view(), name="api_teams"),
+    path(f"api/{api.API_VERSION}/teams/<int:pk>/squad/", api.SquadApi.as_view(), name="api_squad"),
+    path(f"api/{api.API_VERSION}/laps/<int:lap>/fixtures/", api.LapFixturesApi.as_view(), name="api_lap_fixtures"),
+    path(f"api/{api.API_VERSION}/standings/", api.StandingsApi.as_view(), name="api_standings"),
+    path(f"api/{api.API_VERSION}/standings/<int:lap>/", api.StandingsApi.as_view(), name="api_lap_standings"),
+    path(f"api/{api.API_VERSION}/analytics/", api.AnalyticsApi.as_view(), name="api_analytics"),
+    path(f"api/{api.API_VERSION}/teams/<int:pk>/analytics/", api.AnalyticsApi.as_view(), name="api_team_analytics"),
+    path(f"api/{api.API_VERSION}/leaderboards/<str:category>/", api.LeaderboardApi.as_view(), name="api_leaderboard"),
+    path(f"api/{api.API_VERSION}/laps/<int:lap>/leaderboards/<str:category>/", api.LeaderboardApi.as_view(),
+         name="api_lap_leaderboard"),
+    path(f"api/{api.API_VERSION}/matches/", api.MatchListApi.as_view(), name="api_matches"),
+    path(f"api/{api.API_VERSION}/matches/<int:pk>/", api.MatchTimelineApi.as_view(), name="api_match"),
+    path(f"api/{api.API_VERSION}/players/", api.PlayerListApi.as_view(), name="api_players"),
+    path("export/<str:dataset>.<str:format>", views.ExportView.as_view(), name="export"),
 ]
\ No newline at end of file
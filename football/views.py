@@ -2,14 +2,25 @@ from typing import Any
 from django.views import generic
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
 from django.urls import reverse_lazy, reverse
-from django.db.models import Q, F, Count, Sum, Subquery, OuterRef
-from django.http import HttpResponseRedirect
+from django.db.models import Q, Prefetch, prefetch_related_objects
+from django.http import HttpResponseRedirect, Http404, StreamingHttpResponse
 from django.contrib.auth import login
-from django.shortcuts import redirect
+from django.shortcuts import redirect, get_object_or_404
+from django.utils.functional import SimpleLazyObject, cached_property
 from django.contrib.auth.models import Group
 from django.contrib.auth.mixins import PermissionRequiredMixin, LoginRequiredMixin
 
-from .models import Match, Team, Player, Lineup, Event, Substitution
+from .models import Match, Team, Player, Lineup, Event, Substitution, Standing, LapStanding
+from .standings import lap_table
+from .caching import MATCH_DETAILS_TIMEOUT, bump_leaderboard_versions, bump_match_version, get_match_version
+from .caching import cached_standings
+from .fixtures import lap_fixtures, team_fixtures
+from .pagination import MATCH_KEYSET, TEAM_KEYSET, InvalidCursor, KeysetPaginationMixin
+from .lineups import save_lineup
+from .exports import DATASETS, STREAM_FORMATS, stream
+from .live import publish_event
+from .player_stats import discipline, refresh_after_commit, top_scorers
+from .squads import squad_context
 from .forms import MatchForm, LineupForm, EventForm, TeamCreateEventForm
 from .forms import RegisterForm
 
@@ -27,9 +38,10 @@ class RegisterView(CreateView):
 
         return redirect('index')
 
-class IndexView(generic.ListView):
+class IndexView(KeysetPaginationMixin, generic.ListView):
     model = Team
     template_name = "football/index.html"
+    keyset = TEAM_KEYSET
 
     def get_queryset(self):
        return Team.objects.all()
@@ -40,21 +52,26 @@ class TeamMatchesView(LoginRequiredMixin, generic.DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        team = self.object
-        matches = Match.objects.filter(Q(home_team=team) | Q(away_team=team)).order_by('lap')
-        context['matches'] = matches
+        try:
+            page = team_fixtures(self.object, self.request.GET.get('cursor'))
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        context['page_obj'] = page
+        context['matches'] = page.object_list
         return context
     
-class LapView(LoginRequiredMixin,generic.ListView):
+class LapView(LoginRequiredMixin, KeysetPaginationMixin, generic.ListView):
     model = Match
     template_name = "football/lap.html" 
+    context_object_name = 'matches'
+    keyset = MATCH_KEYSET
+
+    def get_page(self, queryset, cursor, size):
+        return lap_fixtures(self.kwargs['pk'], cursor, size)
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        lap = self.kwargs['pk']
-        matches = Match.objects.filter(lap=lap)
-        context['matches'] = matches
-        context['lap'] = lap
+        context['lap'] = self.kwargs['pk']
         return context
     
 class MatchCreateView(PermissionRequiredMixin, CreateView):
@@ -83,60 +100,29 @@ class MatchUpdateView(PermissionRequiredMixin, UpdateView):
     permission_required = ['football.change_match', 'football.view_match']
 
 class TableView(LoginRequiredMixin,generic.ListView):
-    model = Team
+    model = Standing
+    template_name = 'football/table.html'
+    context_object_name = 'teams_stat'
+
+    def get_queryset(self):
+        # Tabela jest utrzymywana na bieżąco przez sygnały (football/signals.py)
+        return cached_standings('table', lambda: list(Standing.objects.select_related('team')))
+
+class LapTableView(LoginRequiredMixin,generic.ListView):
+    model = LapStanding
     template_name = 'football/table.html'
+    context_object_name = 'teams_stat'
+
+    def get_queryset(self):
+        # Migawka tabeli po kolejce jest liczona z góry (standings.rebuild_lap_standings)
+        lap = self.kwargs['lap']
+        return cached_standings(f'lap:{lap}', lambda: list(lap_table(lap)))
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        teams_stat = Team.objects.annotate(
-            home_wins=Count('home_matches', distinct=True, filter=Q(home_matches__home_score__gt=F('home_matches__away_score'))),
-            away_wins=Count('away_matches', distinct=True, filter=Q(away_matches__away_score__gt=F('away_matches__home_score'))),
-            home_draws=Count('home_matches', distinct=True, filter=Q(home_matches__home_score=F('home_matches__away_score'))),
-            away_draws=Count('away_matches', distinct=True, filter=Q(away_matches__away_score=F('away_matches__home_score'))),
-            home_loses=Count('home_matches', distinct=True, filter=Q(home_matches__home_score__lt=F('home_matches__away_score'))),
-            away_loses=Count('away_matches', distinct=True, filter=Q(away_matches__away_score__lt=F('away_matches__home_score'))),
-        ).annotate(
-            wins=F('home_wins') + F('away_wins'),
-            draws=F('home_draws') + F('away_draws'),
-            loses=F('home_loses') + F('away_loses'),
-            points=(F('wins') * 3) + (F('draws') * 1),
-            home_goals_scored=Subquery(
-                Match.objects.filter(home_team=OuterRef('pk'))
-                .values('home_team')
-                .annotate(total_goals=Sum('home_score'))
-                .values('total_goals')
-            ),
-            away_goals_scored=Subquery(
-                Match.objects.filter(away_team=OuterRef('pk'))
-                .values('away_team')
-                .annotate(total_goals=Sum('away_score'))
-                .values('total_goals')
-            ),
-            home_goals_conceded=Subquery(
-                Match.objects.filter(home_team=OuterRef('pk'))
-                .values('home_team')
-                .annotate(total_conceded=Sum('away_score'))
-                .values('total_conceded')
-            ),
-            away_goals_conceded=Subquery(
-                Match.objects.filter(away_team=OuterRef('pk'))
-                .values('away_team')
-                .annotate(total_conceded=Sum('home_score'))
-                .values('total_conceded')
-            ),
-
-            # home_goals_scored=Sum('home_matches__home_score'),
-            # away_goals_scored=Sum('away_matches__away_score'),
-            goals_scored=F('home_goals_scored') + F('away_goals_scored'),
-            # home_goals_conceded=Sum('home_matches__away_score'),
-            # away_goals_conceded=Sum('away_matches__home_score'),
-            goals_conceded=F('home_goals_conceded') + F('away_goals_conceded'),
-            goals_difference=F('goals_scored') - F('goals_conceded'),
-            matches=F('wins') + F('draws') + F('loses')
-
-        ).order_by('-points', '-goals_difference', '-goals_scored')
-        context['teams_stat'] = teams_stat
-
+        if not context['teams_stat']:
+            raise Http404("Brak tabeli po tej kolejce")
+        context['lap'] = self.kwargs['lap']
         return context
     
 class LapsListView(LoginRequiredMixin,generic.ListView):
@@ -155,15 +141,27 @@ class TeamInfoView(LoginRequiredMixin,generic.DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        team = self.object
-    #    players = Player.objects.filter(team=team)
-        context['goalkeepers'] = Player.objects.filter(team=team, position='gk')
-        context['defenders'] = Player.objects.filter(team=team, position='df')
-        context['midfielders'] = Player.objects.filter(team=team, position='mf')
-        context['strikers'] = Player.objects.filter(team=team, position='st')
+        # Kadra jednym zapytaniem (z cache wersji drużyny), podzielona na pozycje
+        context.update(squad_context(self.object.pk))
         return context
 
-class LineupCreateView(PermissionRequiredMixin, CreateView):
+class MatchFromUrlMixin:
+    """Mecz z URL-a (pk) wraz z drużynami - pobierany raz na żądanie i zapamiętywany w widoku."""
+
+    @cached_property
+    def match(self):
+        return get_object_or_404(Match.objects.select_related('home_team', 'away_team'), pk=self.kwargs['pk'])
+
+    @property
+    def team_type(self):
+        return self.kwargs.get('team_type')
+
+    @property
+    def team(self):
+        # Drużyna wskazana w URL-u przez team_type (home/away)
+        return self.match.home_team if self.team_type == 'home' else self.match.away_team
+
+class LineupCreateView(PermissionRequiredMixin, MatchFromUrlMixin, CreateView):
     model = Lineup
     form_class = LineupForm
     template_name = "football/lineup_form.html"
@@ -171,30 +169,15 @@ class LineupCreateView(PermissionRequiredMixin, CreateView):
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        match = Match.objects.get(pk=self.kwargs['pk'])
-        team_type = self.kwargs['team_type']
-        team = match.home_team if team_type == 'home' else match.away_team
-        kwargs['team'] = team
+        kwargs['team'] = self.team
         return kwargs
 
     def form_valid(self, form):
-        # Pobierz mecz na podstawie parametru z URL-a
-        match = Match.objects.get(pk=self.kwargs['pk'])
-        
         # Pobierz wybranych zawodników
         players = form.cleaned_data['players']
         
-        # Pobierz drużynę (np. na podstawie team_type)
-        team_type = self.kwargs.get('team_type')
-        team = match.home_team if team_type == 'home' else match.away_team
-        
         # Tworzenie rekordów w Lineup
-        for player in players:
-            Lineup.objects.create(
-                match=match,
-                player=player,
-                team=team,
-            )
+        save_lineup(self.match, self.team, [player.pk for player in players])
         
         # Przekierowanie na sukces, bez wywoływania super().form_valid(form)
         return HttpResponseRedirect(self.get_success_url())
@@ -207,70 +190,32 @@ class LineupCreateView(PermissionRequiredMixin, CreateView):
         list(map(int, self.request.POST.getlist('players'))) if self.request.method == 'POST' else []
         )
 
-        match = Match.objects.get(pk=self.kwargs['pk'])
-        team_type = self.kwargs['team_type']
-        team = match.home_team if team_type == 'home' else match.away_team
-        
-        # Pobieranie zawodników według pozycji
-        goalkeepers = Player.objects.filter(team=team, position='gk').order_by('name')
-        defenders = Player.objects.filter(team=team, position='df').order_by('name')
-        midfielders = Player.objects.filter(team=team, position='mf').order_by('name')
-        strikers = Player.objects.filter(team=team, position='st').order_by('name')
-        
-        # Dodanie zawodników do kontekstu
-        context['goalkeepers'] = goalkeepers
-        context['defenders'] = defenders
-        context['midfielders'] = midfielders
-        context['strikers'] = strikers
+        # Zawodnicy według pozycji
+        context.update(squad_context(self.team.pk))
 
         return context
     
     def get_success_url(self):
         return reverse('match_update', kwargs={'pk': self.kwargs['pk']})
 
-class LineupUpdateView(PermissionRequiredMixin, UpdateView):
+class LineupUpdateView(PermissionRequiredMixin, MatchFromUrlMixin, UpdateView):
     model = Lineup
     form_class = LineupForm
     template_name = "football/lineup_form.html"
     permission_required = ['football.add_lineup', 'football.view_lineup', 'football.view_player', 'football.view_team', 'football.view_match']
 
-    def get(self, request, *args, **kwargs):
-            # Pobierz mecz na podstawie pk
-        try:
-            match = Match.objects.get(pk=self.kwargs['pk'])
-            
-            # Pobierz team_type z URL (home/away)
-            team_type = self.kwargs['team_type']
-            
-            # W zależności od team_type przypisz drużynę
-            team = match.home_team if team_type == 'home' else match.away_team
-            
-            # Możesz przekazać drużynę do kontekstu lub formularza
-            self.team = team
-
-            # Kontynuuj z resztą logiki
-            response = super().get(request, *args, **kwargs)
-            return response
-        except Exception as e:
-            raise e        
-    
     def get_object(self):
-        match = Match.objects.get(pk=self.kwargs['pk'])
-        team_type = self.kwargs['team_type']
-        team = match.home_team if team_type == 'home' else match.away_team
         # Znajdź pierwszy obiekt Lineup pasujący do kryteriów
-        return Lineup.objects.filter(match=match, team=team).first()
+        return Lineup.objects.filter(match=self.match, team=self.team).first()
 
+    @cached_property
+    def selected_players(self):
+        return list(Lineup.objects.filter(match=self.match, team=self.team, is_starting=True).values_list('player_id', flat=True))
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        match = Match.objects.get(pk=self.kwargs['pk'])
-        team_type = self.kwargs['team_type']
-        team = match.home_team if team_type == 'home' else match.away_team
-        # kwargs['team'] = team
-        selected_players = Lineup.objects.filter(match=match, team=team, is_starting=True).values_list('player', flat=True)
         # Przekaż zaznaczonych zawodników do formularza
-        kwargs['initial'] = {'players': selected_players}
+        kwargs['initial'] = {'players': self.selected_players}
 
         return kwargs
     
@@ -280,58 +225,27 @@ class LineupUpdateView(PermissionRequiredMixin, UpdateView):
         form = self.get_form()
         context['form'] = form
 
-        match = Match.objects.get(pk=self.kwargs['pk'])
-        team_type = self.kwargs['team_type']
-        team = match.home_team if team_type == 'home' else match.away_team
-        
-        # Pobieranie zawodników według pozycji
-        goalkeepers = Player.objects.filter(team=team, position='gk').order_by('name')
-        defenders = Player.objects.filter(team=team, position='df').order_by('name')
-        midfielders = Player.objects.filter(team=team, position='mf').order_by('name')
-        strikers = Player.objects.filter(team=team, position='st').order_by('name')
-        
-        # Dodanie zawodników do kontekstu
-        context['goalkeepers'] = goalkeepers
-        context['defenders'] = defenders
-        context['midfielders'] = midfielders
-        context['strikers'] = strikers
+        # Zawodnicy według pozycji
+        context.update(squad_context(self.team.pk))
 
-        selected_players = Lineup.objects.filter(match=match, team=team, is_starting=True).values_list('player_id', flat=True)
-        
-        context['selected_players'] = selected_players
+        context['selected_players'] = self.selected_players
 
         return context
     
     def form_valid(self, form):
-        # Pobierz mecz na podstawie parametru z URL-a
-        match = Match.objects.get(pk=self.kwargs['pk'])
-        
         # Pobierz wybranych zawodników
         players = form.cleaned_data['players']
-        
-        # Pobierz drużynę (np. na podstawie team_type)
-        team_type = self.kwargs.get('team_type')
-        team = match.home_team if team_type == 'home' else match.away_team
-        
-
-        selected_players = Lineup.objects.filter(match=match, team=team).values_list('player_id', flat=True)
 
-        # Gracze do usunięcia
-        players_to_remove = [player for player in selected_players if player not in players]
-        Lineup.objects.filter(match=match, team=team, player_id__in=players_to_remove).delete()
+        # Gracze do dodania i usunięcia liczeni na zbiorach id
+        save_lineup(self.match, self.team, [player.pk for player in players])
 
-        # Gracze do dodania
-        players_to_add = [player for player in players if player not in selected_players]
-        for player in players_to_add:
-            Lineup.objects.create(match=match, player=player, team=team)
-        
         # Przekierowanie na sukces, bez wywoływania super().form_valid(form)
         return HttpResponseRedirect(self.get_success_url())
 
     def get_success_url(self):
         return reverse('match_update', kwargs={'pk': self.kwargs['pk']})
 
-class EventCreateView(PermissionRequiredMixin, CreateView):
+class EventCreateView(PermissionRequiredMixin, MatchFromUrlMixin, CreateView):
     model = Event
     form_class = EventForm
     template_name = "football/event_form.html"
@@ -339,25 +253,24 @@ class EventCreateView(PermissionRequiredMixin, CreateView):
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        match = Match.objects.get(pk=self.kwargs['pk'])  # Pobierasz mecz z URL
-        kwargs['match'] = match  # Przekazujesz mecz do formularza
+        kwargs['match'] = self.match  # Przekazujesz mecz do formularza
         return kwargs
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        match = Match.objects.get(pk=self.kwargs['pk'])
+        match = self.match
         context['match'] = match
-        context['home'] = Lineup.objects.filter(match_id=match.id, team_id=match.home_team.id)
-        context['away'] = Lineup.objects.filter(match_id=match.id, team_id=match.away_team.id)
+        context['home'] = Lineup.objects.filter(match_id=match.id, team_id=match.home_team_id)
+        context['away'] = Lineup.objects.filter(match_id=match.id, team_id=match.away_team_id)
         return context
 
     def get_success_url(self):
         # if self.object.event_type == "substitution":
         #     return reverse('players_to_substitution', kwargs={'pk':self.object.match.pk, 'event_pk':self.object.pk})
         # else:
-            return reverse('players_to_event', kwargs={'pk':self.object.match.pk, 'event_pk':self.object.pk})
+            return reverse('players_to_event', kwargs={'pk':self.match.pk, 'event_pk':self.object.pk})
             
-class TeamCreateEventView(PermissionRequiredMixin, generic.FormView):
+class TeamCreateEventView(PermissionRequiredMixin, MatchFromUrlMixin, generic.FormView):
     model = Event
     form_class = TeamCreateEventForm
     template_name ="football/players_to_event.html"
@@ -367,73 +280,82 @@ class TeamCreateEventView(PermissionRequiredMixin, generic.FormView):
                            'football.edit_lineup',
                            'football.add.substitution']
 
+    @cached_property
+    def event(self):
+        return get_object_or_404(Event.objects.select_related('team'), pk=self.kwargs['event_pk'])
+
+    @property
+    def team(self):
+        # Drużyna, której dotyczy wydarzenie
+        return self.event.team
+
+    def players_on_bench(self, exclude_red_cards):
+        players_active_in_match = Lineup.objects.filter(
+            match=self.match,
+            team=self.team,
+        ).values_list('player_id', flat=True)
+        excluded = Q(id__in=players_active_in_match)
+        if exclude_red_cards:
+            red_cards = Event.objects.filter(match=self.match, event_type="red_card").values_list('player_id')
+            excluded |= Q(id__in=red_cards)
+        return Player.objects.filter(team=self.team).exclude(excluded)
+
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         kwargs['initial'] = {'pk': self.kwargs['pk']}  # Przekazanie ID meczu jako initial
-        event = Event.objects.get(pk=self.kwargs['event_pk'])
+        event = self.event
         players_in_match = Lineup.objects.filter(
-            match_id=self.kwargs['pk'],
-            team=event.team,  
+            match=self.match,
+            team=self.team,  
             on_bench=False
         )
-        red_cards = Event.objects.filter(match_id=self.kwargs['pk'], event_type="red_card").values_list('player_id')
-        # kwargs['red_card'] = red_cards
         kwargs['players_in_match'] = players_in_match
         kwargs['event_type'] = event.event_type
         if event.event_type == "substitution":
-            players_active_in_match = Lineup.objects.filter(
-                match_id=self.kwargs['pk'],
-                team=event.team,
-            ).values_list('player_id', flat=True)
-            players_on_bench = Player.objects.filter(
-                team=event.team,  
-            ).exclude(Q(id__in=players_active_in_match)|Q(id__in=red_cards))
-            kwargs["players_on_bench"] = players_on_bench
+            kwargs["players_on_bench"] = self.players_on_bench(exclude_red_cards=True)
         return kwargs
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        match = Match.objects.get(pk=self.kwargs['pk'])
-        context['match']=match
-        event = Event.objects.get(pk=self.kwargs['event_pk'])
-        context['event']=event
-        players_in_match = Lineup.objects.filter(match=match, team=event.team, on_bench=False).values_list('player_id', flat=True)
+        context['match'] = self.match
+        context['event'] = self.event
+        players_in_match = Lineup.objects.filter(match=self.match, team=self.team, on_bench=False).values_list('player_id', flat=True)
         context['player_in_match'] = players_in_match
-        context['team']=event.team
-        if event.event_type == "substitution":
-            players_active_in_match = Lineup.objects.filter(
-                match_id=self.kwargs['pk'],
-                team=event.team,  
-            ).values_list('player_id', flat=True)
-            players_on_bench = Player.objects.filter(
-                team=event.team,  
-            ).exclude(id__in=players_active_in_match)
-            context['players_on_bench']=players_on_bench 
+        context['team'] = self.team
+        if self.event.event_type == "substitution":
+            context['players_on_bench'] = self.players_on_bench(exclude_red_cards=False)
         return context
 
     def form_valid(self, form):
-        event_pk = self.kwargs['event_pk']
+        event = self.event
         player = form.cleaned_data['player']
-        Event.objects.filter(pk=event_pk).update(player=player)
-        event = Event.objects.get(pk=event_pk)
+        previous_player_id = event.player_id
+        Event.objects.filter(pk=event.pk).update(player=player)
+        event.player = player
         if event.event_type == "substitution":
             player_in=form.cleaned_data['player_in']
             Substitution.objects.create(event=event, player_in=player_in)
             Lineup.objects.filter(
-                match=event.match,
+                match=self.match,
                 player=player
                 ).update(on_bench=True)
             Lineup.objects.create(
-                match=event.match, 
-                team=event.team, 
+                match=self.match, 
+                team=self.team, 
                 player=player_in, 
                 is_starting=False
                 )
         if event.event_type == "red_card":
                 Lineup.objects.filter(
-                match=event.match,
+                match=self.match,
                 player=player
                 ).update(on_bench=True)
+        # update() nie wysyła sygnałów, więc wersję meczu podbijamy, statystyki zawodników przeliczamy,
+        # a wydarzenie publikujemy ręcznie
+        bump_match_version(self.match.pk)
+        bump_leaderboard_versions(self.match.lap)
+        refresh_after_commit(player.pk, previous_player_id)
+        publish_event(event.pk, self.match.pk)
         return super().form_valid(form)
 
     def form_invalid(self, form):
@@ -448,21 +370,76 @@ class MatchDetailsView(LoginRequiredMixin,generic.DetailView):
     model = Match
     template_name = "football/match_details.html"
 
+    def get_queryset(self):
+        return Match.objects.select_related('home_team', 'away_team')
+
     def get_context_data(self, **kwargs):
         context =  super().get_context_data(**kwargs)
-        current_match = Match.objects.get(pk=self.kwargs['pk'])
-        home_team = Lineup.objects.filter(match_id = self.kwargs['pk'], team = current_match.home_team)
-        away_team = Lineup.objects.filter(match_id = self.kwargs['pk'], team = current_match.away_team)
-        events = Event.objects.filter(match_id = self.kwargs['pk'])
+        current_match = self.object
         context['current_match'] = current_match
-        home = [[lineup.player.name,[event for event in events if event.player == lineup.player]] for lineup in home_team]
-        away = [[lineup.player.name,[event for event in events if event.player == lineup.player]] for lineup in away_team]
+        context['match_version'] = get_match_version(current_match.pk)
+        context['match_details_timeout'] = MATCH_DETAILS_TIMEOUT
+        context.update(lazy_match_details(current_match))
             # for player, events in home:
             #     if player.is_startnig == False:
             #         pass #docelowo wpisać zawodników wchodzących    ZOSTAWIĆ
+        return context
+
+
+def match_details(match):
+    """Składy obu drużyn i wydarzenia zawodników meczu - liczba zapytań nie zależy od liczby zawodników i wydarzeń."""
+    prefetch_related_objects(
+        [match],
+        Prefetch('lineups', queryset=Lineup.objects.select_related('player').order_by('pk')),
+        Prefetch('events', queryset=Event.objects.select_related('substitution__player_in').order_by('minute', 'pk')),
+    )
+    events_by_player = {}
+    for event in match.events.all():
+        events_by_player.setdefault(event.player_id, []).append(event)
+
+    details = {}
+    for side, team_id in (('home', match.home_team_id), ('away', match.away_team_id)):
+        lineups = [lineup for lineup in match.lineups.all() if lineup.team_id == team_id]
+        details[f'{side}_team'] = lineups
+        details[side] = [[lineup.player.name, events_by_player.get(lineup.player_id, [])] for lineup in lineups]
+    return details
+
+
+def lazy_match_details(match):
+    """Kontekst fragmentu strony meczu liczony dopiero przy renderowaniu bloku {% cache %}.
+
+    Gdy fragment jest w cache, szablon go nie renderuje i dane nie są pobierane; gdy fragment wypadnie
+    z cache między odczytem wersji a renderowaniem, dane i tak się pobiorą - pusty blok nie trafi do cache.
+    """
+    details = SimpleLazyObject(lambda: match_details(match))
+    return {key: SimpleLazyObject(lambda key=key: details[key]) for key in ('home_team', 'away_team', 'home', 'away')}
+
+
+class PlayerStatsView(LoginRequiredMixin, generic.TemplateView):
+    template_name = "football/player_stats.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Statystyki są zmaterializowane (PlayerSeasonStats) - każda lista to jedno zapytanie po indeksie
+        context['top_scorers'] = top_scorers()
+        context['discipline'] = discipline()
+        return context
+
+
+class ExportView(PermissionRequiredMixin, generic.View):
+    """Strumieniuje cały zbiór danych jako JSON Lines lub CSV - wiersze idą do klienta paczkami, bez budowania odpowiedzi w pamięci."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if kwargs['dataset'] not in DATASETS or kwargs['format'] not in STREAM_FORMATS:
+            raise Http404("Nieznany zbiór danych lub format")
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_permission_required(self):
+        model = DATASETS[self.kwargs['dataset']][0]
+        return [f'football.view_{model._meta.model_name}']
+
+    def get(self, request, dataset, format):
+        response = StreamingHttpResponse(stream(dataset, format), content_type=STREAM_FORMATS[format])
+        response['Content-Disposition'] = f'attachment; filename="{dataset}.{format}"'
+        return response
 
-        context['home_team'] = home_team
-        context['away_team'] = away_team
-        context['home'] = home
-        context['away'] = away
-        return context
\ No newline at end of file
@@ -1,4 +1,5 @@
 
+import os
 from pathlib import Path
 
 
@@ -53,6 +54,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'football.context_processors.moderator',
             ],
         },
     },
@@ -73,6 +75,59 @@ DATABASES = {
 }
 
 
+# Cache
+# Backend wybierany zmienną środowiskową SPORT_CACHE_BACKEND:
+#   locmem - pamięć procesu (domyślnie, testy)
+#   file   - pliki w katalogu SPORT_CACHE_DIR, wspólne dla wielu workerów
+#   redis  - serwer zgodny z protokołem Redis pod adresem SPORT_CACHE_URL (np. lokalny redis/valkey), wymaga pakietu redis
+# Aliasy: tabela ligowa, strony meczów i listy meczów (terminarze); wartości to domyślne TTL w sekundach.
+
+SPORT_CACHE_BACKEND = os.environ.get('SPORT_CACHE_BACKEND', 'locmem')
+SPORT_CACHE_DIR = Path(os.environ.get('SPORT_CACHE_DIR', BASE_DIR / 'cache'))
+SPORT_CACHE_URL = os.environ.get('SPORT_CACHE_URL', 'redis://127.0.0.1:6379/1')
+
+CACHE_TIMEOUTS = {
+    'default': 300,
+    'standings': 600,
+    'matches': 60 * 60,
+    'fixtures': 600,
+}
+
+
+def cache_config(alias, timeout):
+    if SPORT_CACHE_BACKEND == 'file':
+        config = {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': SPORT_CACHE_DIR / alias,
+        }
+    elif SPORT_CACHE_BACKEND == 'redis':
+        config = {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': SPORT_CACHE_URL,
+            'KEY_PREFIX': alias,
+        }
+    else:
+        config = {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': alias,
+        }
+    config['TIMEOUT'] = timeout
+    return config
+
+
+CACHES = {alias: cache_config(alias, timeout) for alias, timeout in CACHE_TIMEOUTS.items()}
+
+# Broker relacji na żywo (SSE) wybierany zmienną SPORT_LIVE_BROKER:
+#   local - pub/sub w pamięci procesu, wystarcza przy jednym workerze ASGI
+#   cache - wspólny cache (redis lub pliki), gdy workerów jest kilka
+SPORT_LIVE_BROKER = os.environ.get('SPORT_LIVE_BROKER', 'local' if SPORT_CACHE_BACKEND == 'locmem' else 'cache')
+
+# Etykiety drużyn, zawodników i meczów (__str__, admin, formularze) w LRU procesu, zmienną SPORT_LABEL_CACHE (on/off).
+# Wpisy są ważne do zmiany wersji w cache 'default', więc LRU ma sens tylko przy cache wspólnym dla workerów -
+# przy locmem zmiana nazwy w jednym procesie nie dotarłaby do pozostałych.
+SPORT_LABEL_CACHE = os.environ.get('SPORT_LABEL_CACHE', 'off' if SPORT_CACHE_BACKEND == 'locmem' else 'on') == 'on'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 